@@ -1,16 +1,61 @@
+import contextlib
+import contextvars
 from . import networks
 
-network = networks.get_network('bitcoin_main')
+# Process-wide default, set by select_network
+_default_network = networks.get_network('bitcoin_main')
+
+# Per-thread and per-task override, set by network_context
+_context_network = contextvars.ContextVar('riemann_network', default=None)
+
+
+def __getattr__(name):
+    '''
+    riemann.network is looked up on every access.
+    It's the network of the current context, or the default.
+    '''
+    if name == 'network':
+        return get_current_network()
+    raise AttributeError(
+        'module {} has no attribute {}'.format(__name__, name))
 
 
 def select_network(name):
-    global network
-    network = networks.get_network(name)
+    '''
+    str -> None
+    Sets the process-wide default network.
+    Code running inside a network_context block is unaffected.
+    '''
+    global _default_network
+    _default_network = networks.get_network(name)
 
 
 def get_current_network():
+    network = _context_network.get()
+    if network is None:
+        return _default_network
     return network
 
 
 def get_current_network_name():
+    network = get_current_network()
     return '{}_{}'.format(network.NETWORK_NAME, network.SUBNET_NAME)
+
+
+@contextlib.contextmanager
+def network_context(name):
+    '''
+    str -> context manager
+    Selects a network for the current thread or asyncio task only.
+    The previous network is restored on exit.
+    None keeps the current network, so network=None params can pass through.
+    '''
+    if name is None:
+        yield get_current_network()
+        return
+
+    token = _context_network.set(networks.get_network(name))
+    try:
+        yield get_current_network()
+    finally:
+        _context_network.reset(token)
@@ -0,0 +1,265 @@
+import mmap
+import riemann
+from riemann import utils
+from riemann.tx import Tx
+from riemann.tx.shared import ByteData, decode_varint, write_all
+
+
+class BlockHeader(ByteData):
+    '''
+    byte-like, byte-like, byte-like,
+    byte-like, byte-like, byte-like -> BlockHeader
+    NB: Args must be little-endian
+    '''
+
+    def __init__(self, version, prev_block, merkle_root,
+                 timestamp, nbits, nonce):
+        super().__init__()
+
+        self.validate_bytes(version, 4)
+        self.validate_bytes(prev_block, 32)
+        self.validate_bytes(merkle_root, 32)
+        self.validate_bytes(timestamp, 4)
+        self.validate_bytes(nbits, 4)
+        self.validate_bytes(nonce, 4)
+
+        self += version
+        self += prev_block
+        self += merkle_root
+        self += timestamp
+        self += nbits
+        self += nonce
+
+        self.version = version
+        self.prev_block = prev_block
+        self.merkle_root = merkle_root
+        self.timestamp = timestamp
+        self.nbits = nbits
+        self.nonce = nonce
+
+        self.block_hash_le = utils.hash256(self.to_bytes())
+        self.block_hash = utils.change_endianness(self.block_hash_le)
+
+        self._make_immutable()
+
+    def copy(self, version=None, prev_block=None, merkle_root=None,
+             timestamp=None, nbits=None, nonce=None):
+        return BlockHeader(
+            version=version if version is not None else self.version,
+            prev_block=(prev_block if prev_block is not None
+                        else self.prev_block),
+            merkle_root=(merkle_root if merkle_root is not None
+                         else self.merkle_root),
+            timestamp=timestamp if timestamp is not None else self.timestamp,
+            nbits=nbits if nbits is not None else self.nbits,
+            nonce=nonce if nonce is not None else self.nonce)
+
+    @classmethod
+    def from_bytes(BlockHeader, byte_string, offset=0):
+        '''
+        byte-like, int -> BlockHeader
+        '''
+        return BlockHeader(
+            version=bytes(byte_string[offset:offset + 4]),
+            prev_block=bytes(byte_string[offset + 4:offset + 36]),
+            merkle_root=bytes(byte_string[offset + 36:offset + 68]),
+            timestamp=bytes(byte_string[offset + 68:offset + 72]),
+            nbits=bytes(byte_string[offset + 72:offset + 76]),
+            nonce=bytes(byte_string[offset + 76:offset + 80]))
+
+
+class Block():
+    '''
+    byte-like -> Block
+    Read-only view of a serialized block.
+    bytes and memoryviews (e.g. of a memory-mapped file) are wrapped
+    without copying. bytearrays are copied, so the caller can still
+    resize them.
+    The header and tx count are parsed immediately.
+    Transactions are only parsed when iter_txs is consumed.
+    Slicing, find, to_bytes and pickling behave like ByteData,
+    but copy the bytes they return.
+    NB: Only supports bitcoin-style 80 byte headers
+    '''
+    __slots__ = ('_buf', 'header', 'tx_count', '_txs_start')
+
+    def __init__(self, byte_string):
+        if isinstance(byte_string, bytearray):
+            byte_string = bytes(byte_string)
+        if not isinstance(byte_string, (bytes, memoryview)):
+            raise ValueError('Expected byte-like object. '
+                             'Got: {}'.format(type(byte_string)))
+
+        buf = memoryview(byte_string)
+        if len(buf) < 81:
+            raise ValueError('Block is too short. '
+                             'Expected at least 81 bytes. Got {} bytes.'
+                             .format(len(buf)))
+
+        tx_count, n = decode_varint(buf, 80)
+
+        object.__setattr__(self, '_buf', buf)
+        object.__setattr__(self, 'header', BlockHeader.from_bytes(buf))
+        object.__setattr__(self, 'tx_count', tx_count)
+        object.__setattr__(self, '_txs_start', 80 + n)
+
+    def __setattr__(self, key, value):
+        raise TypeError("%r cannot be written to." % self)
+
+    def __reduce__(self):
+        return (Block, (self.to_bytes(),))
+
+    def __iter__(self):
+        return iter(self._buf)
+
+    def __getitem__(self, val):
+        if isinstance(val, slice):
+            return bytes(self._buf[val])
+        return self._buf[val]
+
+    def __len__(self):
+        return len(self._buf)
+
+    def __eq__(self, other):
+        '''
+        Block, byte-like -> bool
+        '''
+        if isinstance(other, Block):
+            return self._buf == other._buf
+        if isinstance(other, ByteData):
+            return self._buf == other._bytes
+        if isinstance(other, (bytes, bytearray, memoryview)):
+            return self._buf == other
+        raise TypeError('Equality not supported for Block and {}.'
+                        .format(type(other)))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '{}: {}'.format(type(self).__name__,
+                               self.header.block_hash.hex())
+
+    def to_bytes(self):
+        '''
+        Block -> bytes
+        '''
+        return bytes(self._buf)
+
+    def hex(self):
+        '''
+        Block -> hex_string
+        '''
+        return self._buf.hex()
+
+    def find(self, substring):
+        '''
+        byte-like -> int
+        Finds the index of substring
+        '''
+        if isinstance(substring, ByteData):
+            substring = substring.to_bytes()
+        return self.to_bytes().find(substring)
+
+    def serialized_size(self):
+        '''
+        Block -> int
+        '''
+        return len(self._buf)
+
+    def write_to(self, stream):
+        '''
+        Block, file-like -> int
+        See ByteData.write_to
+        '''
+        return write_all(stream, self._buf)
+
+    @classmethod
+    def from_hex(Block, hex_string):
+        return Block(bytes.fromhex(hex_string))
+
+    @classmethod
+    def from_bytes(Block, byte_string):
+        '''
+        byte-like -> Block
+        '''
+        return Block(byte_string)
+
+    def iter_txs(self, validate=False):
+        '''
+        Block, bool -> generator(Tx)
+        Yields the block's transactions one at a time.
+        Each Tx is parsed only when it is requested,
+        so callers can stop early without parsing the rest of the block.
+        Block txs are already valid, so by default they skip the checks
+        for building new txs. Those would reject real blocks, e.g. witness
+        items over 520 bytes or long output scripts.
+        validate=True applies them anyway.
+        NB: Litecoin MWEB data after the last tx is ignored.
+            Txs with the MWEB serialization flag raise ValueError.
+        '''
+        current = self._txs_start
+        for _ in range(self.tx_count):
+            tx = Tx.from_bytes(self._buf, current, validate=validate)
+            current += len(tx)
+            yield tx
+
+
+def iter_file_blocks(path):
+    '''
+    str -> generator(Block)
+    Memory-maps a Bitcoin Core style blkNNNNN.dat file and yields its blocks.
+    Each record is the network's MAGIC, a 4-byte little-endian length,
+    and the serialized block.
+    Blocks are views into the map. The file is never read into memory.
+    Zero-filled space at the end of a preallocated file is skipped.
+    '''
+    magic = riemann.network.MAGIC
+    if magic is None:
+        raise ValueError(
+            'Network {} does not specify block file magic bytes.'
+            .format(riemann.get_current_network_name()))
+
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return  # Empty files can't be mapped
+
+    buf = memoryview(mapped)
+    try:
+        current = 0
+        while current + 8 <= len(buf):
+            record_magic = bytes(buf[current:current + 4])
+            if record_magic == b'\x00' * 4:
+                break
+            if record_magic != magic:
+                raise ValueError(
+                    'Bad magic bytes at offset {}. Expected {}. Got {}.'
+                    .format(current, magic.hex(), record_magic.hex()))
+
+            block_start = current + 8
+            block_end = block_start + utils.le2i(buf[current + 4:block_start])
+            if block_end > len(buf):
+                raise ValueError(
+                    'Block at offset {} runs past the end of the file.'
+                    .format(current))
+
+            yield Block(buf[block_start:block_end])
+            current = block_end
+    finally:
+        buf.release()
+        try:
+            mapped.close()
+        except BufferError:
+            pass  # Yielded blocks still use the map. It's freed with them.
+
+
+def iter_file_txs(path, validate=False):
+    '''
+    str, bool -> generator(Tx)
+    Yields every transaction in a blkNNNNN.dat file, in order.
+    See Block.iter_txs for validate and Litecoin MWEB blocks.
+    '''
+    for block in iter_file_blocks(path):
+        yield from block.iter_txs(validate=validate)
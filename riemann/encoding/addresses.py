@@ -1,6 +1,73 @@
+import collections
+import functools
 import riemann
 from .. import utils
+from . import bech32
 from ..script import serialization as script_ser
+from ..script import templates
+
+ParsedAddress = collections.namedtuple(
+    'ParsedAddress', ['type', 'witness_version', 'hash', 'network'])
+
+# Optional LRU caches for parse, to_output_script and from_output_script
+# Keyed by network name and input. See enable_cache
+_parse_cache = None
+_to_output_script_cache = None
+_from_output_script_cache = None
+
+
+def enable_cache(maxsize=4096):
+    '''
+    int -> None
+    Caches the results of parse, to_output_script and from_output_script.
+    Each function gets its own LRU of up to maxsize entries.
+    Entries are keyed by network, so networks never share results.
+    Invalid addresses and scripts raise every time and are not cached.
+    '''
+    global _parse_cache, _to_output_script_cache, _from_output_script_cache
+    _parse_cache = functools.lru_cache(maxsize)(
+        lambda network_name, address: _parse(address))
+    _to_output_script_cache = functools.lru_cache(maxsize)(
+        lambda network_name, address: _to_output_script(address))
+    _from_output_script_cache = functools.lru_cache(maxsize)(
+        lambda network_name, output_script, cashaddr:
+            _from_output_script(output_script, cashaddr))
+
+
+def disable_cache():
+    '''
+    None -> None
+    Turns the caches off and drops their entries.
+    '''
+    global _parse_cache, _to_output_script_cache, _from_output_script_cache
+    _parse_cache = None
+    _to_output_script_cache = None
+    _from_output_script_cache = None
+
+
+def cache_info():
+    '''
+    None -> dict
+    Hit and miss statistics for each cache, keyed by function name.
+    Empty if the caches are disabled.
+    '''
+    if _parse_cache is None:
+        return {}
+    return {
+        'parse': _parse_cache.cache_info(),
+        'to_output_script': _to_output_script_cache.cache_info(),
+        'from_output_script': _from_output_script_cache.cache_info()}
+
+
+def cache_clear():
+    '''
+    None -> None
+    Drops all cached entries and resets the statistics.
+    '''
+    if _parse_cache is not None:
+        _parse_cache.cache_clear()
+        _to_output_script_cache.cache_clear()
+        _from_output_script_cache.cache_clear()
 
 
 def _hash_to_sh_address(script_hash, witness=False, cashaddr=True):
@@ -39,32 +106,37 @@ def _ser_script_to_sh_address(script_bytes, witness=False, cashaddr=True):
         cashaddr=cashaddr)
 
 
-def make_sh_address(script_string, witness=False, cashaddr=True):
+def make_sh_address(script_string, witness=False, cashaddr=True,
+                    network=None):
     '''
     str, bool, bool -> str
     '''
-    script_bytes = script_ser.serialize(script_string)
+    with riemann.network_context(network):
+        script_bytes = script_ser.serialize(script_string)
 
-    return _ser_script_to_sh_address(
-        script_bytes=script_bytes,
-        witness=witness,
-        cashaddr=cashaddr)
+        return _ser_script_to_sh_address(
+            script_bytes=script_bytes,
+            witness=witness,
+            cashaddr=cashaddr)
 
 
-def make_p2wsh_address(script_string):
+def make_p2wsh_address(script_string, network=None):
     return make_sh_address(script_string=script_string,
-                           witness=True)
+                           witness=True,
+                           network=network)
 
 
-def make_p2sh_address(script_string):
+def make_p2sh_address(script_string, network=None):
     return make_sh_address(script_string=script_string,
-                           witness=False)
+                           witness=False,
+                           network=network)
 
 
-def make_legacy_p2sh_address(script_string):
+def make_legacy_p2sh_address(script_string, network=None):
     return make_sh_address(script_string=script_string,
                            witness=False,
-                           cashaddr=False)
+                           cashaddr=False,
+                           network=network)
 
 
 def _make_pkh_address(pubkey_hash, witness=False, cashaddr=True):
@@ -86,171 +158,198 @@ def _make_pkh_address(pubkey_hash, witness=False, cashaddr=True):
         return riemann.network.LEGACY_ENCODER.encode(addr_bytes)
 
 
-def make_pkh_address(pubkey, witness=False, cashaddr=True):
+def make_pkh_address(pubkey, witness=False, cashaddr=True, network=None):
     '''
     bytes, bool -> str
     '''
-    pubkey_hash = utils.hash160(pubkey)
-    return _make_pkh_address(pubkey_hash=pubkey_hash,
-                             witness=witness,
-                             cashaddr=cashaddr)
+    with riemann.network_context(network):
+        pubkey_hash = utils.hash160(pubkey)
+        return _make_pkh_address(pubkey_hash=pubkey_hash,
+                                 witness=witness,
+                                 cashaddr=cashaddr)
 
 
-def make_p2wpkh_address(pubkey):
-    return make_pkh_address(pubkey=pubkey, witness=True)
+def make_p2wpkh_address(pubkey, network=None):
+    return make_pkh_address(pubkey=pubkey, witness=True, network=network)
 
 
-def make_p2pkh_address(pubkey):
-    return make_pkh_address(pubkey=pubkey, witness=False)
+def make_p2pkh_address(pubkey, network=None):
+    return make_pkh_address(pubkey=pubkey, witness=False, network=network)
 
 
-def make_legacy_p2pkh_address(pubkey):
-    return make_pkh_address(pubkey=pubkey, witness=False, cashaddr=False)
+def make_legacy_p2pkh_address(pubkey, network=None):
+    return make_pkh_address(pubkey=pubkey, witness=False, cashaddr=False,
+                            network=network)
 
 
-def parse(address):
-    try:
-        return bytearray(riemann.network.LEGACY_ENCODER.decode(address))
-    except ValueError:
-        pass
-
-    try:
-        return bytearray(riemann.network.SEGWIT_ENCODER.decode(address))
-    except Exception:
-        pass
+def parse(address, network=None):
+    with riemann.network_context(network):
+        if _parse_cache is None:
+            return _parse(address)
+        return bytearray(
+            _parse_cache(riemann.get_current_network_name(), address))
 
-    try:
-        return bytearray(riemann.network.CASHADDR_ENCODER.decode(address))
-    except Exception:
-        pass
 
-    raise ValueError(
-        'Unsupported address format. Got: {}'.format(address))
+def _parse(address):
+    return _decode(address)[1]
 
 
-def to_output_script(address):
+def classify(address, network=None):
     '''
-    str -> bytes
-    There's probably a better way to do this
+    str -> ParsedAddress
+    Decodes an address once and reports its type, witness version, hash,
+    and network.
+    type is one of p2pkh, p2sh, p2wpkh, p2wsh, or witness
+    for witness programs of other versions or sizes.
+    witness_version is None for non-witness addresses.
     '''
-    parsed = parse(address)
-    parsed_hash = b''
+    with riemann.network_context(network):
+        parsed = _classify(*_decode(address))
+        if parsed.type is None:
+            raise ValueError(
+                'Unknown address type. Got: {}'.format(address))
+        return parsed
 
-    try:
-        if (parsed.find(riemann.network.P2WPKH_PREFIX) == 0
-                and len(parsed) == 22):
-            return parsed
-    except TypeError:
-        pass
 
-    try:
-        if (parsed.find(riemann.network.P2WSH_PREFIX) == 0
-                and len(parsed) == 34):
-            return parsed
-    except TypeError:
-        pass
-
-    try:
-        if (parsed.find(riemann.network.CASHADDR_P2SH) == 0
-                and len(parsed) == len(riemann.network.CASHADDR_P2SH) + 20):
-            prefix = b'\xa9\x14'  # OP_HASH160 PUSH14
-            parsed_hash = parsed[len(riemann.network.P2SH_PREFIX):]
-            suffix = b'\x87'  # OP_EQUAL
-    except TypeError:
-        pass
+def _decode(address):
+    '''
+    str -> (str, bytearray)
+    Picks the encoding from the address's prefix or HRP,
+    then decodes it once. Returns the encoding name and the raw payload.
+    '''
+    network = riemann.network
+    if (network.CASHADDR_PREFIX is not None
+            and address.startswith(network.CASHADDR_PREFIX + ':')):
+        encoding = 'cashaddr'
+        encoder = network.CASHADDR_ENCODER
+    elif (network.BECH32_HRP is not None
+            and address[:len(network.BECH32_HRP) + 1].lower()
+            == network.BECH32_HRP + '1'):
+        encoding = 'segwit'
+        encoder = network.SEGWIT_ENCODER
+    else:
+        encoding = 'legacy'
+        encoder = network.LEGACY_ENCODER
 
     try:
-        if (parsed.find(riemann.network.CASHADDR_P2PKH) == 0
-                and len(parsed) == len(riemann.network.CASHADDR_P2PKH) + 20):
-            prefix = b'\x76\xa9\x14'  # OP_DUP OP_HASH160 PUSH14
-            parsed_hash = parsed[len(riemann.network.P2PKH_PREFIX):]
-            suffix = b'\x88\xac'  # OP_EQUALVERIFY OP_CHECKSIG
-    except TypeError:
+        return encoding, bytearray(encoder.decode(address))
+    except Exception:
         pass
 
-    if (parsed.find(riemann.network.P2PKH_PREFIX) == 0
-            and len(parsed) == len(riemann.network.P2PKH_PREFIX) + 20):
-        prefix = b'\x76\xa9\x14'  # OP_DUP OP_HASH160 PUSH14
-        parsed_hash = parsed[len(riemann.network.P2PKH_PREFIX):]
-        suffix = b'\x88\xac'  # OP_EQUALVERIFY OP_CHECKSIG
+    raise ValueError(
+        'Unsupported address format. Got: {}'.format(address))
 
-    if (parsed.find(riemann.network.P2SH_PREFIX) == 0
-            and len(parsed) == len(riemann.network.P2SH_PREFIX) + 20):
-        prefix = b'\xa9\x14'  # OP_HASH160 PUSH14
-        parsed_hash = parsed[len(riemann.network.P2SH_PREFIX):]
-        suffix = b'\x87'  # OP_EQUAL
 
-    if parsed_hash == b'':
+def _classify(encoding, raw):
+    '''
+    str, bytearray -> ParsedAddress
+    Matches a decoded payload against the current network's prefixes.
+    type is None if nothing matches.
+    '''
+    network = riemann.network
+    if encoding == 'cashaddr':
+        candidates = [('p2sh', network.CASHADDR_P2SH, 20),
+                      ('p2pkh', network.CASHADDR_P2PKH, 20)]
+    else:
+        candidates = [('p2wpkh', network.P2WPKH_PREFIX, 20),
+                      ('p2wsh', network.P2WSH_PREFIX, 32),
+                      ('p2pkh', network.P2PKH_PREFIX, 20),
+                      ('p2sh', network.P2SH_PREFIX, 20)]
+
+    network_name = riemann.get_current_network_name()
+    for addr_type, prefix, hash_len in candidates:
+        if (prefix is not None
+                and len(raw) == len(prefix) + hash_len
+                and raw.startswith(prefix)):
+            if addr_type in ('p2wpkh', 'p2wsh'):
+                witness_version = raw[0]
+            else:
+                witness_version = None
+            return ParsedAddress(
+                type=addr_type,
+                witness_version=witness_version,
+                hash=bytes(raw[len(prefix):]),
+                network=network_name)
+
+    if encoding == 'segwit' and network.SEGWIT_ENCODER is bech32:
+        # Bech32 payloads are witness version, program length, program
+        return ParsedAddress(
+            type='witness',
+            witness_version=raw[0],
+            hash=bytes(raw[2:]),
+            network=network_name)
+
+    return ParsedAddress(
+        type=None, witness_version=None, hash=None, network=network_name)
+
+
+def to_output_script(address, network=None):
+    '''
+    str -> bytes
+    There's probably a better way to do this
+    '''
+    with riemann.network_context(network):
+        if _to_output_script_cache is None:
+            return _to_output_script(address)
+        output_script = _to_output_script_cache(
+            riemann.get_current_network_name(), address)
+        # Cached values are shared. Don't hand out a mutable one
+        if isinstance(output_script, bytearray):
+            return bytearray(output_script)
+        return output_script
+
+
+def _to_output_script(address):
+    parsed = _classify(*_decode(address))
+    if parsed.type not in templates.TEMPLATES:
         raise ValueError('Cannot parse output script from address.')
+    return templates.build(parsed.type, parsed.hash)
 
-    output_script = prefix + parsed_hash + suffix
-    return output_script
 
-
-def from_output_script(output_script, cashaddr=True):
+def from_output_script(output_script, cashaddr=True, network=None):
     '''
     bytes -> str
     Convert output script (the on-chain format) to an address
     There's probably a better way to do this
     '''
-    try:
-        if (len(output_script) == len(riemann.network.P2WSH_PREFIX) + 32
-                and output_script.find(riemann.network.P2WSH_PREFIX) == 0):
-            # Script hash is the last 32 bytes
-            return _hash_to_sh_address(
-                output_script[-32:], witness=True, cashaddr=cashaddr)
-    except TypeError:
-        pass
-    try:
-        if (len(output_script) == len(riemann.network.P2WPKH_PREFIX) + 20
-                and output_script.find(riemann.network.P2WPKH_PREFIX) == 0):
-            # PKH is the last 20 bytes
-            return _make_pkh_address(
-                output_script[-20:], witness=True, cashaddr=cashaddr)
-    except TypeError:
-        pass
+    with riemann.network_context(network):
+        if _from_output_script_cache is None:
+            return _from_output_script(output_script, cashaddr)
+        return _from_output_script_cache(
+            riemann.get_current_network_name(), bytes(output_script),
+            cashaddr)
 
-    if len(output_script) == 25 and output_script.find(b'\x76\xa9\x14') == 0:
+
+def _from_output_script(output_script, cashaddr):
+    matched = templates.match(output_script)
+    if matched is None:
+        raise ValueError('Cannot parse address from script.')
+
+    script_type, script_hash = matched
+    if script_type == 'p2pkh':
         return _make_pkh_address(
-            output_script[3:23], witness=False, cashaddr=cashaddr)
+            script_hash, witness=False, cashaddr=cashaddr)
+    if script_type == 'p2sh':
+        return _hash_to_sh_address(
+            script_hash, witness=False, cashaddr=cashaddr)
 
-    elif len(output_script) == 23 and output_script.find(b'\xa9\x14') == 0:
+    # Witness scripts only have addresses on networks with witness prefixes
+    if script_type == 'p2wsh' and riemann.network.P2WSH_PREFIX is not None:
         return _hash_to_sh_address(
-            output_script[2:22], witness=False, cashaddr=cashaddr)
+            script_hash, witness=True, cashaddr=cashaddr)
+    if (script_type == 'p2wpkh'
+            and riemann.network.P2WPKH_PREFIX is not None):
+        return _make_pkh_address(
+            script_hash, witness=True, cashaddr=cashaddr)
 
     raise ValueError('Cannot parse address from script.')
 
 
-def parse_hash(address):
+def parse_hash(address, network=None):
     '''
     str -> bytes
-    There's probably a better way to do this.
+    Returns the pubkey hash or script hash an address commits to.
+    None if the payload doesn't match any of the network's address types.
     '''
-
-    raw = parse(address)
-
-    # Cash addresses
-    try:
-        if address.find(riemann.network.CASHADDR_PREFIX) == 0:
-            if raw.find(riemann.network.CASHADDR_P2SH) == 0:
-                return raw[len(riemann.network.CASHADDR_P2SH):]
-            if raw.find(riemann.network.CASHADDR_P2PKH) == 0:
-                return raw[len(riemann.network.CASHADDR_P2PKH):]
-    except TypeError:
-        pass
-
-    # Segwit addresses
-    try:
-        if address.find(riemann.network.BECH32_HRP) == 0:
-            if raw.find(riemann.network.P2WSH_PREFIX) == 0:
-                return raw[len(riemann.network.P2WSH_PREFIX):]
-            if raw.find(riemann.network.P2WPKH_PREFIX) == 0:
-                return raw[len(riemann.network.P2WPKH_PREFIX):]
-    except TypeError:
-        pass
-
-    # Legacy Addresses
-    if raw.find(riemann.network.P2SH_PREFIX) == 0:
-        return raw[len(riemann.network.P2SH_PREFIX):]
-    if raw.find(riemann.network.P2PKH_PREFIX) == 0:
-        return raw[len(riemann.network.P2PKH_PREFIX):]
+    with riemann.network_context(network):
+        return _classify(*_decode(address)).hash
@@ -22,33 +22,110 @@
 
 """Implementation of Base58 encoding with checksum"""
 
+import hashlib
+import riemann
 from .. import utils
 
 BASE58_ALPHABET = b'123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
 BASE58_BASE = len(BASE58_ALPHABET)
 BASE58_LOOKUP = dict((c, i) for i, c in enumerate(BASE58_ALPHABET))
 
+# Digits are converted 10 at a time. 58 ** 10 fits in 64 bits, so there is
+# one bignum divmod or multiply per 10 digits instead of one per digit.
+_CHUNK_DIGITS = 10
+_CHUNK_BASE = BASE58_BASE ** _CHUNK_DIGITS
+
+# Every two digit string, indexed by its value
+_PAIRS = [bytes([a, b]) for a in BASE58_ALPHABET for b in BASE58_ALPHABET]
+_PAIR_BASE = len(_PAIRS)
+
+# bytes.translate table from characters to digit values. Invalid is 0xff
+_DIGITS = bytearray(b'\xff' * 256)
+for i, c in enumerate(BASE58_ALPHABET):
+    _DIGITS[c] = i
+_DIGITS = bytes(_DIGITS)
+
 
 def encode(data, checksum=True):
     """Convert binary to base58 using BASE58_ALPHABET."""
-
-    if checksum:
-        data = data + utils.hash256(data)[:4]
-    v, prefix = to_long(256, lambda x: x, iter(data))
-    data = from_long(v, prefix, BASE58_BASE, lambda v: BASE58_ALPHABET[v])
-    return data.decode("utf8")
+    return _encode(data, utils.hash256 if checksum else None)
 
 
 def decode(s, checksum=True):
     """Convert base58 to binary using BASE58_ALPHABET."""
-    v, prefix = to_long(
-        BASE58_BASE, lambda c: BASE58_LOOKUP[c], s.encode("utf8"))
+    return _decode(s, utils.hash256 if checksum else None)
+
+
+def encode_many(items, checksum=True):
+    """Convert a list of binary strings to base58."""
+    hash_func = _checksum_hash() if checksum else None
+    return [_encode(data, hash_func) for data in items]
 
-    data = from_long(v, prefix, 256, lambda x: x)
 
-    if checksum:
+def decode_many(strings, checksum=True):
+    """Convert a list of base58 strings to binary."""
+    hash_func = _checksum_hash() if checksum else None
+    return [_decode(s, hash_func) for s in strings]
+
+
+def _checksum_hash():
+    """
+    Returns utils.hash256 for the current network without re-checking the
+    network on every call.
+    """
+    if 'decred' in riemann.get_current_network_name():
+        return lambda data: utils.blake256(utils.blake256(data))
+    return lambda data: hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def _encode(data, hash_func):
+    if hash_func is not None:
+        data = data + hash_func(data)[:4]
+
+    stripped = data.lstrip(b'\x00')
+    prefix = len(data) - len(stripped)
+
+    v = int.from_bytes(stripped, 'big')
+    chunks = []
+    while v:
+        v, chunk = divmod(v, _CHUNK_BASE)
+        chunk, e = divmod(chunk, _PAIR_BASE)
+        chunk, d = divmod(chunk, _PAIR_BASE)
+        chunk, c = divmod(chunk, _PAIR_BASE)
+        a, b = divmod(chunk, _PAIR_BASE)
+        chunks.append(_PAIRS[a] + _PAIRS[b] + _PAIRS[c]
+                      + _PAIRS[d] + _PAIRS[e])
+    chunks.reverse()
+
+    # The top chunk is padded with zero digits. Strip them and add prefix
+    digits = b''.join(chunks).lstrip(BASE58_ALPHABET[:1])
+    return (BASE58_ALPHABET[:1] * prefix + digits).decode('utf8')
+
+
+def _decode(s, hash_func):
+    encoded = s.encode('utf8')
+    stripped = encoded.lstrip(BASE58_ALPHABET[:1])
+    prefix = len(encoded) - len(stripped)
+
+    digits = stripped.translate(_DIGITS)
+    bad = digits.find(b'\xff')
+    if bad != -1:
+        raise ValueError(
+            "bad character %s in string %s" % (stripped[bad], encoded))
+
+    # Left-pad with zero digits to a whole number of chunks
+    digits = b'\x00' * (-len(digits) % _CHUNK_DIGITS) + digits
+    v = 0
+    for i in range(0, len(digits), _CHUNK_DIGITS):
+        chunk = 0
+        for digit in digits[i:i + _CHUNK_DIGITS]:
+            chunk = chunk * BASE58_BASE + digit
+        v = v * _CHUNK_BASE + chunk
+    data = b'\x00' * prefix + v.to_bytes((v.bit_length() + 7) // 8, 'big')
+
+    if hash_func is not None:
         data, the_hash = data[:-4], data[-4:]
-        if utils.hash256(data)[:4] == the_hash:
+        if hash_func(data)[:4] == the_hash:
             return data
         raise ValueError("hashed base58 has bad checksum %s" % s)
 
@@ -22,10 +22,21 @@
 
 """Reference implementation for Bech32 and segwit addresses."""
 
+import functools
 import riemann
 
 
 CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+CHARSET_LOOKUP = dict((c, i) for i, c in enumerate(CHARSET))
+
+GENERATOR = [0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3]
+
+# XOR of the generator terms selected by each possible top 5 bits
+_POLYMOD_TABLE = [0] * 32
+for top in range(32):
+    for i in range(5):
+        if (top >> i) & 1:
+            _POLYMOD_TABLE[top] ^= GENERATOR[i]
 
 
 def encode(data):
@@ -44,6 +55,8 @@ def decode(bech):
 
     (version_prefix, hash_int_array) = \
         segwit_decode(riemann.network.BECH32_HRP, bech)
+    if version_prefix is None:
+        raise ValueError('Invalid bech32 address: {}'.format(bech))
     ret = bytearray()
     ret.extend([version_prefix])
     ret.extend([len(hash_int_array)])
@@ -51,6 +64,33 @@ def decode(bech):
     return bytes(ret)
 
 
+def encode_many(items):
+    '''
+    list(bytes) -> list(str)
+    Encodes each output script with the current network's HRP.
+    '''
+    if riemann.network.BECH32_HRP is None:
+        raise ValueError(
+            'Network ({}) does not support bech32 encoding.'
+            .format(riemann.get_current_network_name()))
+    hrp = riemann.network.BECH32_HRP
+    return [segwit_encode(hrp, data[0], data[2:]) for data in items]
+
+
+def verify_many(addrs):
+    '''
+    list(str) -> list(bool)
+    True for each address that is a valid segwit address
+    with the current network's HRP.
+    '''
+    if riemann.network.BECH32_HRP is None:
+        raise ValueError(
+            'Network ({}) does not support bech32 encoding.'
+            .format(riemann.get_current_network_name()))
+    hrp = riemann.network.BECH32_HRP
+    return [segwit_decode(hrp, addr) != (None, None) for addr in addrs]
+
+
 def segwit_decode(hrp, addr):
     """Decode a segwit address."""
     hrpgot, data = bech32_decode(addr)
@@ -89,27 +129,30 @@ def bech32_decode(bech):
     pos = bech.rfind('1')
     if pos < 1 or pos + 7 > len(bech) or len(bech) > 90:
         return (None, None)
-    if not all(x in CHARSET for x in bech[pos + 1:]):
+    try:
+        data = [CHARSET_LOOKUP[x] for x in bech[pos + 1:]]
+    except KeyError:
         return (None, None)
     hrp = bech[:pos]
-    data = [CHARSET.find(x) for x in bech[pos + 1:]]
     if not bech32_verify_checksum(hrp, data):
         return (None, None)
     return (hrp, data[:-6])
 
 
-def bech32_polymod(values):
+def bech32_polymod(values, chk=1):
     """Internal function that computes the Bech32 checksum."""
-    generator = [0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3]
-    chk = 1
+    table = _POLYMOD_TABLE
     for value in values:
-        top = chk >> 25
-        chk = (chk & 0x1ffffff) << 5 ^ value
-        for i in range(5):
-            chk ^= generator[i] if ((top >> i) & 1) else 0
+        chk = (chk & 0x1ffffff) << 5 ^ value ^ table[chk >> 25]
     return chk
 
 
+@functools.lru_cache(maxsize=None)
+def _hrp_polymod(hrp):
+    """The checksum state after the HRP. Shared by every address."""
+    return bech32_polymod(bech32_hrp_expand(hrp))
+
+
 def bech32_hrp_expand(hrp):
     """Expand the HRP into values for checksum computation."""
     return [ord(x) >> 5 for x in hrp] + [0] + [ord(x) & 31 for x in hrp]
@@ -117,13 +160,12 @@ def bech32_hrp_expand(hrp):
 
 def bech32_verify_checksum(hrp, data):
     """Verify a checksum given HRP and converted data characters."""
-    return bech32_polymod(bech32_hrp_expand(hrp) + data) == 1
+    return bech32_polymod(data, _hrp_polymod(hrp)) == 1
 
 
 def bech32_create_checksum(hrp, data):
     """Compute the checksum values given HRP and data."""
-    values = bech32_hrp_expand(hrp) + data
-    polymod = bech32_polymod(values + [0, 0, 0, 0, 0, 0]) ^ 1
+    polymod = bech32_polymod(data + [0, 0, 0, 0, 0, 0], _hrp_polymod(hrp)) ^ 1
     return [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
 
 
@@ -21,9 +21,25 @@
 # SOFTWARE.
 
 
+import functools
 import riemann
 
 CHARSET = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+CHARSET_LOOKUP = dict((c, i) for i, c in enumerate(CHARSET))
+
+GENERATOR = [
+    (0x01, 0x98f2bc8e61),
+    (0x02, 0x79b76d99e2),
+    (0x04, 0xf33e5fb3c4),
+    (0x08, 0xae2eabe2a8),
+    (0x10, 0x1e4f43e470)]
+
+# XOR of the generator terms selected by each possible top 5 bits
+_POLYMOD_TABLE = [0] * 32
+for top in range(32):
+    for bit, term in GENERATOR:
+        if top & bit != 0:
+            _POLYMOD_TABLE[top] ^= term
 
 
 def encode(data):
@@ -34,14 +50,29 @@ def encode(data):
         raise ValueError('Network {} does not support cashaddresses.'
                          .format(riemann.get_current_network_name()))
 
+    return _encode(riemann.network.CASHADDR_PREFIX, data)
+
+
+def encode_many(items):
+    '''
+    list(bytes) -> list(str)
+    '''
+    if riemann.network.CASHADDR_PREFIX is None:
+        raise ValueError('Network {} does not support cashaddresses.'
+                         .format(riemann.get_current_network_name()))
+    prefix = riemann.network.CASHADDR_PREFIX
+    return [_encode(prefix, data) for data in items]
+
+
+def _encode(prefix, data):
     data = convertbits(data, 8, 5)
-    checksum = calculate_checksum(riemann.network.CASHADDR_PREFIX, data)
+    checksum = calculate_checksum(prefix, data)
 
     payload = b32encode(data + checksum)
 
     form = '{prefix}:{payload}'
     return form.format(
-        prefix=riemann.network.CASHADDR_PREFIX,
+        prefix=prefix,
         payload=payload)
 
 
@@ -54,41 +85,58 @@ def decode(data):
                          .format(riemann.get_current_network_name()))
     if data.find(riemann.network.CASHADDR_PREFIX) != 0:
         raise ValueError('Malformed cashaddr. Cannot locate prefix: {}'
-                         .format(riemann.netowrk.CASHADDR_PREFIX))
+                         .format(riemann.network.CASHADDR_PREFIX))
 
     # the data is everything after the colon
     prefix, data = data.split(':')
     decoded = b32decode(data)
     if not verify_checksum(prefix, decoded):
-            raise ValueError('Bad cash address checksum')
+        raise ValueError('Bad cash address checksum')
     converted = convertbits(decoded, 5, 8)
 
     return bytes(converted[:-6])  # remove the checksum from the end
 
 
-def polymod(values):
-    chk = 1
-    generator = [
-        (0x01, 0x98f2bc8e61),
-        (0x02, 0x79b76d99e2),
-        (0x04, 0xf33e5fb3c4),
-        (0x08, 0xae2eabe2a8),
-        (0x10, 0x1e4f43e470)]
+def verify_many(addrs):
+    '''
+    list(str) -> list(bool)
+    True for each well-formed cashaddr with the current network's prefix
+    and a valid checksum.
+    '''
+    if riemann.network.CASHADDR_PREFIX is None:
+        raise ValueError('Network {} does not support cashaddresses.'
+                         .format(riemann.get_current_network_name()))
+    network_prefix = riemann.network.CASHADDR_PREFIX
+    results = []
+    for addr in addrs:
+        prefix, _, data = addr.partition(':')
+        results.append(prefix == network_prefix
+                       and verify_checksum(prefix, b32decode(data)))
+    return results
+
+
+def polymod(values, chk=1):
+    table = _POLYMOD_TABLE
     for value in values:
-        top = chk >> 35
-        chk = ((chk & 0x07ffffffff) << 5) ^ value
-        for i in generator:
-            if top & i[0] != 0:
-                chk ^= i[1]
+        chk = ((chk & 0x07ffffffff) << 5) ^ value ^ table[chk >> 35]
     return chk ^ 1
 
 
+@functools.lru_cache(maxsize=None)
+def _prefix_polymod(prefix):
+    '''
+    The checksum state after the prefix. Shared by every address.
+    '''
+    return polymod(prefix_expand(prefix)) ^ 1
+
+
 def prefix_expand(prefix):
     return [ord(x) & 0x1f for x in prefix] + [0]
 
 
 def calculate_checksum(prefix, payload):
-    poly = polymod(prefix_expand(prefix) + payload + [0, 0, 0, 0, 0, 0, 0, 0])
+    poly = polymod(payload + [0, 0, 0, 0, 0, 0, 0, 0],
+                   _prefix_polymod(prefix))
     out = list()
     for i in range(8):
         out.append((poly >> 5 * (7 - i)) & 0x1f)
@@ -96,21 +144,16 @@ def calculate_checksum(prefix, payload):
 
 
 def verify_checksum(prefix, payload):
-    return polymod(prefix_expand(prefix) + payload) == 0
+    return polymod(payload, _prefix_polymod(prefix)) == 0
 
 
 def b32decode(inputs):
-    out = list()
-    for letter in inputs:
-        out.append(CHARSET.find(letter))
-    return out
+    # Unknown characters are -1, which fails the checksum
+    return [CHARSET_LOOKUP.get(letter, -1) for letter in inputs]
 
 
 def b32encode(inputs):
-    out = ''
-    for char_code in inputs:
-        out += CHARSET[char_code]
-    return out
+    return ''.join([CHARSET[char_code] for char_code in inputs])
 
 
 def convertbits(data, frombits, tobits, pad=True):
@@ -29,12 +29,14 @@ class Network:
     CASHADDR_P2PKH = None
     CODE_TO_INT_OVERWRITE = dict(o for o in OPCODE_CHANGES)
     INT_TO_CODE_OVERWRITE = dict(reversed(o) for o in OPCODE_CHANGES)
+    MAGIC = None  # frames blocks in blk*.dat files
 
 
 class BitcoinMain(Network):
     SYMBOL = 'BTC'
     NETWORK_NAME = 'bitcoin'
     SUBNET_NAME = 'main'
+    MAGIC = b'\xf9\xbe\xb4\xd9'
     P2PKH_PREFIX = b'\x00'
     P2SH_PREFIX = b'\x05'
     SEGWIT = True
@@ -47,6 +49,7 @@ class BitcoinTest(Network):
     SYMBOL = 'tBTC'
     NETWORK_NAME = 'bitcoin'
     SUBNET_NAME = 'test'
+    MAGIC = b'\x0b\x11\x09\x07'
     P2PKH_PREFIX = b'\x6f'
     P2SH_PREFIX = b'\xc4'
     SEGWIT = True
@@ -59,6 +62,7 @@ class BitcoinRegtest(Network):
     SYMBOL = 'rBTC'
     NETWORK_NAME = 'bitcoin'
     SUBNET_NAME = 'reg'
+    MAGIC = b'\xfa\xbf\xb5\xda'
     P2PKH_PREFIX = b'\x6f'
     P2SH_PREFIX = b'\xc4'
     SEGWIT = True
@@ -71,6 +75,7 @@ class LitecoinMain(Network):
     SYMBOL = 'LTC'
     NETWORK_NAME = 'litecoin'
     SUBNET_NAME = 'main'
+    MAGIC = b'\xfb\xc0\xb6\xdb'
     P2PKH_PREFIX = b'\x30'
     P2SH_PREFIX = b'\x32'
     SEGWIT = True
@@ -83,6 +88,7 @@ class LitecoinTest(Network):
     SYMBOL = 'tLTC'
     NETWORK_NAME = 'litecoin'
     SUBNET_NAME = 'test'
+    MAGIC = b'\xfd\xd2\xc8\xf1'
     P2PKH_PREFIX = b'\x6f'
     P2SH_PREFIX = b'\x3a'
     SEGWIT = True
@@ -95,6 +101,7 @@ class LitecoinRegtest(Network):
     SYMBOL = 'rLTC'
     NETWORK_NAME = 'litecoin'
     SUBNET_NAME = 'reg'
+    MAGIC = b'\xfa\xbf\xb5\xda'
     P2PKH_PREFIX = b'\x6f'
     P2SH_PREFIX = b'\x3a'
     SEGWIT = True
@@ -107,6 +114,7 @@ class BitcoinCashMain(Network):
     SYMBOL = 'BCH'
     NETWORK_NAME = 'bitcoin_cash'
     SUBNET_NAME = 'main'
+    MAGIC = b'\xf9\xbe\xb4\xd9'
     P2PKH_PREFIX = b'\x00'
     P2SH_PREFIX = b'\x05'
     SEGWIT = False
@@ -120,6 +128,7 @@ class BitcoinCashTest(Network):
     SYMBOL = 'tBCH'
     NETWORK_NAME = 'bitcoin_cash'
     SUBNET_NAME = 'test'
+    MAGIC = b'\x0b\x11\x09\x07'
     P2PKH_PREFIX = b'\x6f'
     P2SH_PREFIX = b'\xc4'
     SEGWIT = False
@@ -133,6 +142,7 @@ class BitcoinCashRegtest(Network):
     SYMBOL = 'rBCH'
     NETWORK_NAME = 'bitcoin_cash'
     SUBNET_NAME = 'reg'
+    MAGIC = b'\xfa\xbf\xb5\xda'
     P2PKH_PREFIX = b'\x6f'
     P2SH_PREFIX = b'\xc4'
     SEGWIT = False
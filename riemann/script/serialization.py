@@ -3,118 +3,141 @@ from .. import utils
 from .opcodes import CODE_TO_INT, INT_TO_CODE
 
 
-def serialize(script_string):
+def serialize(script_string, network=None):
     '''
     str -> bytearray
     '''
-    string_tokens = script_string.split()
-    serialized_script = bytearray()
+    with riemann.network_context(network):
+        string_tokens = script_string.split()
+        serialized_script = bytearray()
 
-    for token in string_tokens:
-        if token == 'OP_CODESEPARATOR' or token == 'OP_PUSHDATA4':
-            raise NotImplementedError('{} is a bad idea.'.format(token))
+        for token in string_tokens:
+            if token == 'OP_CODESEPARATOR' or token == 'OP_PUSHDATA4':
+                raise NotImplementedError('{} is a bad idea.'.format(token))
 
-        if token in riemann.network.CODE_TO_INT_OVERWRITE:
-            serialized_script.extend(
-                [riemann.network.CODE_TO_INT_OVERWRITE[token]])
-
-        elif token in CODE_TO_INT:
-            serialized_script.extend([CODE_TO_INT[token]])
-
-        else:
-            token_bytes = bytes.fromhex(token)
-
-            if len(token_bytes) <= 75:
-                op = 'OP_PUSH_{}'.format(len(token_bytes))
-                serialized_script.extend([CODE_TO_INT[op]])
-                serialized_script.extend(token_bytes)
-
-            elif len(token_bytes) > 75 and len(token_bytes) <= 255:
-                op = 'OP_PUSHDATA1'
-                serialized_script.extend([CODE_TO_INT[op]])
-                serialized_script.extend(utils.i2le(len(token_bytes)))
-                serialized_script.extend(token_bytes)
-
-            elif len(token_bytes) > 255 and len(token_bytes) <= 1000:
-                op = 'OP_PUSHDATA2'
-                serialized_script.extend([CODE_TO_INT[op]])
+            if token in riemann.network.CODE_TO_INT_OVERWRITE:
                 serialized_script.extend(
-                    utils.i2le_padded(len(token_bytes), 2))
-                serialized_script.extend(token_bytes)
+                    [riemann.network.CODE_TO_INT_OVERWRITE[token]])
+
+            elif token in CODE_TO_INT:
+                serialized_script.extend([CODE_TO_INT[token]])
 
             else:
-                raise NotImplementedError(
-                    'Hex string too long to serialize.')
+                token_bytes = bytes.fromhex(token)
+
+                if len(token_bytes) <= 75:
+                    op = 'OP_PUSH_{}'.format(len(token_bytes))
+                    serialized_script.extend([CODE_TO_INT[op]])
+                    serialized_script.extend(token_bytes)
+
+                elif len(token_bytes) > 75 and len(token_bytes) <= 255:
+                    op = 'OP_PUSHDATA1'
+                    serialized_script.extend([CODE_TO_INT[op]])
+                    serialized_script.extend(utils.i2le(len(token_bytes)))
+                    serialized_script.extend(token_bytes)
+
+                elif len(token_bytes) > 255 and len(token_bytes) <= 1000:
+                    op = 'OP_PUSHDATA2'
+                    serialized_script.extend([CODE_TO_INT[op]])
+                    serialized_script.extend(
+                        utils.i2le_padded(len(token_bytes), 2))
+                    serialized_script.extend(token_bytes)
+
+                else:
+                    raise NotImplementedError(
+                        'Hex string too long to serialize.')
 
-    return serialized_script
+        return serialized_script
 
 
-def hex_serialize(script_string):
+def hex_serialize(script_string, network=None):
     '''
     str -> hex_str
     '''
-    return serialize(script_string).hex()
+    return serialize(script_string, network=network).hex()
 
 
-def deserialize(serialized_script):
+def iter_ops(serialized_script):
     '''
-    bytearray -> str
+    byte-like -> generator((int, memoryview, int))
+    Walks a serialized script without building any strings.
+    Yields each opcode, the data it pushes, and its offset in the script.
+    The data is None for opcodes that aren't pushes, including OP_0.
     '''
-    deserialized = []
+    buf = memoryview(serialized_script)
+    end = len(buf)
     i = 0
-    while i < len(serialized_script):
-        current_byte = serialized_script[i]
-        if current_byte == 0xab:
-            raise NotImplementedError('OP_CODESEPARATOR is a bad idea.')
-        if current_byte <= 75 and current_byte != 0:
-
-            deserialized.append(
-                serialized_script[i + 1: i + 1 + current_byte].hex())
-
-            i += 1 + current_byte
-            if i > len(serialized_script):
-                raise IndexError(
-                    'Push {} caused out of bounds exception.'
-                    .format(current_byte))
-
-        elif current_byte == 76:
+    while i < end:
+        opcode = buf[i]
+        if opcode <= 75 and opcode != 0:
+            data_start = i + 1
+            data_len = opcode
+        elif opcode == 76:
+            # next hex blob length
+            data_start = i + 2
+            data_len = buf[i + 1] if data_start <= end else 0
+        elif opcode == 77:
             # next hex blob length
-            blob_len = serialized_script[i + 1]
+            data_start = i + 3
+            data_len = (utils.le2i(buf[i + 1:data_start])
+                        if data_start <= end else 0)
+        elif opcode == 78:
+            raise NotImplementedError('OP_PUSHDATA4 is a bad idea.')
+        else:
+            yield opcode, None, i
+            i += 1
+            continue
 
-            deserialized.append(
-                serialized_script[i + 2: i + 2 + blob_len].hex())
+        data_end = data_start + data_len
+        if data_end > end:
+            raise IndexError(
+                'Push {} caused out of bounds exception.'.format(data_len))
+        yield opcode, buf[data_start:data_end], i
+        i = data_end
 
-            i += 2 + blob_len
 
-        elif current_byte == 77:
-            # next hex blob length
-            blob_len = utils.le2i(serialized_script[i + 1: i + 3])
+def op_name(opcode, network=None):
+    '''
+    int -> str
+    '''
+    with riemann.network_context(network):
+        if opcode == 0xab:
+            raise NotImplementedError('OP_CODESEPARATOR is a bad idea.')
+        if opcode in riemann.network.INT_TO_CODE_OVERWRITE:
+            return riemann.network.INT_TO_CODE_OVERWRITE[opcode]
+        if opcode in INT_TO_CODE:
+            return INT_TO_CODE[opcode]
+        raise ValueError('Unsupported opcode. Got 0x%x' % opcode)
 
-            deserialized.append(
-                serialized_script[i + 3: i + 3 + blob_len].hex())
 
-            i += 3 + blob_len
+def validate(serialized_script, network=None):
+    '''
+    byte-like -> None
+    Raises the same errors as deserialize, without building the string.
+    '''
+    with riemann.network_context(network):
+        for opcode, data, _ in iter_ops(serialized_script):
+            if data is None:
+                op_name(opcode)
 
-        elif current_byte == 78:
-            raise NotImplementedError('OP_PUSHDATA4 is a bad idea.')
 
-        else:
-            if current_byte in riemann.network.INT_TO_CODE_OVERWRITE:
-                deserialized.append(
-                    riemann.network.INT_TO_CODE_OVERWRITE[current_byte])
-            elif current_byte in INT_TO_CODE:
-                deserialized.append(INT_TO_CODE[current_byte])
+def deserialize(serialized_script, network=None):
+    '''
+    bytearray -> str
+    '''
+    with riemann.network_context(network):
+        deserialized = []
+        for opcode, data, _ in iter_ops(serialized_script):
+            if data is None:
+                deserialized.append(op_name(opcode))
             else:
-                raise ValueError(
-                    'Unsupported opcode. '
-                    'Got 0x%x' % serialized_script[i])
-            i += 1
+                deserialized.append(data.hex())
 
-    return ' '.join(deserialized)
+        return ' '.join(deserialized)
 
 
-def hex_deserialize(script_hex):
+def hex_deserialize(script_hex, network=None):
     '''
     hex_str -> str
     '''
-    return deserialize(bytes.fromhex(script_hex))
+    return deserialize(bytes.fromhex(script_hex), network=network)
@@ -0,0 +1,85 @@
+# Standard output scripts are a fixed prefix, a hash, and a fixed suffix.
+# These build and recognize them without going through script strings.
+
+# name: (prefix, hash length, suffix)
+TEMPLATES = {
+    # OP_DUP OP_HASH160 PUSH_20 {pkh} OP_EQUALVERIFY OP_CHECKSIG
+    'p2pkh': (b'\x76\xa9\x14', 20, b'\x88\xac'),
+    # OP_HASH160 PUSH_20 {script_hash} OP_EQUAL
+    'p2sh': (b'\xa9\x14', 20, b'\x87'),
+    # OP_0 PUSH_20 {pkh}
+    'p2wpkh': (b'\x00\x14', 20, b''),
+    # OP_0 PUSH_32 {script_hash}
+    'p2wsh': (b'\x00\x20', 32, b''),
+}
+
+# Every template has a different length, so length picks the candidate
+_BY_LENGTH = {
+    len(prefix) + hash_len + len(suffix): (name, prefix, suffix)
+    for name, (prefix, hash_len, suffix) in TEMPLATES.items()}
+
+
+def build(name, hash_bytes):
+    '''
+    str, byte-like -> bytearray
+    Fills a template with a hash.
+    '''
+    try:
+        prefix, hash_len, suffix = TEMPLATES[name]
+    except KeyError:
+        raise ValueError('Unknown script template. Got: {}'.format(name))
+
+    if len(hash_bytes) != hash_len:
+        raise ValueError(
+            'Expected {} byte hash for {}. Got {} bytes.'
+            .format(hash_len, name, len(hash_bytes)))
+
+    script = bytearray(prefix)
+    script.extend(hash_bytes)
+    script.extend(suffix)
+    return script
+
+
+def match(script):
+    '''
+    byte-like -> (str, bytes)
+    Returns the template name and the hash if the script is standard.
+    None otherwise.
+    '''
+    try:
+        name, prefix, suffix = _BY_LENGTH[len(script)]
+    except KeyError:
+        return None
+
+    script = bytes(script)
+    if not script.startswith(prefix) or not script.endswith(suffix):
+        return None
+    return name, script[len(prefix):len(script) - len(suffix)]
+
+
+def p2pkh(pubkey_hash):
+    '''
+    byte-like -> bytearray
+    '''
+    return build('p2pkh', pubkey_hash)
+
+
+def p2sh(script_hash):
+    '''
+    byte-like -> bytearray
+    '''
+    return build('p2sh', script_hash)
+
+
+def p2wpkh(pubkey_hash):
+    '''
+    byte-like -> bytearray
+    '''
+    return build('p2wpkh', pubkey_hash)
+
+
+def p2wsh(script_hash):
+    '''
+    byte-like -> bytearray
+    '''
+    return build('p2wsh', script_hash)
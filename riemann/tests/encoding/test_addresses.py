@@ -47,6 +47,30 @@ class TestAddresses(unittest.TestCase):
         a = addr.make_p2wpkh_address(helpers.P2WPKH_ADDR['pubkey'])
         self.assertEqual(a, helpers.P2WPKH_ADDR['address'])
 
+    def test_network_param(self):
+        pubkey = helpers.P2WPKH_ADDR['pubkey']
+        riemann.select_network('litecoin_main')
+        expected = addr.make_p2wpkh_address(pubkey)
+        output_script = addr.to_output_script(expected)
+
+        riemann.select_network('bitcoin_main')
+        a = addr.make_p2wpkh_address(pubkey, network='litecoin_main')
+        self.assertEqual(a, expected)
+        self.assertEqual(
+            addr.to_output_script(a, network='litecoin_main'),
+            output_script)
+        self.assertEqual(
+            addr.from_output_script(output_script, network='litecoin_main'),
+            expected)
+        self.assertEqual(addr.parse_hash(a, network='litecoin_main'),
+                         helpers.P2WPKH_ADDR['pkh'])
+
+        # The default network is untouched
+        self.assertEqual(addr.make_p2wpkh_address(pubkey),
+                         helpers.P2WPKH_ADDR['address'])
+        with self.assertRaises(ValueError):
+            addr.parse(a)
+
     def test_parse(self):
         self.assertEqual(addr.parse(helpers.OP_IF['p2sh']),
                          b'\x05' + helpers.OP_IF['script_hash'])
@@ -100,6 +124,44 @@ class TestAddresses(unittest.TestCase):
             addr.parse_hash(helpers.CASHADDR['p2pkh']),
             utils.hash160(helpers.CASHADDR['pubkey']))
 
+    def test_classify(self):
+        self.assertEqual(
+            addr.classify(helpers.ADDR[0]['p2pkh']),
+            ('p2pkh', None, helpers.PK['ser'][0]['pkh'], 'bitcoin_main'))
+        self.assertEqual(
+            addr.classify(helpers.OP_IF['p2sh']),
+            ('p2sh', None, helpers.OP_IF['script_hash'], 'bitcoin_main'))
+        self.assertEqual(
+            addr.classify(helpers.P2WPKH_ADDR['address'].upper()),
+            ('p2wpkh', 0, helpers.P2WPKH_ADDR['pkh'], 'bitcoin_main'))
+
+        res = addr.classify(helpers.P2WSH['human']['ins'][0]['addr'])
+        self.assertEqual(res.type, 'p2wsh')
+        self.assertEqual(res.witness_version, 0)
+        self.assertEqual(
+            res.hash, helpers.P2WSH['ser']['ins'][0]['pk_script'][2:])
+
+        res = addr.classify(
+            'bc1pw508d6qejxtdg4y5r3zarvary0c5xw7kw508d6qejxtdg4y5r3zarvary0c5'
+            'xw7k7grplx')
+        self.assertEqual(res.type, 'witness')
+        self.assertEqual(res.witness_version, 1)
+        self.assertEqual(len(res.hash), 40)
+
+        res = addr.classify(helpers.OP_IF['cashaddr'],
+                            network='bitcoin_cash_main')
+        self.assertEqual(
+            res,
+            ('p2sh', None, helpers.OP_IF['script_hash'], 'bitcoin_cash_main'))
+
+        with self.assertRaises(ValueError) as context:
+            addr.classify('1111111111111111111111111111111111177fdsQ')
+        self.assertIn('Unknown address type', str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            addr.classify(helpers.OP_IF['cashaddr'])
+        self.assertIn('Unsupported address format', str(context.exception))
+
     def test_cashaddrs(self):
         riemann.select_network('bitcoin_cash_main')
 
@@ -182,3 +244,52 @@ class TestAddresses(unittest.TestCase):
         self.assertEqual(
             addr.to_output_script(helpers.ADDR[0]['p2pkh_cashaddr']),
             helpers.PK['ser'][0]['pkh_output'])
+
+    def test_cache(self):
+        riemann.select_network('bitcoin_main')
+        self.assertEqual(addr.cache_info(), {})
+        addr.enable_cache(maxsize=8)
+        self.addCleanup(addr.disable_cache)
+
+        output_script = helpers.PK['ser'][0]['pkh_output']
+        for _ in range(3):
+            self.assertEqual(
+                addr.from_output_script(output_script),
+                helpers.ADDR[0]['p2pkh'])
+            self.assertEqual(
+                addr.to_output_script(helpers.ADDR[0]['p2pkh']),
+                output_script)
+        info = addr.cache_info()
+        self.assertEqual(info['from_output_script'].hits, 2)
+        self.assertEqual(info['from_output_script'].misses, 1)
+        self.assertEqual(info['to_output_script'].hits, 2)
+        self.assertEqual(info['to_output_script'].misses, 1)
+
+        # Cached results can't be changed by callers
+        parsed = addr.parse(helpers.P2WPKH_ADDR['address'])
+        parsed[0] = 0xff
+        self.assertNotEqual(addr.parse(helpers.P2WPKH_ADDR['address']),
+                            parsed)
+        script = addr.to_output_script(helpers.P2WPKH_ADDR['address'])
+        script[0] = 0xff
+        self.assertEqual(
+            addr.to_output_script(helpers.P2WPKH_ADDR['address']),
+            helpers.P2WPKH_ADDR['output'])
+
+        # Networks get their own entries
+        self.assertNotEqual(
+            addr.from_output_script(output_script, network='bitcoin_test'),
+            helpers.ADDR[0]['p2pkh'])
+        self.assertEqual(addr.cache_info()['from_output_script'].misses, 2)
+
+        # Bad input is never cached
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                addr.parse('1P86rvoC4bTympTEdXnw9HhWVxb4')
+        self.assertEqual(addr.cache_info()['parse'].currsize, 1)
+
+        addr.cache_clear()
+        self.assertEqual(addr.cache_info()['parse'].currsize, 0)
+        addr.disable_cache()
+        self.assertEqual(addr.cache_info(), {})
+        addr.cache_clear()
@@ -62,3 +62,52 @@ class TestBase58(unittest.TestCase):
             addr_hash.extend(addr[1])
             addr_hash.extend(addr[2])
             self.assertEqual(expected, base58.encode(addr_hash))
+
+    def test_leading_zeros(self):
+        for data in [b'', b'\x00', b'\x00' * 5, b'\x00\x00\x01',
+                     b'\x00' + bytes(range(1, 40)), b'\xff' * 78]:
+            encoded = base58.encode(data, False)
+            v, prefix = base58.to_long(256, lambda x: x, data)
+            self.assertEqual(
+                encoded,
+                base58.from_long(
+                    v, prefix, 58,
+                    lambda v: base58.BASE58_ALPHABET[v]).decode())
+            self.assertEqual(base58.decode(encoded, False), data)
+            self.assertEqual(
+                base58.decode(base58.encode(data)), data)
+
+    def test_decode_bad_character(self):
+        with self.assertRaises(ValueError) as context:
+            base58.decode('1P86rvoC4bTympTEdXnw9HhWVx0b4')
+
+        self.assertIn('bad character 48', str(context.exception))
+
+        # These raised KeyError before decoding moved to a translate table
+        for bad in ['0', 'l', 'O', 'I']:
+            with self.assertRaises(ValueError) as context:
+                base58.decode('1P86rvoC4bTympTEdXnw9HhWVx{}b4'.format(bad),
+                              checksum=False)
+            self.assertIn('bad character {}'.format(ord(bad)),
+                          str(context.exception))
+            self.assertFalse(
+                base58.has_checksum('1P86rvoC4bTympTEdXnw9HhWVx{}b4'
+                                    .format(bad)))
+
+    def test_many(self):
+        data = [b'\x00' + helpers.PK['ser'][0]['pkh'], b'\x05' * 21]
+        encoded = base58.encode_many(data)
+        self.assertEqual(encoded[0], helpers.ADDR[0]['p2pkh'])
+        self.assertEqual(encoded, [base58.encode(d) for d in data])
+        self.assertEqual(base58.decode_many(encoded), data)
+        self.assertEqual(
+            base58.decode_many(base58.encode_many(data, False), False),
+            data)
+
+        with self.assertRaises(ValueError):
+            base58.decode_many(['1P86rvoC4bTympTEdXnw9HhWVxb4'])
+
+        riemann.select_network('decred_main')
+        addr = DCR_ADDR[0]
+        self.assertEqual(base58.encode_many([addr[1] + addr[2]]), [addr[0]])
+        self.assertEqual(base58.decode_many([addr[0]]), [addr[1] + addr[2]])
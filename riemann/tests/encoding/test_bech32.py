@@ -159,3 +159,35 @@ class TestBech32(unittest.TestCase):
 
     def test_convert_bits_error(self):
         self.assertIsNone(bech32.convertbits([2 ** 5 + 1], 5, 8))
+
+    def test_polymod_table(self):
+        def reference_polymod(values):
+            chk = 1
+            for value in values:
+                top = chk >> 25
+                chk = (chk & 0x1ffffff) << 5 ^ value
+                for i in range(5):
+                    chk ^= bech32.GENERATOR[i] if ((top >> i) & 1) else 0
+            return chk
+        values = list(range(32)) * 3
+        self.assertEqual(
+            bech32.bech32_polymod(values), reference_polymod(values))
+
+    def test_many(self):
+        script = bytes.fromhex(VALID_ADDRESS[0][1])
+        self.assertEqual(
+            bech32.encode_many([script, script]),
+            [VALID_ADDRESS[0][0].lower()] * 2)
+        self.assertEqual(
+            bech32.verify_many([VALID_ADDRESS[0][0]] + INVALID_ADDRESS),
+            [True] + [False] * len(INVALID_ADDRESS))
+
+        with self.assertRaises(ValueError) as context:
+            bech32.decode(INVALID_ADDRESS[1])
+        self.assertIn('Invalid bech32 address', str(context.exception))
+
+        riemann.select_network('zcash_sprout_main')
+        with self.assertRaises(ValueError):
+            bech32.encode_many([script])
+        with self.assertRaises(ValueError):
+            bech32.verify_many([VALID_ADDRESS[0][0]])
@@ -0,0 +1,53 @@
+import unittest
+import riemann
+from .. import helpers
+from ...encoding import cashaddr
+
+
+class TestCashaddr(unittest.TestCase):
+
+    def setUp(self):
+        riemann.select_network('bitcoin_cash_main')
+
+    def tearDown(self):
+        riemann.select_network('bitcoin_main')
+
+    def test_round_trip(self):
+        addr = helpers.ADDR[0]['p2pkh_cashaddr']
+        data = cashaddr.decode(addr)
+        self.assertEqual(cashaddr.encode(data), addr)
+        self.assertEqual(cashaddr.b32encode(cashaddr.b32decode('qpzry')),
+                         'qpzry')
+
+    def test_decode_errors(self):
+        addr = helpers.ADDR[0]['p2pkh_cashaddr']
+        with self.assertRaises(ValueError) as context:
+            cashaddr.decode(addr[:-1] + 'q')
+        self.assertIn('Bad cash address checksum', str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            cashaddr.decode(addr[:-1] + 'b')  # not in the charset
+        self.assertIn('Bad cash address checksum', str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            cashaddr.decode('bchtest:' + addr.split(':')[1])
+        self.assertIn('Cannot locate prefix', str(context.exception))
+
+    def test_many(self):
+        addrs = [helpers.ADDR[0]['p2pkh_cashaddr'],
+                 helpers.OP_IF['cashaddr']]
+        data = [cashaddr.decode(a) for a in addrs]
+        self.assertEqual(cashaddr.encode_many(data), addrs)
+        self.assertEqual(
+            cashaddr.verify_many(
+                addrs + [addrs[0][:-1] + 'q', addrs[0].split(':')[1]]),
+            [True, True, False, False])
+
+    def test_network_errors(self):
+        riemann.select_network('bitcoin_main')
+        with self.assertRaises(ValueError) as context:
+            cashaddr.encode_many([b'\x00' * 21])
+        self.assertIn('does not support cashaddresses',
+                      str(context.exception))
+        with self.assertRaises(ValueError):
+            cashaddr.verify_many([helpers.ADDR[0]['p2pkh_cashaddr']])
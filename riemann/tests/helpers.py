@@ -689,3 +689,48 @@ CASHADDR = {
 # https://blockchain.info/rawtx/0739d0c7b7b7ff5f991e8e3f72a6f5eb56563880df982c4ab813cd71bc7a6a03?format=hex
 
 RAW_P2SH_TO_P2PKH = bytes.fromhex( '010000000101d15c2cc4621b2a319ba53714e2709f8ba2dbaf23f8c35a4bddcb203f9b391000000000df473044022000e02ea97289a35181a9bfabd324f12439410db11c4e94978cdade6a665bf1840220458b87c34d8bb5e4d70d01041c7c2d714ea8bfaca2c2d2b1f9e5749c3ee17e3d012102ed0851f0b4c4458f80e0310e57d20e12a84642b8e097fe82be229edbd7dbd53920f6665740b1f950eb58d646b1fae9be28cef842da5e51dc78459ad2b092e7fd6e514c5163a914bb408296de2420403aa79eb61426bb588a08691f8876a91431b31321831520e346b069feebe6e9cf3dd7239c670400925e5ab17576a9140d22433293fe9652ea00d21c5061697aef5ddb296888ac0000000001d0070000000000001976a914f2539f42058da784a9d54615ad074436cf3eb85188ac00000000')
+
+# Bitcoin mainnet genesis block
+# https://en.bitcoin.it/wiki/Genesis_block
+GENESIS_BLOCK = {
+        'header': bytes.fromhex('0100000000000000000000000000000000000000000000000000000000000000000000003ba3edfd7a7b12b27ac72c3e67768f617fc81bc3888a51323a9fb8aa4b1e5e4a29ab5f49ffff001d1dac2b7c'),
+        'block_hash': bytes.fromhex('000000000019d6689c085ae165831e934ff763ae46a2a6c172b3f1b60a8ce26f'),
+        'merkle_root': bytes.fromhex('3ba3edfd7a7b12b27ac72c3e67768f617fc81bc3888a51323a9fb8aa4b1e5e4a'),
+        'timestamp': bytes.fromhex('29ab5f49'),
+        'nbits': bytes.fromhex('ffff001d'),
+        'nonce': bytes.fromhex('1dac2b7c'),
+        'coinbase': bytes.fromhex('01000000010000000000000000000000000000000000000000000000000000000000000000ffffffff4d04ffff001d0104455468652054696d65732030332f4a616e2f32303039204368616e63656c6c6f72206f6e206272696e6b206f66207365636f6e64206261696c6f757420666f722062616e6b73ffffffff0100f2052a01000000434104678afdb0fe5548271967f1a67130b7105cd6a828e03909a67962e0ea1f61deb649f6bc3f4cef38c4f35504e51ec112de5c384df7ba0b8d578a4c702b6bf11d5fac00000000')
+        }
+GENESIS_BLOCK['block'] = \
+    GENESIS_BLOCK['header'] + b'\x01' + GENESIS_BLOCK['coinbase']
+
+# A segwit tx that is valid in a block but that riemann won't build:
+#   an inscription-sized witness item, a long OP_RETURN output script,
+#   and more than 100kB in total
+LARGE_WITNESS_TX = {
+        'witness_item': bytes(range(256)) * 400,
+        'output_script': b'\x6a\x4d\x29\x01' + b'\xab' * 297,
+        }
+LARGE_WITNESS_TX['tx_ins'] = (
+    b'\x01'
+    + bytes.fromhex('1f' * 32) + b'\x00\x00\x00\x00'
+    + b'\x00'
+    + b'\xfd\xff\xff\xff')
+LARGE_WITNESS_TX['tx_outs'] = (
+    b'\x01'
+    + b'\x00' * 8
+    + b'\xfd\x2d\x01' + LARGE_WITNESS_TX['output_script'])
+LARGE_WITNESS_TX['no_witness'] = (
+    b'\x02\x00\x00\x00'
+    + LARGE_WITNESS_TX['tx_ins']
+    + LARGE_WITNESS_TX['tx_outs']
+    + b'\x00\x00\x00\x00')
+LARGE_WITNESS_TX['tx'] = (
+    b'\x02\x00\x00\x00' + b'\x00\x01'
+    + LARGE_WITNESS_TX['tx_ins']
+    + LARGE_WITNESS_TX['tx_outs']
+    + b'\x02'
+    + b'\x01\x01'
+    + b'\xfe' + (102400).to_bytes(4, 'little')
+    + LARGE_WITNESS_TX['witness_item']
+    + b'\x00\x00\x00\x00')
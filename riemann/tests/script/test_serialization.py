@@ -103,6 +103,54 @@ class TestSerialization(unittest.TestCase):
             'Unsupported opcode. Got 0xfe',
             str(context.exception))
 
+    def test_deserialize_truncated_pushdata(self):
+        with self.assertRaises(IndexError) as context:
+            ser.deserialize(b'\x4c\x05\x00')
+        self.assertIn(
+            'Push 5 caused out of bounds exception.',
+            str(context.exception))
+
+        with self.assertRaises(IndexError):
+            ser.deserialize(b'\x51\x4d\x00')
+
+    def test_iter_ops(self):
+        script = helpers.MSIG_2_2['ser_script']
+        ops = list(ser.iter_ops(script))
+        self.assertEqual(len(ops), 5)
+        self.assertEqual(ops[0], (0x52, None, 0))
+        self.assertEqual(ops[1][0], 0x41)
+        self.assertEqual(bytes(ops[1][1]), script[2:67])
+        self.assertEqual(ops[1][2], 1)
+        self.assertEqual(ops[2][2], 67)
+        self.assertEqual(ops[-1], (0xae, None, len(script) - 1))
+
+        pd2 = helpers.P2SH_PD2['ser']['ins'][0]['script_sig']
+        *_, (opcode, data, offset) = ser.iter_ops(pd2)
+        self.assertEqual(opcode, 77)
+        self.assertEqual(offset + 3 + len(data), len(pd2))
+
+        # Opcodes pass through without a network lookup
+        self.assertEqual(list(ser.iter_ops(b'\xab\xfe')),
+                         [(0xab, None, 0), (0xfe, None, 1)])
+
+        with self.assertRaises(NotImplementedError):
+            list(ser.iter_ops(b'\x4e'))
+
+    def test_op_name(self):
+        self.assertEqual(ser.op_name(0xa8), 'OP_SHA256')
+        self.assertEqual(ser.op_name(0xa8, network='decred_main'),
+                         'OP_BLAKE256')
+        with self.assertRaises(ValueError):
+            ser.op_name(0xfe)
+
+    def test_validate(self):
+        ser.validate(helpers.MSIG_2_2['ser_script'])
+        with self.assertRaises(NotImplementedError):
+            ser.validate(b'\x51\xab')
+        with self.assertRaises(ValueError):
+            ser.validate(b'\xc0')
+        ser.validate(b'\xc0', network='decred_main')
+
     def test_hex_deserialize(self):
         self.assertEqual(
             helpers.MSIG_2_2['redeem_script'],
@@ -0,0 +1,53 @@
+import unittest
+from riemann.script import templates
+from riemann.script import serialization as ser
+
+
+class TestTemplates(unittest.TestCase):
+
+    def test_build(self):
+        pkh = bytes(range(20))
+        sh = bytes(range(32))
+
+        self.assertEqual(
+            templates.p2pkh(pkh),
+            ser.serialize('OP_DUP OP_HASH160 {} OP_EQUALVERIFY OP_CHECKSIG'
+                          .format(pkh.hex())))
+        self.assertEqual(
+            templates.p2sh(pkh),
+            ser.serialize('OP_HASH160 {} OP_EQUAL'.format(pkh.hex())))
+        self.assertEqual(
+            templates.p2wpkh(pkh),
+            ser.serialize('OP_0 {}'.format(pkh.hex())))
+        self.assertEqual(
+            templates.p2wsh(sh),
+            ser.serialize('OP_0 {}'.format(sh.hex())))
+        self.assertIsInstance(templates.p2pkh(pkh), bytearray)
+
+    def test_build_errors(self):
+        with self.assertRaises(ValueError) as context:
+            templates.p2pkh(b'\x00' * 32)
+        self.assertIn('Expected 20 byte hash for p2pkh. Got 32 bytes.',
+                      str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            templates.build('p2tr', b'\x00' * 32)
+        self.assertIn('Unknown script template. Got: p2tr',
+                      str(context.exception))
+
+    def test_match(self):
+        pkh = bytes(range(20))
+        sh = bytes(range(32))
+        for name, hash_bytes in [('p2pkh', pkh), ('p2sh', pkh),
+                                 ('p2wpkh', pkh), ('p2wsh', sh)]:
+            script = templates.build(name, hash_bytes)
+            self.assertEqual(templates.match(script), (name, hash_bytes))
+            self.assertEqual(
+                templates.match(memoryview(bytes(script))),
+                (name, hash_bytes))
+
+        self.assertIsNone(templates.match(b''))
+        self.assertIsNone(templates.match(b'\x51\x20' + sh))
+        self.assertIsNone(
+            templates.match(b'\x76\xa9\x14' + pkh + b'\x88\xad'))
+        self.assertIsNone(templates.match(ser.serialize('OP_IF')))
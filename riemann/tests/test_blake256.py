@@ -1,7 +1,7 @@
 # flake8: noqa
 
 import unittest
-from ..blake256 import blake_hash
+from ..blake256 import blake_hash, new
 
 TEST_VECTORS = [
     ["716f6e863f744b9ac22c97ec7b76ea5f5908bc5b2f67c61510bfc4751384ea7a", ""],
@@ -46,3 +46,45 @@ class TestBlake(unittest.TestCase):
     def test_blake(self):
         for vectorSet in TEST_VECTORS:
             self.assertEqual(vectorSet[0], blake_hash(vectorSet[1]).hex())
+
+    def test_blake_padding_boundaries(self):
+        # Lengths around the 55 and 64 byte padding edge cases
+        vectors = [
+            (55, 'd7ec78bc615d99e41d371cf6401449969144b5f789bde014a9aeafd8987257f2'),
+            (56, '26ca422697c9fabc642129b1a5669be07fb0a3c31f14f1c7859e048ad5958e44'),
+            (63, 'cfce445066d35322557b432540bd2f0af4caf9f426568236d9944426a5df792a'),
+            (64, '4432b2c1e983b0c326583516920f3949c2acf5d85a99353601228cab40c867bc'),
+            (65, '106cdd00dc14e257b1130d026b9fcc2c5ecbaae08fec13af0002ad6054c7bbd5'),
+            (119, '7271691baf3f4ea7795006522897316eccd614816fa4fe10c546c11e882ac016'),
+            (128, '70a7b33d6d251c06757362fa717d0b19ceb0ebdccf48300a98156b5bb6b8c9a5')]
+        for length, digest in vectors:
+            data = bytes(range(length))
+            self.assertEqual(blake_hash(data).hex(), digest)
+            self.assertEqual(blake_hash(bytearray(data)).hex(), digest)
+            self.assertEqual(blake_hash(memoryview(data)).hex(), digest)
+
+    def test_streaming(self):
+        data = bytes(range(256)) * 2
+        for chunk in [1, 7, 55, 63, 64, 65, 200]:
+            h = new()
+            for i in range(0, len(data), chunk):
+                h.update(data[i:i + chunk])
+            self.assertEqual(h.digest(), blake_hash(data))
+            self.assertEqual(h.hexdigest(), blake_hash(data).hex())
+        self.assertEqual(new(b'abc').digest(), blake_hash('abc'))
+        self.assertEqual(new().name, 'blake256')
+        self.assertEqual(new().digest_size, 32)
+        self.assertEqual(new().block_size, 64)
+        with self.assertRaises(TypeError):
+            new().update('abc')
+
+    def test_copy(self):
+        h = new(b'\x00' * 70)
+        c = h.copy()
+        h.update(b'abc')
+        self.assertEqual(c.digest(), blake_hash(b'\x00' * 70))
+        self.assertEqual(h.digest(), blake_hash(b'\x00' * 70 + b'abc'))
+
+        # digest doesn't end the hasher
+        h.update(b'def')
+        self.assertEqual(h.digest(), blake_hash(b'\x00' * 70 + b'abcdef'))
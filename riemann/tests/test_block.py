@@ -0,0 +1,224 @@
+import io
+import os
+import copy
+import pickle
+import riemann
+import tempfile
+import unittest
+from riemann import block
+from riemann import utils
+from riemann.tests import helpers
+
+
+class TestBlockHeader(unittest.TestCase):
+
+    def test_from_bytes(self):
+        header = block.BlockHeader.from_bytes(
+            helpers.GENESIS_BLOCK['header'])
+        self.assertEqual(header, helpers.GENESIS_BLOCK['header'])
+        self.assertEqual(header.version, b'\x01\x00\x00\x00')
+        self.assertEqual(header.prev_block, b'\x00' * 32)
+        self.assertEqual(header.merkle_root,
+                         helpers.GENESIS_BLOCK['merkle_root'])
+        self.assertEqual(header.timestamp, helpers.GENESIS_BLOCK['timestamp'])
+        self.assertEqual(header.nbits, helpers.GENESIS_BLOCK['nbits'])
+        self.assertEqual(header.nonce, helpers.GENESIS_BLOCK['nonce'])
+        self.assertEqual(header.block_hash,
+                         helpers.GENESIS_BLOCK['block_hash'])
+
+    def test_copy(self):
+        header = block.BlockHeader.from_bytes(
+            helpers.GENESIS_BLOCK['header'])
+        copy = header.copy(nonce=b'\x00' * 4)
+        self.assertEqual(copy.version, header.version)
+        self.assertEqual(copy.nonce, b'\x00' * 4)
+        self.assertNotEqual(copy.block_hash, header.block_hash)
+
+    def test_bad_length(self):
+        with self.assertRaises(ValueError) as context:
+            block.BlockHeader.from_bytes(b'\x00' * 79)
+        self.assertIn('Expected byte-like object with length 4. ',
+                      str(context.exception))
+
+
+class TestBlock(unittest.TestCase):
+
+    def setUp(self):
+        self.txs = [helpers.P2PKH1['ser']['tx']['signed'],
+                    helpers.P2WSH['ser']['tx']['signed'],
+                    helpers.P2SH['ser']['tx']['signed']]
+        self.raw = (helpers.GENESIS_BLOCK['header']
+                    + bytes([len(self.txs)])
+                    + b''.join(self.txs))
+
+    def test_genesis(self):
+        b = block.Block.from_hex(helpers.GENESIS_BLOCK['block'].hex())
+        self.assertEqual(b, helpers.GENESIS_BLOCK['block'])
+        self.assertEqual(b.header.block_hash,
+                         helpers.GENESIS_BLOCK['block_hash'])
+        self.assertEqual(b.tx_count, 1)
+
+        txs = list(b.iter_txs())
+        self.assertEqual(len(txs), 1)
+        self.assertEqual(txs[0], helpers.GENESIS_BLOCK['coinbase'])
+        # The merkle root of a 1 tx block is that tx's id
+        self.assertEqual(txs[0].tx_id_le, b.header.merkle_root)
+
+    def test_iter_txs(self):
+        b = block.Block.from_bytes(self.raw)
+        self.assertEqual(b.tx_count, 3)
+        for t, expected in zip(b.iter_txs(), self.txs):
+            self.assertEqual(t, expected)
+
+    def test_iter_txs_large(self):
+        large = helpers.LARGE_WITNESS_TX
+        raw = (helpers.GENESIS_BLOCK['header'] + b'\x02'
+               + large['tx'] + self.txs[0])
+        b = block.Block.from_bytes(raw)
+
+        txs = list(b.iter_txs())
+        self.assertEqual(txs[0], large['tx'])
+        self.assertEqual(txs[0].tx_id_le, utils.hash256(large['no_witness']))
+        self.assertEqual(txs[0].tx_outs[0].output_script,
+                         large['output_script'])
+        self.assertEqual(txs[0].tx_witnesses[0].stack[1].item,
+                         large['witness_item'])
+        self.assertEqual(txs[1], self.txs[0])
+
+        with self.assertRaises(NotImplementedError):
+            next(b.iter_txs(validate=True))
+
+    def test_iter_txs_lazy(self):
+        # corrupt the last tx. iteration only fails once it gets there
+        b = block.Block.from_bytes(self.raw[:-30])
+        txs = b.iter_txs()
+        self.assertEqual(next(txs), self.txs[0])
+        self.assertEqual(next(txs), self.txs[1])
+        with self.assertRaises((IndexError, ValueError)):
+            next(txs)
+
+    def test_no_copy(self):
+        buf = memoryview(self.raw)
+        b = block.Block(buf)
+        self.assertIs(b._buf.obj, self.raw)
+        self.assertEqual(len(b), len(self.raw))
+
+        # bytearrays are copied so the caller can still resize them
+        raw = bytearray(self.raw)
+        b = block.Block(raw)
+        raw.extend(b'\x00')
+        self.assertEqual(b, self.raw)
+
+    def test_byte_data_methods(self):
+        b = block.Block(memoryview(self.raw))
+        self.assertEqual(b[0:4], self.raw[0:4])
+        self.assertIsInstance(b[0:4], bytes)
+        self.assertEqual(b[80], 3)
+        self.assertEqual(b.find(self.txs[1]), self.raw.find(self.txs[1]))
+        self.assertEqual(b.find(b'\xde\xad\xbe\xef\xde\xad'), -1)
+        self.assertEqual(b.to_bytes(), self.raw)
+        self.assertEqual(b.hex(), self.raw.hex())
+        self.assertEqual(b.serialized_size(), len(self.raw))
+        self.assertEqual(b, block.Block(self.raw))
+        self.assertNotEqual(b, self.raw[:-1])
+
+        stream = io.BytesIO()
+        self.assertEqual(b.write_to(stream), len(self.raw))
+        self.assertEqual(stream.getvalue(), self.raw)
+
+        for dup in [pickle.loads(pickle.dumps(b)), copy.deepcopy(b)]:
+            self.assertEqual(dup, self.raw)
+            self.assertEqual(dup.header, b.header)
+            self.assertEqual(dup.tx_count, 3)
+            self.assertEqual(list(dup.iter_txs()), self.txs)
+
+        with self.assertRaises(TypeError) as context:
+            b == 'hello world'
+        self.assertIn('Equality not supported for Block and ',
+                      str(context.exception))
+
+    def test_bad_input(self):
+        with self.assertRaises(ValueError) as context:
+            block.Block('hello world')
+        self.assertIn('Expected byte-like object. ', str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            block.Block(b'\x00' * 80)
+        self.assertIn('Block is too short. ', str(context.exception))
+
+    def test_immutable(self):
+        b = block.Block(self.raw)
+        with self.assertRaises(TypeError):
+            b.tx_count = 4
+
+
+class TestBlockFile(unittest.TestCase):
+
+    def setUp(self):
+        self.raw = helpers.GENESIS_BLOCK['block']
+        record = (b'\xf9\xbe\xb4\xd9'
+                  + len(self.raw).to_bytes(4, 'little')
+                  + self.raw)
+        fd, self.path = tempfile.mkstemp(suffix='.dat')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(record * 3 + b'\x00' * 100)
+
+    def tearDown(self):
+        riemann.select_network('bitcoin_main')
+        os.remove(self.path)
+
+    def test_iter_file_blocks(self):
+        blocks = list(block.iter_file_blocks(self.path))
+        self.assertEqual(len(blocks), 3)
+        for b in blocks:
+            self.assertEqual(b, self.raw)
+            self.assertEqual(b.header.block_hash,
+                             helpers.GENESIS_BLOCK['block_hash'])
+
+    def test_iter_file_txs(self):
+        txs = list(block.iter_file_txs(self.path))
+        self.assertEqual(len(txs), 3)
+        for t in txs:
+            self.assertEqual(t, helpers.GENESIS_BLOCK['coinbase'])
+
+    def test_iter_file_txs_large(self):
+        large = helpers.LARGE_WITNESS_TX
+        raw = (helpers.GENESIS_BLOCK['header'] + b'\x02'
+               + large['tx'] + helpers.GENESIS_BLOCK['coinbase'])
+        with open(self.path, 'wb') as f:
+            f.write(b'\xf9\xbe\xb4\xd9' + len(raw).to_bytes(4, 'little')
+                    + raw
+                    + b'\xf9\xbe\xb4\xd9' + len(self.raw).to_bytes(4, 'little')
+                    + self.raw)
+
+        txs = list(block.iter_file_txs(self.path))
+        self.assertEqual(txs, [large['tx'],
+                               helpers.GENESIS_BLOCK['coinbase'],
+                               helpers.GENESIS_BLOCK['coinbase']])
+
+    def test_empty_file(self):
+        with open(self.path, 'wb'):
+            pass
+        self.assertEqual(list(block.iter_file_blocks(self.path)), [])
+
+    def test_wrong_magic(self):
+        riemann.select_network('bitcoin_test')
+        with self.assertRaises(ValueError) as context:
+            next(block.iter_file_blocks(self.path))
+        self.assertIn('Bad magic bytes at offset 0. Expected 0b110907. ',
+                      str(context.exception))
+
+    def test_no_magic(self):
+        riemann.select_network('decred_main')
+        with self.assertRaises(ValueError) as context:
+            next(block.iter_file_blocks(self.path))
+        self.assertIn('does not specify block file magic bytes.',
+                      str(context.exception))
+
+    def test_truncated(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'\xf9\xbe\xb4\xd9\xff\xff\x00\x00' + self.raw)
+        with self.assertRaises(ValueError) as context:
+            list(block.iter_file_blocks(self.path))
+        self.assertIn('runs past the end of the file.',
+                      str(context.exception))
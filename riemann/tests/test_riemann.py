@@ -1,3 +1,5 @@
+import asyncio
+import threading
 import unittest
 import riemann
 from riemann import networks
@@ -24,5 +26,60 @@ class test_riemann(unittest.TestCase):
             riemann.select_network(n)
             self.assertEqual(riemann.get_current_network_name(), n)
 
+    def test_network_context(self):
+        with riemann.network_context('litecoin_main') as network:
+            self.assertIs(network, networks.SUPPORTED['litecoin_main'])
+            self.assertIs(riemann.network, network)
+            self.assertEqual(riemann.get_current_network_name(),
+                             'litecoin_main')
+
+            with riemann.network_context('bitcoin_test'):
+                self.assertIs(riemann.network,
+                              networks.SUPPORTED['bitcoin_test'])
+
+            with riemann.network_context(None):
+                self.assertIs(riemann.network, network)
+
+            # The default doesn't leak into an active context
+            riemann.select_network('zcash_sprout_main')
+            self.assertIs(riemann.network, network)
+
+        self.assertIs(riemann.network, networks.SUPPORTED['zcash_sprout_main'])
+
+        with self.assertRaises(ValueError):
+            with riemann.network_context('not_a_network'):
+                pass
+
+    def test_network_context_threads(self):
+        seen = {}
+
+        def worker(name):
+            with riemann.network_context(name):
+                barrier.wait()
+                seen[name] = riemann.get_current_network_name()
+
+        names = ['bitcoin_main', 'litecoin_main', 'bitcoin_cash_main']
+        barrier = threading.Barrier(len(names))
+        threads = [threading.Thread(target=worker, args=(n,)) for n in names]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(seen, {n: n for n in names})
+
+    def test_network_context_tasks(self):
+        async def task(name):
+            with riemann.network_context(name):
+                await asyncio.sleep(0)
+                return riemann.get_current_network_name()
+
+        async def main():
+            return await asyncio.gather(task('bitcoin_test'),
+                                        task('litecoin_test'))
+
+        self.assertEqual(asyncio.run(main()),
+                         ['bitcoin_test', 'litecoin_test'])
+
     def tearDown(self):
         riemann.select_network('bitcoin_main')
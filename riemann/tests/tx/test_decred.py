@@ -280,6 +280,13 @@ class TestDecredInputWitness(DecredTestCase):
         self.assertEqual(res, copy)
         self.assertIsNot(res, copy)
 
+    def test_from_bytes(self):
+        witness = helpers.DCR['ser']['witnesses'][0]['witness']
+        res = tx.DecredInputWitness.from_bytes(b'\x00' + witness, 1)
+        self.assertEqual(res, witness)
+        self.assertEqual(res.script_sig,
+                         self.stack_script + self.redeem_script)
+
 
 class TestDecredTx(DecredTestCase):
 
@@ -519,6 +526,45 @@ class TestDecredTx(DecredTestCase):
         self.assertEqual(res, copy)
         self.assertIsNot(res, copy)
 
+    def test_from_bytes(self):
+        for raw in [helpers.DCR['ser']['tx']['p2sh_2_p2pkh'],
+                    helpers.DCR1['ser']['tx']['p2sh_2_p2pkh']]:
+            res = tx.DecredTx.from_bytes(raw)
+            self.assertEqual(res, raw)
+            self.assertEqual(len(res.tx_witnesses), len(res.tx_ins))
+
+            # Prefix-only and witness-only serializations
+            prefix = tx.DecredTx.from_bytes(res.prefix())
+            self.assertEqual(prefix.tx_id, res.tx_id)
+            self.assertEqual(prefix.tx_witnesses, [])
+            witnesses = tx.DecredTx.witnesses_from_bytes(res.witness())
+            self.assertEqual(prefix.copy(tx_witnesses=witnesses), raw)
+
+        res = tx.DecredTx.from_bytes(
+            b'\x00' + helpers.DCR['ser']['tx']['p2sh_2_p2pkh'], 1)
+        self.assertEqual(res.tx_id, helpers.DCR['ser']['tx']['hash'])
+
+        riemann.select_network('bitcoin_main')
+        res = tx.DecredTx.from_bytes(
+            helpers.DCR['ser']['tx']['p2sh_2_p2pkh'], network='decred_main')
+        self.assertEqual(res.tx_id, helpers.DCR['ser']['tx']['hash'])
+
+    def test_from_bytes_errors(self):
+        raw = helpers.DCR['ser']['tx']['p2sh_2_p2pkh']
+        res = tx.DecredTx.from_bytes(raw)
+
+        with self.assertRaises(ValueError) as context:
+            tx.DecredTx.from_bytes(res.witness())
+        self.assertIn('Got serialization type 2', str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            tx.DecredTx.witnesses_from_bytes(raw)
+        self.assertIn('Expected witness-only', str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            tx.DecredTx.from_bytes(b'\x01\x00')
+        self.assertIn('Tx is too short', str(context.exception))
+
     def test_txhash(self):
         '''
         https://github.com/decred/dcrd/blob/master/wire/msgtx_test.go#L139-L140
@@ -584,7 +630,7 @@ class TestDecredTx(DecredTestCase):
 
         tx_witnesses = [tx_witness_0, tx_witness_1, tx_witness_2]
 
-        tx.DecredTx(
+        t = tx.DecredTx(
             version=helpers.DCR1['ser']['version'],
             tx_ins=tx_ins,
             tx_outs=tx_outs,
@@ -615,6 +661,62 @@ class TestDecredTx(DecredTestCase):
         #         anyone_can_pay=True),
         #     helpers.SIGHASH_DCR['single_anyonecanpay'])
 
+        script = helpers.DCR1['ser']['witness'][0]['stack_script']
+        for i in range(3):
+            # Build the witness signing copy the long way
+            witnesses = [w.copy(stack_script=b'') for w in tx_witnesses]
+            witnesses[i] = witnesses[i].copy(stack_script=script)
+            copy_tx = t.copy(tx_witnesses=witnesses)
+            expected = utils.blake256(
+                b'\x01\x00\x00\x00'
+                + t.prefix_hash()
+                + copy_tx.witness_signing_hash())
+            self.assertEqual(t.sighash_all(i, script), expected)
+            self.assertEqual(
+                t.sighashes([script] * 3)[i], expected)
+
+        self.assertEqual(
+            t.sighashes([script] * 3, anyone_can_pay=True),
+            [t.sighash_all(i, script, anyone_can_pay=True)
+             for i in range(3)])
+
+        # The shared SIGHASH_SINGLE prefix midstate matches per-input calls
+        t3 = t.copy(tx_outs=[tx_outs[0]] * 3)
+        self.assertEqual(
+            t3.sighashes([script] * 3, tx.SIGHASH_SINGLE),
+            [t3.sighash_single(i, script) for i in range(3)])
+
+        t = t.copy(tx_ins=tx_ins[:2], tx_witnesses=tx_witnesses[:2])
+        null_out = tx.DecredTxOut(
+            value=b'\xff' * 8, version=b'\x00\x00', output_script=b'')
+        for i in range(2):
+            copy_ins = [tx_in.copy(sequence=b'\x00' * 4)
+                        for tx_in in tx_ins[:2]]
+            copy_ins[i] = tx_ins[i]
+            copy_tx = t.copy(
+                tx_ins=copy_ins,
+                tx_outs=[null_out] * i + [tx_outs[i]])
+            witnesses = [w.copy(stack_script=b'') for w in tx_witnesses[:2]]
+            witnesses[i] = witnesses[i].copy(stack_script=script)
+            copy_tx = copy_tx.copy(tx_witnesses=witnesses)
+            expected = utils.blake256(
+                b'\x03\x00\x00\x00'
+                + copy_tx.prefix_hash()
+                + copy_tx.witness_signing_hash())
+            self.assertEqual(t.sighash_single(i, script), expected)
+            self.assertEqual(
+                t.sighashes([script] * 2, tx.SIGHASH_SINGLE)[i], expected)
+
+        with self.assertRaises(NotImplementedError):
+            t.copy(tx_outs=tx_outs[:1]).sighash_single(1, script)
+        with self.assertRaises(NotImplementedError):
+            t.copy(tx_outs=tx_outs[:1]).sighashes(
+                [script] * 2, tx.SIGHASH_SINGLE)
+        with self.assertRaises(ValueError):
+            t.sighashes([script] * 3)
+        with self.assertRaises(ValueError):
+            t.sighashes([script] * 2, 0x04)
+
 
 class TestDecredTxBuilder(DecredTestCase):
 
@@ -117,3 +117,43 @@ class OverwinterSighash(unittest.TestCase):
                 script_code=helpers.SCRIPT_CODE,
                 prevout_value=helpers.PREVOUT_VALUE),
             helpers.SIGHASH)
+
+    def test_sighashes(self):
+        count = len(self.tx.tx_ins)
+        sighashes = self.tx.sighashes(
+            [helpers.SCRIPT_CODE] * count,
+            [helpers.PREVOUT_VALUE] * count,
+            sighash_type=tx.SIGHASH_SINGLE)
+        self.assertEqual(len(sighashes), count)
+        self.assertEqual(sighashes[1], helpers.SIGHASH)
+
+        # Shared digests are only computed once
+        self.assertEqual(
+            self.tx._hash_cache['prevouts'], helpers.HASH_PREVOUTS)
+        self.assertEqual(
+            self.tx._hash_cache['joinsplits'], helpers.HASH_JOINSPLITS)
+
+        # Input 1 has no matching output
+        one_output = self.tx.copy(tx_outs=self.tx.tx_outs[:1])
+        with self.assertRaises(NotImplementedError) as context:
+            one_output.sighashes(
+                [helpers.SCRIPT_CODE] * count,
+                [helpers.PREVOUT_VALUE] * count,
+                sighash_type=tx.SIGHASH_SINGLE)
+        self.assertIn('I refuse to implement the SIGHASH_SINGLE bug.',
+                      str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            self.tx.sighashes([helpers.SCRIPT_CODE], [helpers.PREVOUT_VALUE])
+        self.assertIn('Script and TxIn lists must be same length.',
+                      str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            self.tx.sighashes([helpers.SCRIPT_CODE] * count, [])
+        self.assertIn('Prevout value and TxIn lists must be same length.',
+                      str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            self.tx.sighashes([], [], sighash_type=0x04)
+        self.assertIn('Unknown sighash type. Got: 4',
+                      str(context.exception))
@@ -1,6 +1,9 @@
+import copy
+import pickle
 import unittest
 import riemann
 from riemann import utils
+from riemann.tx import shared
 from riemann.tx import sapling
 from riemann.tests.tx.helpers import sapling_helpers
 
@@ -102,6 +105,27 @@ class TestSaplingShieldedOutput(SaplingTestCase):
         self.attr_assert(S, so, 'enc_ciphertext', b'', 'Expected byte-like')
         self.attr_assert(S, so, 'zkproof', b'', 'Invalid zkproof')
 
+    def test_from_bytes(self):
+        so = sapling_helpers.TXNS[0]['vShieldedOutput'][0]
+        full = bytes.fromhex(so['full'])
+        buf = memoryview(b'\xff' * 7 + full + b'\xff' * 7)
+
+        output = sapling.SaplingShieldedOutput.from_bytes(buf, 7)
+        self.assertEqual(output, full)
+        self.assertEqual(output.enc_ciphertext, so['enc_ciphertext'])
+        self.assertIsInstance(output.zkproof, sapling.SaplingZkproof)
+        self.assertEqual(output.zkproof.pi_sub_c, so['zkproof'][144:])
+        self.assertFalse(hasattr(output, '__dict__'))
+
+        with self.assertRaises(TypeError):
+            output.cv = b'\x00' * 32
+
+        with self.assertRaises(ValueError) as context:
+            sapling.SaplingShieldedOutput.from_bytes(full[:-1])
+        self.assertIn(
+            'Expected 948 bytes for SaplingShieldedOutput. Got 947 bytes.',
+            str(context.exception))
+
 
 class TestSaplingZkproof(SaplingTestCase):
 
@@ -216,6 +240,25 @@ class TestSaplingTx(SaplingTestCase):
                     pair[0].spend_auth_sig.hex(),
                     pair[1]['spend_auth_sig'])
 
+    def test_from_bytes_memoryview(self):
+        for txn in sapling_helpers.TXNS:
+            raw = bytes.fromhex(txn['hex'])
+            test_tx = sapling.SaplingTx.from_bytes(memoryview(raw))
+            self.assertEqual(test_tx, sapling.SaplingTx.from_bytes(raw))
+            for output in test_tx.tx_shielded_outputs:
+                self.assertIsInstance(output.cmu, bytes)
+
+    def test_copy_and_pickle(self):
+        test_tx = sapling.SaplingTx.from_hex(sapling_helpers.TXNS[0]['hex'])
+        for dup in [copy.copy(test_tx), copy.deepcopy(test_tx),
+                    pickle.loads(pickle.dumps(test_tx))]:
+            self.assertEqual(dup, test_tx)
+            self.assertEqual(dup.tx_id, test_tx.tx_id)
+            self.assertEqual(dup.tx_shielded_outputs,
+                             test_tx.tx_shielded_outputs)
+            with self.assertRaises(TypeError):
+                dup.expiry_height = b'\x00' * 4
+
     def test_init_network_error(self):
         riemann.select_network('zcash_sprout_main')
         with self.assertRaises(ValueError) as context:
@@ -297,3 +340,115 @@ class TestSaplingTx(SaplingTestCase):
                     anyone_can_pay=txn['anyone_can_pay'],
                     prevout_value=bytes.fromhex(txn['amount'])).hex(),
                 txn['sighash'])
+
+    def test_sighashes(self):
+        txn = sapling_helpers.SIGHASH[1]
+        test_tx = sapling.SaplingTx.from_hex(txn['hex'])
+        sighashes = test_tx.sighashes(
+            [bytes.fromhex(txn['script_code'])],
+            [bytes.fromhex(txn['amount'])])
+        self.assertEqual([s.hex() for s in sighashes], [txn['sighash']])
+
+        # Shielded digests are computed once per tx and reused
+        txn = sapling_helpers.SIGHASH[0]
+        test_tx = sapling.SaplingTx.from_hex(txn['hex'])
+        test_tx._hash_shielded_outputs()
+        self.assertEqual(
+            test_tx._hash_cache['shielded_outputs'].hex(),
+            txn['hashShieldedOutputs'])
+        self.assertEqual(test_tx.sighashes([], []), [])
+
+    def test_sighashes_single_without_output(self):
+        test_tx = sapling.SaplingTx.from_hex(sapling_helpers.TXNS[1]['hex'])
+        one_output = sapling.SaplingTx(
+            tx_ins=test_tx.tx_ins,
+            tx_outs=test_tx.tx_outs[:1],
+            lock_time=test_tx.lock_time,
+            expiry_height=test_tx.expiry_height,
+            value_balance=test_tx.value_balance,
+            tx_shielded_spends=test_tx.tx_shielded_spends,
+            tx_shielded_outputs=test_tx.tx_shielded_outputs,
+            tx_joinsplits=test_tx.tx_joinsplits,
+            joinsplit_pubkey=test_tx.joinsplit_pubkey,
+            joinsplit_sig=test_tx.joinsplit_sig,
+            binding_sig=test_tx.binding_sig)
+        count = len(one_output.tx_ins)
+        with self.assertRaises(NotImplementedError) as context:
+            one_output.sighashes(
+                [b'\x00'] * count, [b'\x00' * 8] * count,
+                sighash_type=shared.SIGHASH_SINGLE)
+        self.assertIn('I refuse to implement the SIGHASH_SINGLE bug.',
+                      str(context.exception))
+
+
+class TestSaplingRecordArray(SaplingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tx = sapling.SaplingTx.from_hex(sapling_helpers.TXNS[0]['hex'])
+
+    def test_columns(self):
+        spends = self.tx.shielded_spends_array
+        self.assertEqual(len(spends), len(self.tx.tx_shielded_spends))
+        self.assertEqual(
+            spends.fields,
+            ('cv', 'anchor', 'nullifier', 'rk', 'zkproof', 'spend_auth_sig'))
+        for field in spends.fields:
+            expected = [bytes(getattr(ss, field))
+                        for ss in self.tx.tx_shielded_spends]
+            self.assertEqual(spends.column(field), expected)
+            self.assertEqual(spends.packed(field), b''.join(expected))
+        self.assertEqual(spends[0], self.tx.tx_shielded_spends[0])
+        self.assertEqual(spends[-1], self.tx.tx_shielded_spends[-1])
+
+        outputs = self.tx.shielded_outputs_array
+        self.assertEqual(
+            outputs.column('cmu'),
+            [so.cmu for so in self.tx.tx_shielded_outputs])
+        self.assertEqual(
+            outputs.to_bytes(),
+            b''.join(so.to_bytes() for so in self.tx.tx_shielded_outputs))
+
+    def test_strided_packing(self):
+        # More records than field bytes uses the strided path
+        records = [bytes([i]) * 384 for i in range(40)]
+        array = sapling.SaplingRecordArray(
+            b''.join(records), 384, sapling.SHIELDED_SPEND_LAYOUT)
+        self.assertEqual(array.packed('cv'),
+                         b''.join(r[:32] for r in records))
+        self.assertEqual(array.packed('nullifier'),
+                         b''.join(r[64:96] for r in records))
+
+    def test_concat(self):
+        spends = self.tx.shielded_spends_array
+        joined = sapling.SaplingRecordArray.concat([spends, spends])
+        self.assertEqual(len(joined), 2 * len(spends))
+        self.assertEqual(joined.column('nullifier'),
+                         spends.column('nullifier') * 2)
+
+        empty = sapling.SaplingTx.from_hex(
+            sapling_helpers.TXNS[1]['hex']).shielded_outputs_array
+        self.assertEqual(len(empty), 0)
+        self.assertEqual(empty.column('cmu'), [])
+        self.assertEqual(empty.packed('cmu'), b'')
+
+    def test_errors(self):
+        spends = self.tx.shielded_spends_array
+        with self.assertRaises(ValueError) as context:
+            spends.column('cmu')
+        self.assertIn('Unknown field. Got: cmu', str(context.exception))
+
+        with self.assertRaises(IndexError):
+            spends[len(spends)]
+
+        with self.assertRaises(ValueError) as context:
+            sapling.SaplingRecordArray.concat(
+                [spends, self.tx.shielded_outputs_array])
+        self.assertIn('Arrays must share a record layout.',
+                      str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            sapling.SaplingRecordArray(
+                b'\x00' * 385, 384, sapling.SHIELDED_SPEND_LAYOUT)
+        self.assertIn('Expected a multiple of 384 bytes. Got 385 bytes.',
+                      str(context.exception))
@@ -1,3 +1,5 @@
+import io
+import hashlib
 import riemann
 import unittest
 from riemann import tx
@@ -59,6 +61,45 @@ class TestByteData(unittest.TestCase):
 
         self.assertEqual(bd.hex(), t.hex())
 
+    def test_write_to(self):
+        bd = tx.ByteData()
+        bd._bytes.extend(b'\xff\xdd\x88')
+        bd._make_immutable()
+        self.assertEqual(bd.serialized_size(), 3)
+
+        stream = io.BytesIO()
+        self.assertEqual(bd.write_to(stream), 3)
+        self.assertEqual(bd.write_to(stream), 3)
+        self.assertEqual(stream.getvalue(), b'\xff\xdd\x88' * 2)
+
+        h = hashlib.sha256()
+        self.assertEqual(bd.write_to(h), 3)
+        self.assertEqual(h.digest(), hashlib.sha256(b'\xff\xdd\x88').digest())
+
+    def test_write_to_short_writes(self):
+        class ShortWriter(io.RawIOBase):
+            def __init__(self, limit):
+                self.limit = limit
+                self.data = bytearray()
+
+            def writable(self):
+                return True
+
+            def write(self, b):
+                b = bytes(b[:self.limit])
+                self.data.extend(b)
+                return len(b)
+
+        outpoint = tx.Outpoint(b'\xaa' * 32, b'\x01\x00\x00\x00')
+        stream = ShortWriter(10)
+        self.assertEqual(outpoint.write_to(stream), 36)
+        self.assertEqual(stream.data, outpoint.to_bytes())
+
+        with self.assertRaises(ValueError) as context:
+            outpoint.write_to(ShortWriter(0))
+        self.assertIn('Stream accepted no bytes. Wrote 0 of 36 bytes.',
+                      str(context.exception))
+
     def test_ne_error(self):
         with self.assertRaises(TypeError) as context:
             bd = tx.ByteData()
@@ -163,3 +204,43 @@ class TestVarInt(unittest.TestCase):
         self.assertIn(
             'VarInt must be compact. Got:',
             str(context.exception))
+
+    def test_encode_varint(self):
+        for n in [0, 0xfc, 0xfd, 0xffff, 0x10000, 0xffffffff,
+                  0x100000000, 0xffffffffffffffff]:
+            self.assertEqual(tx.encode_varint(n), tx.VarInt(n).to_bytes())
+        self.assertIsInstance(tx.encode_varint(5), bytes)
+
+        with self.assertRaises(ValueError) as context:
+            tx.encode_varint(-1)
+        self.assertIn('VarInt cannot be less than 0.',
+                      str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            tx.encode_varint(2 ** 64)
+        self.assertIn('VarInt cannot be greater than (2 ** 64) - 1.',
+                      str(context.exception))
+
+    def test_decode_varint(self):
+        self.assertEqual(tx.decode_varint(b'\x00'), (0, 1))
+        self.assertEqual(tx.decode_varint(b'\xfd\x91#'), (0x2391, 3))
+        self.assertEqual(tx.decode_varint(b'\xff' * 9), (2 ** 64 - 1, 9))
+        self.assertEqual(
+            tx.decode_varint(memoryview(b'\x00\x00\xfe\x00\x00\x01\x00'), 2),
+            (0x10000, 5))
+
+        # Non-compact is fine outside of zcash
+        self.assertEqual(tx.decode_varint(b'\xfd\x05\x00'), (5, 3))
+        self.assertEqual(tx.VarInt.from_bytes(b'\xfd\x05\x00'),
+                         b'\xfd\x05\x00')
+
+        with self.assertRaises(ValueError) as context:
+            tx.decode_varint(b'\xfe\x00\x00\x00')
+        self.assertIn('Malformed VarInt. Got: fe000000',
+                      str(context.exception))
+
+        riemann.select_network('zcash_sapling_main')
+        with self.assertRaises(ValueError) as context:
+            tx.decode_varint(b'\xfd\x05\x00')
+        self.assertIn('VarInt must be compact. Got: fd0500',
+                      str(context.exception))
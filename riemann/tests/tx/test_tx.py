@@ -1,3 +1,7 @@
+import io
+import copy
+import pickle
+import hashlib
 import riemann
 import unittest
 from riemann import tx
@@ -111,6 +115,21 @@ class TestTxIn(unittest.TestCase):
         self.assertEqual(tx_in, tx_in_copy)  # They should be equal
         self.assertIsNot(tx_in, tx_in_copy)  # But not the same object
 
+    def test_outpoint_cached(self):
+        raw = helpers.P2PKH1['ser']['tx']['in']
+        for tx_in in [tx.TxIn(self.outpoint, self.stack_script,
+                              self.redeem_script, self.sequence),
+                      tx.TxIn(self.outpoint.to_bytes(), self.stack_script,
+                              self.redeem_script, self.sequence),
+                      tx.TxIn.from_bytes(raw),
+                      tx.TxIn.from_bytes(raw, validate=False)]:
+            self.assertEqual(tx_in.outpoint, self.outpoint)
+            self.assertIs(tx_in.outpoint, tx_in.outpoint)
+            self.assertEqual(pickle.loads(pickle.dumps(tx_in)).outpoint,
+                             self.outpoint)
+            with self.assertRaises(TypeError):
+                tx_in._outpoint = None
+
     def test_long_script_sig(self):
         with self.assertRaises(ValueError) as context:
             tx.TxIn(self.outpoint, b'\x00' * 1000,
@@ -153,6 +172,22 @@ class TestTxIn(unittest.TestCase):
             tx_in.redeem_script,
             helpers.P2SH['ser']['ins'][0]['redeem_script'])
 
+    def test_parse_script_sig(self):
+        # A non-minimal PUSHDATA1 redeem script keeps its original bytes
+        redeem_script = helpers.MSIG_2_2['ser_script']
+        script_sig = (b'\x00\x01\x01'
+                      + b'\x4c' + bytes([len(redeem_script)])
+                      + redeem_script)
+        stack_script, redeem = tx.TxIn._parse_script_sig(script_sig)
+        self.assertEqual(stack_script, b'\x00\x01\x01')
+        self.assertEqual(redeem, script_sig[3:])
+
+        # The last push isn't a script, so there's no redeem script
+        for script_sig in [b'\x00\x01\xfe', b'\x00\x02\x4c\x05',
+                           b'\xab\x01\x51', b'\x51']:
+            self.assertEqual(tx.TxIn._parse_script_sig(script_sig),
+                             (script_sig, b''))
+
     def test_from_bytes_wsh(self):
         tx_in = tx.TxIn.from_bytes(helpers.P2WSH['ser']['ins'][0]['input'])
         self.assertEqual(tx_in, helpers.P2WSH['ser']['ins'][0]['input'])
@@ -165,6 +200,14 @@ class TestTxIn(unittest.TestCase):
         self.assertEqual(tx_in.stack_script, b'')
         self.assertEqual(tx_in.redeem_script, b'')
 
+    def test_from_bytes_offset(self):
+        tx_in_bytes = helpers.P2PKH1['ser']['tx']['in']
+        buf = memoryview(b'\xff' * 7 + tx_in_bytes + b'\xff' * 7)
+        tx_in = tx.TxIn.from_bytes(buf, 7)
+        self.assertEqual(tx_in, tx_in_bytes)
+        self.assertIsInstance(tx_in.sequence, bytes)
+        self.assertIsInstance(tx_in.outpoint.tx_id, bytes)
+
 
 class TestTxOut(unittest.TestCase):
 
@@ -194,6 +237,12 @@ class TestTxOut(unittest.TestCase):
             tx_out.output_script,
             helpers.P2PKH1['ser']['outs'][0]['pk_script'])
 
+    def test_from_bytes_offset(self):
+        output = helpers.P2PKH1['ser']['outs'][0]['out']
+        tx_out = tx.TxOut.from_bytes(memoryview(b'\x00' + output), 1)
+        self.assertEqual(tx_out, output)
+        self.assertIsInstance(tx_out.output_script, bytes)
+
     def test_from_bytes_long(self):
         with self.assertRaises(NotImplementedError) as context:
             tx.TxOut.from_bytes(b'\xff' * 10)
@@ -265,6 +314,11 @@ class TestInputWitness(unittest.TestCase):
                                   [s.item for s in self.stack]):
             self.assertEqual(item, expected)
 
+    def test_from_bytes_offset(self):
+        witness = helpers.P2WSH['ser']['tx']['witness']
+        iw = tx.InputWitness.from_bytes(b'\x00\x00' + witness, 2)
+        self.assertEqual(iw, witness)
+
 
 class TestTx(unittest.TestCase):
 
@@ -306,6 +360,78 @@ class TestTx(unittest.TestCase):
     def tearDown(self):
         riemann.select_network('bitcoin_main')
 
+    def test_from_bytes_no_validate(self):
+        for raw in [helpers.P2PKH1['ser']['tx']['signed'],
+                    helpers.P2SH['ser']['tx']['signed'],
+                    helpers.P2WSH['ser']['tx']['signed']]:
+            checked = tx.Tx.from_bytes(raw)
+            t = tx.Tx.from_bytes(raw, validate=False)
+            self.assertEqual(t, checked)
+            self.assertEqual(t.tx_id, checked.tx_id)
+            self.assertEqual(t.wtx_id, checked.wtx_id)
+            self.assertEqual(t.flag, checked.flag)
+            self.assertEqual(t.tx_witnesses, checked.tx_witnesses)
+            for tx_in, checked_in in zip(t.tx_ins, checked.tx_ins):
+                self.assertEqual(tx_in.stack_script, checked_in.stack_script)
+                self.assertEqual(tx_in.redeem_script,
+                                 checked_in.redeem_script)
+                self.assertEqual(tx_in.sequence, checked_in.sequence)
+            for tx_out, checked_out in zip(t.tx_outs, checked.tx_outs):
+                self.assertEqual(tx_out.value, checked_out.value)
+                self.assertEqual(tx_out.output_script,
+                                 checked_out.output_script)
+            with self.assertRaises(TypeError):
+                t.lock_time = b'\x00' * 4
+
+        large = helpers.LARGE_WITNESS_TX['tx']
+        with self.assertRaises(NotImplementedError) as context:
+            tx.Tx.from_bytes(large)
+        self.assertIn('No support for abnormally long pk_scripts.',
+                      str(context.exception))
+        self.assertEqual(tx.Tx.from_bytes(large, validate=False), large)
+
+        with self.assertRaises(ValueError) as context:
+            tx.Tx.from_bytes(large[:-10], validate=False)
+        self.assertIn('runs past the end of the data.',
+                      str(context.exception))
+
+        # Litecoin MWEB txs set flag 0x08
+        mweb = large[:5] + b'\x08' + large[6:]
+        with self.assertRaises(ValueError) as context:
+            tx.Tx.from_bytes(mweb, validate=False)
+        self.assertIn('Unsupported tx serialization flag. Got: 0008',
+                      str(context.exception))
+
+    def test_copy_and_pickle(self):
+        t = tx.Tx.from_hex(helpers.P2WSH['human']['tx']['signed'])
+        for dup in [copy.copy(t), copy.deepcopy(t),
+                    pickle.loads(pickle.dumps(t))]:
+            self.assertEqual(dup, t)
+            self.assertEqual(dup.tx_id, t.tx_id)
+            self.assertEqual(dup.tx_ins, t.tx_ins)
+            self.assertEqual(dup.tx_witnesses, t.tx_witnesses)
+            self.assertEqual(dup.tx_ins[0].sequence, t.tx_ins[0].sequence)
+            with self.assertRaises(TypeError):
+                dup.lock_time = b'\x00' * 4
+
+    def test_write_to(self):
+        t = tx.Tx.from_hex(helpers.P2WSH['human']['tx']['signed'])
+        stream = io.BytesIO()
+        self.assertEqual(t.write_to(stream), t.serialized_size())
+        self.assertEqual(stream.getvalue(), t.to_bytes())
+
+        h = hashlib.sha256()
+        t.write_to(h)
+        self.assertEqual(h.digest(), utils.sha256(t.to_bytes()))
+
+        stream = io.BytesIO()
+        for piece in t.tx_ins + t.tx_outs + t.tx_witnesses:
+            piece.write_to(stream)
+        self.assertEqual(
+            stream.getvalue(),
+            b''.join(p.to_bytes()
+                     for p in t.tx_ins + t.tx_outs + t.tx_witnesses))
+
     # Convenience monotest
     # Sorta broken.
     def test_everything_witness(self):
@@ -467,6 +593,25 @@ class TestTx(unittest.TestCase):
         self.assertEqual(t.tx_id, helpers.P2PKH1['ser']['tx']['hash'])
         self.assertEqual(t.tx_id_le, helpers.P2PKH1['ser']['tx']['hash_le'])
 
+    def test_tx_id_lazy(self):
+        t = tx.Tx(self.version, self.none_flag, self.tx_ins, self.tx_outs,
+                  self.none_witnesses, self.lock_time)
+        self.assertEqual(t._hash_cache, {})
+        self.assertEqual(t.tx_id, helpers.P2PKH1['ser']['tx']['hash'])
+        self.assertIn('tx_id_le', t._hash_cache)
+        self.assertIsNone(t.wtx_id)
+        self.assertIsNone(t.wtx_id_le)
+
+        with self.assertRaises(TypeError, msg='That\'s immutable, honey'):
+            t.tx_id = b'\x00' * 32
+
+        t = tx.Tx.from_bytes(helpers.P2WPKH['ser']['tx']['signed'])
+        self.assertEqual(t._hash_cache, {})
+        self.assertEqual(t.tx_id_le, utils.hash256(t.no_witness()))
+        self.assertEqual(t.wtx_id_le, utils.hash256(t.to_bytes()))
+        self.assertEqual(t.wtx_id, t.wtx_id_le[::-1])
+        self.assertNotEqual(t.tx_id, t.wtx_id)
+
     def test_from_hex_pkh(self):
         t = tx.Tx.from_hex(helpers.P2PKH1['human']['tx']['signed'])
         self.assertEqual(t.version, helpers.P2PKH1['ser']['version'])
@@ -559,6 +704,50 @@ class TestTx(unittest.TestCase):
         self.assertEqual(t.lock_time, helpers.P2WSH['ser']['locktime'])
         self.assertEqual(t, helpers.P2WSH['ser']['tx']['signed'])
 
+    def test_from_bytes_offset(self):
+        pkh = helpers.P2PKH1['ser']['tx']['signed']
+        wsh = helpers.P2WSH['ser']['tx']['signed']
+        buf = pkh + wsh + pkh
+
+        t = tx.Tx.from_bytes(buf, len(pkh))
+        self.assertEqual(t, wsh)
+        self.assertEqual(t.tx_witnesses[0],
+                         helpers.P2WSH['ser']['tx']['witness'])
+
+        t = tx.Tx.from_bytes(buf, len(pkh) + len(wsh))
+        self.assertEqual(t, pkh)
+
+    def test_from_bytes_network(self):
+        riemann.select_network('bitcoin_cash_main')
+        t = tx.Tx.from_bytes(helpers.P2WSH['ser']['tx']['signed'],
+                             network='bitcoin_main')
+        self.assertEqual(t, helpers.P2WSH['ser']['tx']['signed'])
+        self.assertIsNotNone(t.tx_witnesses)
+        self.assertEqual(riemann.get_current_network_name(),
+                         'bitcoin_cash_main')
+
+        t = tx.Tx.from_hex(helpers.P2WSH['human']['tx']['signed'],
+                           network='bitcoin_main')
+        self.assertEqual(t, helpers.P2WSH['ser']['tx']['signed'])
+
+    def test_slots(self):
+        t = tx.Tx.from_bytes(helpers.P2WSH['ser']['tx']['signed'])
+        objs = [t, t.tx_ins[0], t.tx_ins[0].outpoint, t.tx_outs[0],
+                t.tx_witnesses[0], t.tx_witnesses[0].stack[0]]
+        for obj in objs:
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+        # Fields are read back out of the serialized tx
+        self.assertEqual(t.version, helpers.P2WSH['ser']['version'])
+        self.assertEqual(t.flag, riemann.network.SEGWIT_TX_FLAG)
+        self.assertEqual(t.lock_time, helpers.P2WSH['ser']['locktime'])
+        self.assertEqual(t.tx_witnesses[0].stack_len,
+                         len(t.tx_witnesses[0].stack))
+        self.assertEqual(t.tx_outs[1].output_script_len,
+                         len(t.tx_outs[1].output_script))
+        self.assertIsNone(tx.Tx.from_bytes(
+            helpers.P2PKH1['ser']['tx']['signed']).flag)
+
     def test_calculate_fee(self):
         t = tx.Tx(self.version, self.none_flag, self.tx_ins, self.tx_outs,
                   self.none_witnesses, self.lock_time)
@@ -604,6 +793,34 @@ class TestTx(unittest.TestCase):
                 ),
             helpers.P2WPKH['ser']['segwit_sighash']['all'])
 
+    def test_segwit_sighash_digests_cached(self):
+        t = tx.Tx.from_bytes(helpers.P2WPKH['ser']['tx']['signed'])
+
+        prevouts = t._hash_prevouts(anyone_can_pay=False)
+        sequence = t._hash_sequence(sighash_type=tx.SIGHASH_ALL,
+                                    anyone_can_pay=False)
+        outputs = t._hash_outputs(index=0, sighash_type=tx.SIGHASH_ALL)
+
+        self.assertIs(t._hash_prevouts(anyone_can_pay=False), prevouts)
+        self.assertIs(
+            t._hash_sequence(sighash_type=tx.SIGHASH_ALL,
+                             anyone_can_pay=False),
+            sequence)
+        self.assertIs(
+            t._hash_outputs(index=0, sighash_type=tx.SIGHASH_ALL),
+            outputs)
+
+        # Cached digests still give the right sighash
+        self.assertEqual(
+            t.sighash_all(
+                0,
+                helpers.P2WPKH['ser']['ins'][0]['pk_script'],
+                prevout_value=helpers.P2WPKH['ser']['ins'][0]['value']),
+            helpers.P2WPKH['ser']['segwit_sighash']['all'])
+
+        # Copies don't share the cache
+        self.assertNotIn('prevouts', t.copy()._hash_cache)
+
     def test_segwit_sighash_all_anyonecanpay(self):
         t = tx.Tx.from_bytes(helpers.P2WPKH['ser']['tx']['signed'])
 
@@ -668,6 +885,95 @@ class TestTx(unittest.TestCase):
                 anyone_can_pay=True),
             helpers.P2PKH1['ser']['sighash']['single_anyonecanpay'])
 
+    def test_sighashes(self):
+        script = helpers.P2PKH1['ser']['ins'][0]['pk_script']
+
+        t = tx.Tx(self.version, None, self.tx_ins, self.tx_outs,
+                  self.none_witnesses, self.lock_time)
+        self.assertEqual(
+            t.sighashes([script], None, tx.SIGHASH_ALL),
+            [helpers.P2PKH1['ser']['sighash']['all']])
+        self.assertEqual(
+            t.sighashes([script], None, tx.SIGHASH_SINGLE,
+                        anyone_can_pay=True),
+            [helpers.P2PKH1['ser']['sighash']['single_anyonecanpay']])
+
+        t = tx.Tx(self.version, None, self.tx_ins * 2, self.tx_outs,
+                  self.none_witnesses, self.lock_time)
+        self.assertEqual(
+            t.sighashes([script, script], None, tx.SIGHASH_ALL),
+            [t.sighash_all(0, script), t.sighash_all(1, script)])
+
+        t = tx.Tx.from_bytes(helpers.P2WPKH['ser']['tx']['signed'])
+        self.assertEqual(
+            t.sighashes([helpers.P2WPKH['ser']['ins'][0]['pk_script']],
+                        [helpers.P2WPKH['ser']['ins'][0]['value']],
+                        tx.SIGHASH_ALL),
+            [helpers.P2WPKH['ser']['segwit_sighash']['all']])
+
+    def test_presegwit_sighash_single_multiple_inputs(self):
+        script = helpers.P2PKH1['ser']['ins'][0]['pk_script']
+        tx_in = self.tx_ins[0]
+        tx_out = self.tx_outs[0]
+        t = tx.Tx(self.version, None, [tx_in, tx_in], [tx_out, tx_out],
+                  self.none_witnesses, self.lock_time)
+
+        # Outputs after the signed one are dropped, other sequences zeroed
+        expected = bytearray()
+        expected += self.version
+        expected += b'\x02'
+        expected += tx_in.outpoint.to_bytes() + b'\x00' + b'\x00' * 4
+        expected += tx_in.outpoint.to_bytes() + bytes([len(script)]) + script
+        expected += tx_in.sequence
+        expected += b'\x02'
+        expected += b'\xff' * 8 + b'\x00'
+        expected += tx_out.to_bytes()
+        expected += self.lock_time
+        expected += b'\x03\x00\x00\x00'
+
+        self.assertEqual(t.sighash_single(1, script),
+                         utils.hash256(bytes(expected)))
+
+        expected = bytearray()
+        expected += self.version
+        expected += b'\x02'
+        expected += tx_in.outpoint.to_bytes() + bytes([len(script)]) + script
+        expected += tx_in.sequence
+        expected += tx_in.outpoint.to_bytes() + b'\x00' + b'\x00' * 4
+        expected += b'\x01'
+        expected += tx_out.to_bytes()
+        expected += self.lock_time
+        expected += b'\x03\x00\x00\x00'
+
+        self.assertEqual(t.sighash_single(0, script),
+                         utils.hash256(bytes(expected)))
+
+        with self.assertRaises(ValueError):
+            t.sighash_all(0, None)
+
+    def test_sighashes_errors(self):
+        script = helpers.P2PKH1['ser']['ins'][0]['pk_script']
+        t = tx.Tx(self.version, None, self.tx_ins, self.tx_outs,
+                  self.none_witnesses, self.lock_time)
+
+        with self.assertRaises(ValueError) as context:
+            t.sighashes([script, script], None, tx.SIGHASH_ALL)
+        self.assertIn('Script and TxIn lists must be same length. ',
+                      str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            t.sighashes([script], [], tx.SIGHASH_ALL)
+        self.assertIn('Prevout value and TxIn lists must be same length. ',
+                      str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            t.sighashes([script], None, 0x04)
+        self.assertIn('Unknown sighash type. Got: 4',
+                      str(context.exception))
+
+        with self.assertRaises(NotImplementedError):
+            t.sighashes([script], None, tx.SIGHASH_NONE)
+
     def test_sighash_single_bug(self):
         with self.assertRaises(NotImplementedError) as context:
             t = tx.Tx(self.version, self.none_flag, self.tx_ins * 3,
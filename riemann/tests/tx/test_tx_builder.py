@@ -33,6 +33,24 @@ class TestTxBuilder(unittest.TestCase):
             'Network bitcoin_cash_main does not support witness scripts.',
             str(context.exception))
 
+    def test_make_sh_script_pubkey(self):
+        script_bytes = helpers.P2WSH['ser']['ins'][0]['pk_script']
+        self.assertEqual(
+            tb.make_sh_script_pubkey(script_bytes, witness=True)[:2],
+            b'\x00\x20')
+
+        for network in ['bitcoin_cash_main', 'zcash_sapling_main',
+                        'decred_main']:
+            riemann.select_network(network)
+            self.assertEqual(
+                tb.make_sh_script_pubkey(script_bytes)[:2], b'\xa9\x14')
+            with self.assertRaises(ValueError) as context:
+                tb.make_sh_script_pubkey(script_bytes, witness=True)
+            self.assertIn(
+                'Network {} does not support witness scripts.'
+                .format(network),
+                str(context.exception))
+
     def test_make_pkh_output_script(self):
         self.assertEqual(
             tb.make_pkh_output_script(helpers.PK['ser'][0]['pk']),
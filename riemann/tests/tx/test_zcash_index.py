@@ -0,0 +1,152 @@
+import riemann
+import unittest
+from riemann import tx
+from riemann.tx import zcash_index
+from riemann.tests.tx.helpers import overwinter_helpers
+from riemann.tests.tx.helpers import sapling_helpers
+
+
+class TestShieldedIndex(unittest.TestCase):
+
+    def setUp(self):
+        riemann.select_network('zcash_sapling_main')
+        self.sapling_raw = bytes.fromhex(sapling_helpers.TXNS[0]['hex'])
+        self.sapling_tx = tx.SaplingTx.from_bytes(self.sapling_raw)
+        self.sprout_raw = overwinter_helpers.ZCASH_SPROUT['ser']['tx']
+
+    def tearDown(self):
+        riemann.select_network('bitcoin_main')
+
+    def test_add_tx(self):
+        index = zcash_index.ShieldedIndex()
+        self.assertEqual(index.add_tx(self.sapling_tx), [])
+
+        spends = self.sapling_tx.tx_shielded_spends
+        outputs = self.sapling_tx.tx_shielded_outputs
+        joinsplits = self.sapling_tx.tx_joinsplits
+        self.assertEqual(len(index.sapling_nullifiers), len(spends))
+        self.assertEqual(len(index.sapling_commitments), len(outputs))
+        self.assertEqual(len(index.sprout_nullifiers), 2 * len(joinsplits))
+        self.assertEqual(len(index), len(spends) + len(outputs)
+                         + 4 * len(joinsplits))
+
+        for spend in spends:
+            self.assertTrue(index.is_spent(spend.nullifier))
+        for output in outputs:
+            self.assertTrue(index.has_commitment(output.cmu))
+        for joinsplit in joinsplits:
+            self.assertTrue(index.is_spent(joinsplit.nullifiers[32:]))
+            self.assertTrue(index.has_commitment(joinsplit.commitments[:32]))
+        self.assertFalse(index.is_spent(b'\x00' * 32))
+
+    def test_pools(self):
+        index = zcash_index.ShieldedIndex()
+        index.add_tx(self.sapling_tx)
+
+        nullifier = self.sapling_tx.tx_shielded_spends[0].nullifier
+        cmu = self.sapling_tx.tx_shielded_outputs[0].cmu
+        self.assertTrue(index.is_spent(nullifier, pool='sapling'))
+        self.assertFalse(index.is_spent(nullifier, pool='sprout'))
+        self.assertTrue(index.has_commitment(cmu, pool='sapling'))
+        self.assertFalse(index.has_commitment(cmu, pool='sprout'))
+
+        joinsplit = self.sapling_tx.tx_joinsplits[0]
+        self.assertTrue(
+            index.is_spent(joinsplit.nullifiers[:32], pool='sprout'))
+        self.assertFalse(
+            index.is_spent(joinsplit.nullifiers[:32], pool='sapling'))
+        self.assertTrue(
+            index.has_commitment(joinsplit.commitments[32:], pool='sprout'))
+        self.assertFalse(
+            index.has_commitment(joinsplit.commitments[32:], pool='sapling'))
+
+        with self.assertRaises(ValueError) as context:
+            index.is_spent(nullifier, pool='orchard')
+        self.assertIn(
+            'Unknown pool. Expected sprout, sapling or None. Got: orchard',
+            str(context.exception))
+
+    def test_double_spend(self):
+        index = zcash_index.ShieldedIndex()
+        index.add_tx(self.sapling_tx)
+        spent = index.add_tx(self.sapling_tx)
+        expected = ([js.nullifiers[i:i + 32]
+                     for js in self.sapling_tx.tx_joinsplits
+                     for i in (0, 32)]
+                    + [ss.nullifier
+                       for ss in self.sapling_tx.tx_shielded_spends])
+        self.assertEqual(spent, expected)
+        self.assertEqual(index.add_txs([]), [])
+
+    def test_add_bytes(self):
+        index = zcash_index.ShieldedIndex()
+        index.add_bytes(self.sapling_raw)
+        index.add_bytes(self.sprout_raw)
+        index.add_bytes(overwinter_helpers.RAW_TX)
+
+        expected = zcash_index.ShieldedIndex()
+        expected.add_tx(self.sapling_tx)
+        with riemann.network_context('zcash_sprout_main'):
+            expected.add_tx(tx.SproutTx.from_bytes(self.sprout_raw))
+        with riemann.network_context('zcash_overwinter_main'):
+            expected.add_tx(
+                tx.OverwinterTx.from_bytes(overwinter_helpers.RAW_TX))
+        self.assertEqual(index, expected)
+        self.assertEqual(riemann.get_current_network_name(),
+                         'zcash_sapling_main')
+
+        with self.assertRaises(ValueError) as context:
+            index.add_bytes(self.sapling_raw, network='bitcoin_main')
+        self.assertIn('ShieldedIndex not supported by network bitcoin_main',
+                      str(context.exception))
+
+        for version in [b'\x00\x00\x00\x00', b'\x05\x00\x00\x80']:
+            with self.assertRaises(ValueError) as context:
+                index.add_bytes(version + self.sapling_raw[4:])
+            self.assertIn(
+                'Unsupported Zcash tx version. Expected 1-4. Got: {}'
+                .format(version[0]),
+                str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            index.add_tx(self.sapling_raw)
+        self.assertIn('Expected SproutTx, OverwinterTx or SaplingTx.',
+                      str(context.exception))
+
+    def test_snapshot(self):
+        index = zcash_index.ShieldedIndex()
+        self.assertEqual(
+            zcash_index.ShieldedIndex.from_bytes(index.to_bytes()), index)
+
+        index.add_bytes(self.sapling_raw)
+        index.add_bytes(self.sprout_raw)
+        snapshot = index.to_bytes()
+        self.assertEqual(len(snapshot), 5 + 16 + 32 * len(index))
+
+        restored = zcash_index.ShieldedIndex.from_bytes(snapshot)
+        self.assertEqual(restored, index)
+        self.assertEqual(restored.to_bytes(), snapshot)
+
+    def test_snapshot_errors(self):
+        index = zcash_index.ShieldedIndex()
+        index.add_tx(self.sapling_tx)
+        snapshot = index.to_bytes()
+
+        with self.assertRaises(ValueError) as context:
+            zcash_index.ShieldedIndex.from_bytes(b'XXXX' + snapshot[4:])
+        self.assertIn('Bad magic bytes', str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            zcash_index.ShieldedIndex.from_bytes(
+                snapshot[:4] + b'\x02' + snapshot[5:])
+        self.assertIn('Unsupported snapshot version. Expected 1. Got 2.',
+                      str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            zcash_index.ShieldedIndex.from_bytes(snapshot[:-1])
+        self.assertIn('Snapshot is truncated.', str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            zcash_index.ShieldedIndex.from_bytes(snapshot + b'\x00')
+        self.assertIn('Snapshot has 1 trailing bytes.',
+                      str(context.exception))
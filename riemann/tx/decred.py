@@ -1,7 +1,7 @@
 import riemann
 from riemann import utils
+from riemann import blake256 as b256
 from riemann.tx import shared
-from riemann.tx.tx import TxOut
 
 
 class DecredByteData(shared.ByteData):
@@ -40,11 +40,11 @@ class DecredOutpoint(DecredByteData):
             tree=tree if tree is not None else self.tree)
 
     @classmethod
-    def from_bytes(DecredOutpoint, byte_string):
+    def from_bytes(DecredOutpoint, byte_string, offset=0):
         return DecredOutpoint(
-            tx_id=byte_string[:32],
-            index=byte_string[32:36],
-            tree=byte_string[36:37])
+            tx_id=bytes(byte_string[offset:offset + 32]),
+            index=bytes(byte_string[offset + 32:offset + 36]),
+            tree=bytes(byte_string[offset + 36:offset + 37]))
 
 
 class DecredTxIn(DecredByteData):
@@ -69,10 +69,10 @@ class DecredTxIn(DecredByteData):
             sequence=sequence if sequence is not None else self.sequence)
 
     @classmethod
-    def from_bytes(DecredTxIn, byte_string):
+    def from_bytes(DecredTxIn, byte_string, offset=0):
         return DecredTxIn(
-            outpoint=DecredOutpoint.from_bytes(byte_string[:37]),
-            sequence=byte_string[37:41])
+            outpoint=DecredOutpoint.from_bytes(byte_string, offset),
+            sequence=bytes(byte_string[offset + 37:offset + 41]))
 
 
 class DecredTxOut(DecredByteData):
@@ -86,7 +86,7 @@ class DecredTxOut(DecredByteData):
 
         self += value
         self += version
-        self += shared.VarInt(len(output_script))
+        self += shared.encode_varint(len(output_script))
         self += output_script
 
         self.value = value
@@ -104,15 +104,15 @@ class DecredTxOut(DecredByteData):
                            else self.output_script))
 
     @classmethod
-    def from_bytes(DecredTxOut, byte_string):
-        n = shared.VarInt.from_bytes(byte_string[10:])
-        script_start = 10 + len(n)
-        script_end = script_start + n.number
-        if n.number < 0xfc:
+    def from_bytes(DecredTxOut, byte_string, offset=0):
+        script_len, n = shared.decode_varint(byte_string, offset + 10)
+        script_start = offset + 10 + n
+        script_end = script_start + script_len
+        if script_len < 0xfc:
             return DecredTxOut(
-                value=byte_string[:8],
-                version=byte_string[8:10],
-                output_script=byte_string[script_start:script_end])
+                value=bytes(byte_string[offset:offset + 8]),
+                version=bytes(byte_string[offset + 8:offset + 10]),
+                output_script=bytes(byte_string[script_start:script_end]))
         else:
             raise NotImplementedError(
                 'No support for abnormally long pk_scripts.')
@@ -132,7 +132,7 @@ class DecredInputWitness(DecredByteData):
         self += value
         self += height
         self += index
-        self += shared.VarInt(len(stack_script) + len(redeem_script))
+        self += shared.encode_varint(len(stack_script) + len(redeem_script))
         self += stack_script
         self += redeem_script
 
@@ -158,8 +158,21 @@ class DecredInputWitness(DecredByteData):
                            else self.redeem_script))
 
     @classmethod
-    def from_bytes(DecredInputWitness, byte_string):
-        raise NotImplementedError('TODO')
+    def from_bytes(DecredInputWitness, byte_string, offset=0):
+        '''
+        byte-like, int -> DecredInputWitness
+        The serialization doesn't separate the stack and redeem scripts,
+        so the whole script_sig is parsed as the stack_script.
+        '''
+        script_len, n = shared.decode_varint(byte_string, offset + 16)
+        script_start = offset + 16 + n
+        script_end = script_start + script_len
+        return DecredInputWitness(
+            value=bytes(byte_string[offset:offset + 8]),
+            height=bytes(byte_string[offset + 8:offset + 12]),
+            index=bytes(byte_string[offset + 12:offset + 16]),
+            stack_script=bytes(byte_string[script_start:script_end]),
+            redeem_script=b'')
 
 
 class DecredTx(DecredByteData):
@@ -203,15 +216,15 @@ class DecredTx(DecredByteData):
                     .format(type(tx_witness).__name__))
 
         self += version
-        self += shared.VarInt(len(tx_ins))
+        self += shared.encode_varint(len(tx_ins))
         for tx_in in tx_ins:
             self += tx_in
-        self += shared.VarInt(len(tx_outs))
+        self += shared.encode_varint(len(tx_outs))
         for tx_out in tx_outs:
             self += tx_out
         self += lock_time
         self += expiry
-        self += shared.VarInt(len(tx_witnesses))
+        self += shared.encode_varint(len(tx_witnesses))
         for tx_witness in tx_witnesses:
             self += tx_witness
 
@@ -239,53 +252,146 @@ class DecredTx(DecredByteData):
         self._make_immutable()
 
     @classmethod
-    def from_bytes(DecredTx, byte_string):
-        raise NotImplementedError('TODO')
+    def from_bytes(DecredTx, byte_string, offset=0, network=None):
+        '''
+        byte-like, int, str -> DecredTx
+        Parses a full (type 0) or prefix-only (type 1) serialization.
+        A prefix-only tx is returned as a full tx with no witnesses.
+        The input is walked with a single memoryview and a cursor.
+        network optionally names the network to parse under.
+        '''
+        with riemann.network_context(network):
+            buf = memoryview(byte_string)
+            ser_type = DecredTx._serialization_type(buf, offset)
+            if ser_type not in (0, 1):
+                raise ValueError(
+                    'Expected full or prefix-only serialization. '
+                    'Got serialization type {}. '
+                    'Use witnesses_from_bytes for witness-only data.'
+                    .format(ser_type))
+            version = bytes(buf[offset:offset + 2]) + b'\x00\x00'
+
+            tx_ins = []
+            tx_ins_num, n = shared.decode_varint(buf, offset + 4)
+            current = offset + 4 + n
+            for _ in range(tx_ins_num):
+                tx_in = DecredTxIn.from_bytes(buf, current)
+                current += len(tx_in)
+                tx_ins.append(tx_in)
+
+            tx_outs = []
+            tx_outs_num, n = shared.decode_varint(buf, current)
+            current += n
+            for _ in range(tx_outs_num):
+                tx_out = DecredTxOut.from_bytes(buf, current)
+                current += len(tx_out)
+                tx_outs.append(tx_out)
+
+            lock_time = bytes(buf[current:current + 4])
+            expiry = bytes(buf[current + 4:current + 8])
+            current += 8
+
+            if ser_type == 0:
+                tx_witnesses, _ = DecredTx._parse_witnesses(buf, current)
+            else:
+                tx_witnesses = []
+
+            return DecredTx(
+                version=version,
+                tx_ins=tx_ins,
+                tx_outs=tx_outs,
+                lock_time=lock_time,
+                expiry=expiry,
+                tx_witnesses=tx_witnesses)
+
+    @staticmethod
+    def witnesses_from_bytes(byte_string, offset=0, network=None):
+        '''
+        byte-like, int, str -> list(DecredInputWitness)
+        Parses a witness-only (type 2) serialization.
+        Combine with a prefix-only tx using copy(tx_witnesses=...)
+        '''
+        with riemann.network_context(network):
+            buf = memoryview(byte_string)
+            ser_type = DecredTx._serialization_type(buf, offset)
+            if ser_type != 2:
+                raise ValueError(
+                    'Expected witness-only serialization. '
+                    'Got serialization type {}.'.format(ser_type))
+            return DecredTx._parse_witnesses(buf, offset + 4)[0]
+
+    @staticmethod
+    def _serialization_type(buf, offset):
+        if len(buf) - offset < 4:
+            raise ValueError('Tx is too short. Got {} bytes.'
+                             .format(len(buf) - offset))
+        return utils.le2i(buf[offset + 2:offset + 4])
+
+    @staticmethod
+    def _parse_witnesses(buf, current):
+        tx_witnesses = []
+        tx_witnesses_num, n = shared.decode_varint(buf, current)
+        current += n
+        for _ in range(tx_witnesses_num):
+            tx_witness = DecredInputWitness.from_bytes(buf, current)
+            current += len(tx_witness)
+            tx_witnesses.append(tx_witness)
+        return tx_witnesses, current
 
     def prefix_hash(self):
         try:
             return self.tx_id_le  # Prevent redundant hashing
         except AttributeError:
-            return utils.blake256(self.prefix())
+            return self._stream_hash(self._prefix_pieces())
 
     def witness_hash(self):
-        return utils.blake256(self.witness())
+        return self._stream_hash(self._witness_pieces())
 
     def witness_signing_hash(self):
-        return utils.blake256(self.witness_signing())
-
-    def prefix(self):
-        data = DecredByteData()
-        data += self.version[:2]
-        data += b'\x01\x00'  # Serialization type 1 (prefix only)
-        data += shared.VarInt(len(self.tx_ins))
+        return self._stream_hash(self._witness_signing_pieces())
+
+    @staticmethod
+    def _stream_hash(pieces):
+        h = b256.new()
+        for piece in pieces:
+            h.update(piece)
+        return h.digest()
+
+    def _prefix_pieces(self):
+        yield self.version[:2]
+        yield b'\x01\x00'  # Serialization type 1 (prefix only)
+        yield shared.encode_varint(len(self.tx_ins))
         for tx_in in self.tx_ins:
-            data += tx_in
-        data += shared.VarInt(len(self.tx_outs))
+            yield tx_in._bytes
+        yield shared.encode_varint(len(self.tx_outs))
         for tx_out in self.tx_outs:
-            data += tx_out
-        data += self.lock_time
-        data += self.expiry
-        return data.to_bytes()
+            yield tx_out._bytes
+        yield self.lock_time
+        yield self.expiry
+
+    def _witness_pieces(self):
+        yield self.version[:2]
+        yield b'\x02\x00'  # Serialization type 2 (witness only)
+        yield shared.encode_varint(len(self.tx_witnesses))
+        for tx_witness in self.tx_witnesses:
+            yield tx_witness._bytes
 
-    def witness(self):
-        data = DecredByteData()
-        data += self.version[:2]
-        data += b'\x02\x00'  # Serialization type 2 (witness only)
-        data += shared.VarInt(len(self.tx_witnesses))
+    def _witness_signing_pieces(self):
+        yield self.version[:2]
+        yield b'\x03\x00'  # Serialization type 3 (witness signing)
+        yield shared.encode_varint(len(self.tx_witnesses))
         for tx_witness in self.tx_witnesses:
-            data += tx_witness
-        return data.to_bytes()
+            yield shared.encode_varint(tx_witness.script_len)
+            yield tx_witness.script_sig
+
+    def prefix(self):
+        return b''.join(self._prefix_pieces())
+
+    def witness(self):
+        return b''.join(self._witness_pieces())
 
     def witness_signing(self):
-        data = DecredByteData()
-        data += self.version[:2]
-        data += b'\x03\x00'  # Serialization type 3 (witness signing)
-        data += shared.VarInt(len(self.tx_witnesses))
-        for tx_witness in self.tx_witnesses:
-            data += shared.VarInt(tx_witness.script_len)
-            data += tx_witness.script_sig
-        return data.to_bytes()
+        return b''.join(self._witness_signing_pieces())
 
     def calculate_fee(self):
         return \
@@ -307,81 +413,171 @@ class DecredTx(DecredByteData):
     def sighash_none(self):
         raise NotImplementedError('SIGHASH_NONE is a bad idea.')
 
-    def _sighash_prep(self, index, script=None):
-        copy_tx_witnesses = [w.copy(stack_script=b'', redeem_script=b'')
-                             for w in self.tx_witnesses]
-        copy_tx_witnesses[index] = \
-            copy_tx_witnesses[index].copy(stack_script=script,
-                                          redeem_script=b'')
-
-        return self.copy(tx_witnesses=copy_tx_witnesses)
-
     def sighash_single(self, index, script=None,
                        anyone_can_pay=False):
         '''
         https://github.com/decred/dcrd/blob/master/txscript/script.go
         '''
-        copy_tx = self._sighash_prep(
-            index=index,
-            script=script)
-
-        try:
-            copy_tx_outs = copy_tx.tx_outs[:index + 1]
-            copy_tx_outs = [TxOut(value=b'\xff' * 8, output_script=b'')
-                            for _ in copy_tx.tx_ins]
-            copy_tx_outs[index] = copy_tx.tx_outs[index]
-        except IndexError:
+        if index >= len(self.tx_outs):
             raise NotImplementedError(
                 'I refuse to implement the SIGHASH_SINGLE bug.')
 
-        copy_tx_ins = [tx_in.copy(sequence=b'\x00\x00\x00\x00')
-                       for tx_in in copy_tx.tx_ins]
-        copy_tx_ins[index] = copy_tx.tx_ins[index]
-        copy_tx = copy_tx.copy(tx_ins=copy_tx_ins, tx_outs=copy_tx_outs)
+        midstate = self._witness_signing_midstate()
+        midstate.update(b'\x00' * index)
 
-        if anyone_can_pay:
-            return self._sighash_anyone_can_pay(
-                index=index,
-                copy_tx=copy_tx,
-                sighash_type=shared.SIGHASH_SINGLE)
+        blanked_ins = self._blanked_tx_ins()
+        prefix_midstate = self._sighash_single_prefix_midstate()
+        prefix_midstate.update(b''.join(blanked_ins[:index]))
 
         return self._sighash_final_hashing(
-            index=index,
-            copy_tx=copy_tx,
-            sighash_type=shared.SIGHASH_SINGLE)
+            sighash_type=shared.SIGHASH_SINGLE,
+            anyone_can_pay=anyone_can_pay,
+            prefix_hash=self._sighash_single_prefix_hash(
+                index, prefix_midstate, blanked_ins),
+            witness_signing_hash=self._sighash_witness_signing_hash(
+                index, script, midstate))
 
     def sighash_all(self, index, script=None, anyone_can_pay=False):
         '''
         https://gist.github.com/davecgh/b00ec6e11f73620c3deddf160353961c
         https://github.com/decred/dcrd/blob/master/txscript/script.go
         '''
-        copy_tx = self._sighash_prep(index, script)
-
-        if anyone_can_pay:
-            return self._sighash_anyone_can_pay(
-                index=index,
-                copy_tx=copy_tx,
-                sighash_type=shared.SIGHASH_ALL)
+        midstate = self._witness_signing_midstate()
+        midstate.update(b'\x00' * index)
 
         return self._sighash_final_hashing(
-            index=index,
-            copy_tx=copy_tx,
-            sighash_type=shared.SIGHASH_ALL)
+            sighash_type=shared.SIGHASH_ALL,
+            anyone_can_pay=anyone_can_pay,
+            prefix_hash=self.prefix_hash(),
+            witness_signing_hash=self._sighash_witness_signing_hash(
+                index, script, midstate))
+
+    def sighashes(self, scripts, sighash_type=shared.SIGHASH_ALL,
+                  anyone_can_pay=False):
+        '''
+        DecredTx, list(byte-like), int, bool -> list(bytes)
+        Generates the hash to be signed for every input in one call.
+        scripts are in the same order as tx_ins.
+        The witness signing serialization before each input is hashed once
+        and shared by all later inputs.
+        SIGHASH_SINGLE shares its modified prefix the same way, but the
+        inputs after index and the nulled outputs before it still differ
+        per input. So SIGHASH_SINGLE batches hash O(n^2) bytes, and only
+        SIGHASH_ALL batches are linear.
+        '''
+        if sighash_type == shared.SIGHASH_NONE:
+            return self.sighash_none()
+        if sighash_type not in (shared.SIGHASH_ALL, shared.SIGHASH_SINGLE):
+            raise ValueError('Unknown sighash type. Got: {}'
+                             .format(sighash_type))
 
-    def _sighash_anyone_can_pay(self, index, copy_tx, sighash_type):
-        copy_tx_witnesses = [w.copy(stack_script=b'', redeem_script=b'')
-                             for w in copy_tx.tx_witnesses]
-        copy_tx_witnesses[index] = copy_tx.tx_witnesses[index]
-        copy_tx = copy_tx.copy(tx_witnesses=copy_tx_witnesses)
+        if len(scripts) != len(self.tx_witnesses):
+            raise ValueError(
+                'Script and TxWitness lists must be same length. '
+                'Got {} witnesses and {} scripts.'
+                .format(len(self.tx_witnesses), len(scripts)))
 
-        return self._sighash_final_hashing(
-            index=index,
-            copy_tx=copy_tx,
-            sighash_type=sighash_type | shared.SIGHASH_ANYONECANPAY)
-
-    def _sighash_final_hashing(self, index, copy_tx, sighash_type):
-        sighash = DecredByteData()
-        sighash += utils.i2le_padded(sighash_type, 4)
-        sighash += copy_tx.prefix_hash()
-        sighash += copy_tx.witness_signing_hash()
-        return utils.blake256(sighash.to_bytes())
+        if (sighash_type == shared.SIGHASH_SINGLE
+                and len(scripts) > len(self.tx_outs)):
+            raise NotImplementedError(
+                'I refuse to implement the SIGHASH_SINGLE bug.')
+
+        if sighash_type == shared.SIGHASH_SINGLE:
+            blanked_ins = self._blanked_tx_ins()
+            prefix_midstate = self._sighash_single_prefix_midstate()
+
+        sighashes = []
+        midstate = self._witness_signing_midstate()
+        for index, script in enumerate(scripts):
+            if sighash_type == shared.SIGHASH_SINGLE:
+                prefix_hash = self._sighash_single_prefix_hash(
+                    index, prefix_midstate, blanked_ins)
+                prefix_midstate.update(blanked_ins[index])
+            else:
+                prefix_hash = self.prefix_hash()
+            sighashes.append(self._sighash_final_hashing(
+                sighash_type=sighash_type,
+                anyone_can_pay=anyone_can_pay,
+                prefix_hash=prefix_hash,
+                witness_signing_hash=self._sighash_witness_signing_hash(
+                    index, script, midstate)))
+            midstate.update(b'\x00')  # Blank script for the next input
+        return sighashes
+
+    def _witness_signing_midstate(self):
+        '''
+        DecredTx -> Blake256
+        Hasher holding the start of every input's witness signing
+        serialization. Feed it one blank script per preceding input.
+        '''
+        h = b256.new()
+        h.update(self.version[:2])
+        h.update(b'\x03\x00')  # Serialization type 3 (witness signing)
+        h.update(shared.encode_varint(len(self.tx_witnesses)))
+        return h
+
+    def _sighash_witness_signing_hash(self, index, script, midstate):
+        '''
+        DecredTx, int, byte-like, Blake256 -> bytes
+        Every witness script is blanked except the one at index.
+        midstate is not modified.
+        '''
+        if script is None:
+            script = b''
+        self.validate_bytes(script, None)
+        if index >= len(self.tx_witnesses):
+            raise IndexError('list index out of range')
+
+        h = midstate.copy()
+        h.update(shared.encode_varint(len(script)))
+        h.update(script)
+        h.update(b'\x00' * (len(self.tx_witnesses) - index - 1))
+        return h.digest()
+
+    def _blanked_tx_ins(self):
+        '''
+        DecredTx -> list(bytes)
+        Each tx_in's outpoint with a 0 sequence number, for SIGHASH_SINGLE.
+        '''
+        return [tx_in._bytes[:37] + b'\x00' * 4  # outpoint
+                for tx_in in self.tx_ins]
+
+    def _sighash_single_prefix_midstate(self):
+        '''
+        DecredTx -> Blake256
+        Hasher holding the start of every input's SIGHASH_SINGLE prefix.
+        Feed it one blanked tx_in per preceding input.
+        '''
+        h = b256.new()
+        h.update(self.version[:2])
+        h.update(b'\x01\x00')  # Serialization type 1 (prefix only)
+        h.update(shared.encode_varint(len(self.tx_ins)))
+        return h
+
+    def _sighash_single_prefix_hash(self, index, midstate, blanked_ins):
+        '''
+        DecredTx, int, Blake256, list(bytes) -> bytes
+        Prefix hash with the SIGHASH_SINGLE modifications.
+        Other tx_ins' sequence numbers are set to 0.
+        Outputs after index are removed.
+        Outputs before index are set to -1 value and null scripts.
+        midstate covers the blanked tx_ins before index. It is not modified.
+        '''
+        h = midstate.copy()
+        h.update(self.tx_ins[index]._bytes)
+        h.update(b''.join(blanked_ins[index + 1:]))
+        h.update(shared.encode_varint(index + 1))
+        h.update((b'\xff' * 8 + b'\x00' * 3) * index)
+        h.update(self.tx_outs[index]._bytes)
+        h.update(self.lock_time)
+        h.update(self.expiry)
+        return h.digest()
+
+    def _sighash_final_hashing(self, sighash_type, anyone_can_pay,
+                               prefix_hash, witness_signing_hash):
+        if anyone_can_pay:
+            sighash_type |= shared.SIGHASH_ANYONECANPAY
+        h = b256.new(utils.i2le_padded(sighash_type, 4))
+        h.update(prefix_hash)
+        h.update(witness_signing_hash)
+        return h.digest()
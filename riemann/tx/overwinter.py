@@ -56,16 +56,16 @@ class OverwinterTx(z.ZcashByteData):
 
         self += b'\x03\x00\x00\x80'  # Version 3 + fOverwintered
         self += b'\x70\x82\xc4\x03'  # Overwinter Group ID
-        self += shared.VarInt(len(tx_ins))
+        self += shared.encode_varint(len(tx_ins))
         for tx_in in tx_ins:
             self += tx_in
-        self += shared.VarInt(len(tx_outs))
+        self += shared.encode_varint(len(tx_outs))
         for tx_out in tx_outs:
             self += tx_out
         self += lock_time
         self += expiry_height
 
-        self += shared.VarInt(len(tx_joinsplits))
+        self += shared.encode_varint(len(tx_joinsplits))
         if len(tx_joinsplits) != 0:
             for tx_joinsplit in tx_joinsplits:
                 self += tx_joinsplit
@@ -99,6 +99,9 @@ class OverwinterTx(z.ZcashByteData):
         self.tx_id_le = self.tx_id_le = utils.hash256(self.to_bytes())
         self.tx_id = self.tx_id_le[::-1]
 
+        # ZIP143/ZIP243 digests. Filled on first use by the _hash_* methods
+        self._hash_cache = {}
+
         self._make_immutable()
 
         if len(self) > 100000:
@@ -186,19 +189,19 @@ class OverwinterTx(z.ZcashByteData):
                         group_id.hex()))
 
         tx_ins = []
-        tx_ins_num = shared.VarInt.from_bytes(byte_string[8:])
+        tx_ins_num, n = shared.decode_varint(byte_string, 8)
 
-        current = 8 + len(tx_ins_num)
-        for _ in range(tx_ins_num.number):
+        current = 8 + n
+        for _ in range(tx_ins_num):
             tx_in = TxIn.from_bytes(byte_string[current:])
             current += len(tx_in)
             tx_ins.append(tx_in)
 
         tx_outs = []
-        tx_outs_num = shared.VarInt.from_bytes(byte_string[current:])
+        tx_outs_num, n = shared.decode_varint(byte_string, current)
 
-        current += len(tx_outs_num)
-        for _ in range(tx_outs_num.number):
+        current += n
+        for _ in range(tx_outs_num):
             tx_out = TxOut.from_bytes(byte_string[current:])
             current += len(tx_out)
             tx_outs.append(tx_out)
@@ -215,9 +218,9 @@ class OverwinterTx(z.ZcashByteData):
             joinsplit_sig = None
         else:
             tx_joinsplits = []
-            tx_joinsplits_num = shared.VarInt.from_bytes(byte_string[current:])
-            current += len(tx_outs_num)
-            for _ in range(tx_joinsplits_num.number):
+            tx_joinsplits_num, n = shared.decode_varint(byte_string, current)
+            current += n
+            for _ in range(tx_joinsplits_num):
                 tx_joinsplit = z.SproutJoinsplit.from_bytes(
                     byte_string[current:])
                 current += len(tx_joinsplit)
@@ -282,50 +285,86 @@ class OverwinterTx(z.ZcashByteData):
             digest_size=32,
             person=b'ZcashSigHash' + bytes.fromhex('191ba85b'))  # Branch ID
 
+    def sighashes(self, scripts, prevout_values,
+                  sighash_type=shared.SIGHASH_ALL, anyone_can_pay=False):
+        '''
+        OverwinterTx, list(bytes), list(bytes), int, bool -> list(bytes)
+        Generates the hash to be signed for every transparent input at once.
+        scripts and prevout_values are in the same order as tx_ins.
+        The ZIP143 digests are computed once and shared by all inputs.
+        '''
+        if sighash_type not in (shared.SIGHASH_ALL, shared.SIGHASH_SINGLE,
+                                shared.SIGHASH_NONE):
+            raise ValueError('Unknown sighash type. Got: {}'
+                             .format(sighash_type))
+
+        if len(scripts) != len(self.tx_ins):
+            raise ValueError(
+                'Script and TxIn lists must be same length. '
+                'Got {} inputs and {} scripts.'
+                .format(len(self.tx_ins), len(scripts)))
+
+        if len(prevout_values) != len(self.tx_ins):
+            raise ValueError(
+                'Prevout value and TxIn lists must be same length. '
+                'Got {} inputs and {} prevout values.'
+                .format(len(self.tx_ins), len(prevout_values)))
+
+        return [self.sighash(sighash_type=sighash_type,
+                             index=i,
+                             script_code=scripts[i],
+                             anyone_can_pay=anyone_can_pay,
+                             prevout_value=prevout_values[i])
+                for i in range(len(self.tx_ins))]
+
     def _hash_prevouts(self, anyone_can_pay):
         if anyone_can_pay:
             return b'\x00' * 32
 
-        data = z.ZcashByteData()
-        for tx_in in self.tx_ins:
-            data += tx_in.outpoint
-
-        return utils.blake2b(
-            data=data.to_bytes(),
-            digest_size=32,
-            person=b'ZcashPrevoutHash')
+        if 'prevouts' not in self._hash_cache:
+            data = z.ZcashByteData()
+            for tx_in in self.tx_ins:
+                data += tx_in.outpoint
+            self._hash_cache['prevouts'] = utils.blake2b(
+                data=data.to_bytes(),
+                digest_size=32,
+                person=b'ZcashPrevoutHash')
+        return self._hash_cache['prevouts']
 
     def _hash_sequence(self, sighash_type, anyone_can_pay):
         if anyone_can_pay or sighash_type == shared.SIGHASH_SINGLE:
             return b'\x00' * 32
 
-        data = z.ZcashByteData()
-        for tx_in in self.tx_ins:
-            data += tx_in.sequence
-
-        return utils.blake2b(
-            data=data.to_bytes(),
-            digest_size=32,
-            person=b'ZcashSequencHash')
+        if 'sequence' not in self._hash_cache:
+            data = z.ZcashByteData()
+            for tx_in in self.tx_ins:
+                data += tx_in.sequence
+            self._hash_cache['sequence'] = utils.blake2b(
+                data=data.to_bytes(),
+                digest_size=32,
+                person=b'ZcashSequencHash')
+        return self._hash_cache['sequence']
 
     def _hash_outputs(self, sighash_type, index):
         if sighash_type not in [shared.SIGHASH_ALL, shared.SIGHASH_SINGLE]:
             return b'\x00' * 32
 
-        data = z.ZcashByteData()
-
         if sighash_type == shared.SIGHASH_ALL:
-            for tx_out in self.tx_outs:
-                data += tx_out
-
-        if sighash_type == shared.SIGHASH_SINGLE:
-            if index > len(self.tx_outs):
-                raise NotImplementedError(
-                    'I refuse to implement the SIGHASH_SINGLE bug.')
-            data += self.tx_outs[index]
-
+            if 'outputs' not in self._hash_cache:
+                data = z.ZcashByteData()
+                for tx_out in self.tx_outs:
+                    data += tx_out
+                self._hash_cache['outputs'] = utils.blake2b(
+                    data=data.to_bytes(),
+                    digest_size=32,
+                    person=b'ZcashOutputsHash')
+            return self._hash_cache['outputs']
+
+        if index >= len(self.tx_outs):
+            raise NotImplementedError(
+                'I refuse to implement the SIGHASH_SINGLE bug.')
         return utils.blake2b(
-            data=data.to_bytes(),
+            data=self.tx_outs[index].to_bytes(),
             digest_size=32,
             person=b'ZcashOutputsHash')
 
@@ -333,14 +372,13 @@ class OverwinterTx(z.ZcashByteData):
         if len(self.tx_joinsplits) == 0:
             return b'\x00' * 32
 
-        data = z.ZcashByteData()
-
-        for joinsplit in self.tx_joinsplits:
-            data += joinsplit
-
-        data += self.joinsplit_pubkey
-
-        return utils.blake2b(
-            data=data.to_bytes(),
-            digest_size=32,
-            person=b'ZcashJSplitsHash')
+        if 'joinsplits' not in self._hash_cache:
+            data = z.ZcashByteData()
+            for joinsplit in self.tx_joinsplits:
+                data += joinsplit
+            data += self.joinsplit_pubkey
+            self._hash_cache['joinsplits'] = utils.blake2b(
+                data=data.to_bytes(),
+                digest_size=32,
+                person=b'ZcashJSplitsHash')
+        return self._hash_cache['joinsplits']
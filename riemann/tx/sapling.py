@@ -6,6 +6,10 @@ from riemann.tx import zcash_shared as z
 
 
 class SaplingShieldedSpend(z.ZcashByteData):
+    '''
+    Fields are read out of the serialized record on access.
+    '''
+    __slots__ = ()
 
     def __init__(self, cv, anchor, nullifier, rk, zkproof, spend_auth_sig):
         super().__init__()
@@ -28,27 +32,45 @@ class SaplingShieldedSpend(z.ZcashByteData):
         self += zkproof
         self += spend_auth_sig
 
-        self.cv = cv
-        self.anchor = anchor
-        self.nullifier = nullifier
-        self.rk = rk
-        self.zkproof = zkproof
-        self.spend_auth_sig = spend_auth_sig
-
         self._make_immutable()
 
+    @property
+    def cv(self):
+        return self._bytes[0:32]
+
+    @property
+    def anchor(self):
+        return self._bytes[32:64]
+
+    @property
+    def nullifier(self):
+        return self._bytes[64:96]
+
+    @property
+    def rk(self):
+        return self._bytes[96:128]
+
+    @property
+    def zkproof(self):
+        return SaplingZkproof._from_record(self._bytes, 128, 192)
+
+    @property
+    def spend_auth_sig(self):
+        return self._bytes[320:384]
+
     @classmethod
-    def from_bytes(SaplingShieldedSpend, byte_string):
-        return SaplingShieldedSpend(
-            cv=byte_string[0:32],
-            anchor=byte_string[32:64],
-            nullifier=byte_string[64:96],
-            rk=byte_string[96:128],
-            zkproof=SaplingZkproof.from_bytes(byte_string[128:320]),
-            spend_auth_sig=byte_string[320:384])
+    def from_bytes(SaplingShieldedSpend, byte_string, offset=0):
+        '''
+        byte-like, int -> SaplingShieldedSpend
+        '''
+        return SaplingShieldedSpend._from_record(byte_string, offset, 384)
 
 
 class SaplingShieldedOutput(z.ZcashByteData):
+    '''
+    Fields are read out of the serialized record on access.
+    '''
+    __slots__ = ()
 
     def __init__(self, cv, cmu, ephemeral_key, enc_ciphertext, out_ciphertext,
                  zkproof):
@@ -72,27 +94,42 @@ class SaplingShieldedOutput(z.ZcashByteData):
         self += out_ciphertext
         self += zkproof
 
-        self.cv = cv
-        self.cmu = cmu
-        self.ephemeral_key = ephemeral_key
-        self.enc_ciphertext = enc_ciphertext
-        self.out_ciphertext = out_ciphertext
-        self.zkproof = zkproof
-
         self._make_immutable()
 
+    @property
+    def cv(self):
+        return self._bytes[0:32]
+
+    @property
+    def cmu(self):
+        return self._bytes[32:64]
+
+    @property
+    def ephemeral_key(self):
+        return self._bytes[64:96]
+
+    @property
+    def enc_ciphertext(self):
+        return self._bytes[96:676]
+
+    @property
+    def out_ciphertext(self):
+        return self._bytes[676:756]
+
+    @property
+    def zkproof(self):
+        return SaplingZkproof._from_record(self._bytes, 756, 192)
+
     @classmethod
-    def from_bytes(SaplingShieldedOutput, byte_string):
-        return SaplingShieldedOutput(
-            cv=byte_string[0:32],
-            cmu=byte_string[32:64],
-            ephemeral_key=byte_string[64:96],
-            enc_ciphertext=byte_string[96:676],
-            out_ciphertext=byte_string[676:756],
-            zkproof=SaplingZkproof.from_bytes(byte_string[756:948]))
+    def from_bytes(SaplingShieldedOutput, byte_string, offset=0):
+        '''
+        byte-like, int -> SaplingShieldedOutput
+        '''
+        return SaplingShieldedOutput._from_record(byte_string, offset, 948)
 
 
 class SaplingZkproof(z.ZcashByteData):
+    __slots__ = ()
 
     def __init__(self, pi_sub_a, pi_sub_b, pi_sub_c):
         super().__init__()
@@ -105,21 +142,34 @@ class SaplingZkproof(z.ZcashByteData):
         self += pi_sub_b
         self += pi_sub_c
 
-        self.pi_sub_a = pi_sub_a
-        self.pi_sub_b = pi_sub_b
-        self.pi_sub_c = pi_sub_c
-
         self._make_immutable()
 
+    @property
+    def pi_sub_a(self):
+        return self._bytes[0:48]
+
+    @property
+    def pi_sub_b(self):
+        return self._bytes[48:144]
+
+    @property
+    def pi_sub_c(self):
+        return self._bytes[144:192]
+
     @classmethod
-    def from_bytes(SaplingZkproof, byte_string):
-        return SaplingZkproof(
-            pi_sub_a=byte_string[0:48],
-            pi_sub_b=byte_string[48:144],
-            pi_sub_c=byte_string[144:192])
+    def from_bytes(SaplingZkproof, byte_string, offset=0):
+        '''
+        byte-like, int -> SaplingZkproof
+        '''
+        return SaplingZkproof._from_record(byte_string, offset, 192)
 
 
 class SaplingJoinsplit(z.ZcashByteData):
+    '''
+    Fields are read out of the serialized record on access.
+    '''
+    __slots__ = ()
+
     def __init__(self, vpub_old, vpub_new, anchor, nullifiers, commitments,
                  ephemeral_key, random_seed, vmacs, zkproof, encoded_notes):
         super().__init__()
@@ -154,32 +204,159 @@ class SaplingJoinsplit(z.ZcashByteData):
         self += zkproof
         self += encoded_notes
 
-        self.vpub_old = vpub_old
-        self.vpub_new = vpub_new
-        self.anchor = anchor
-        self.nullifiers = nullifiers
-        self.commitments = commitments
-        self.ephemeral_key = ephemeral_key
-        self.random_seed = random_seed
-        self.vmacs = vmacs
-        self.zkproof = zkproof
-        self.encoded_notes = encoded_notes
-
         self._make_immutable()
 
+    @property
+    def vpub_old(self):
+        return self._bytes[0:8]
+
+    @property
+    def vpub_new(self):
+        return self._bytes[8:16]
+
+    @property
+    def anchor(self):
+        return self._bytes[16:48]
+
+    @property
+    def nullifiers(self):
+        return self._bytes[48:112]
+
+    @property
+    def commitments(self):
+        return self._bytes[112:176]
+
+    @property
+    def ephemeral_key(self):
+        return self._bytes[176:208]
+
+    @property
+    def random_seed(self):
+        return self._bytes[208:240]
+
+    @property
+    def vmacs(self):
+        return self._bytes[240:304]
+
+    @property
+    def zkproof(self):
+        return SaplingZkproof._from_record(self._bytes, 304, 192)
+
+    @property
+    def encoded_notes(self):
+        return self._bytes[496:1698]
+
     @classmethod
-    def from_bytes(SaplingJoinsplit, byte_string):
-        return SaplingJoinsplit(
-            vpub_old=byte_string[0:8],
-            vpub_new=byte_string[8:16],
-            anchor=byte_string[16:48],
-            nullifiers=byte_string[48:112],
-            commitments=byte_string[112:176],
-            ephemeral_key=byte_string[176:208],
-            random_seed=byte_string[208:240],
-            vmacs=byte_string[240:304],
-            zkproof=SaplingZkproof.from_bytes(byte_string[304:496]),
-            encoded_notes=byte_string[496:1698])
+    def from_bytes(SaplingJoinsplit, byte_string, offset=0):
+        '''
+        byte-like, int -> SaplingJoinsplit
+        '''
+        joinsplit = SaplingJoinsplit._from_record(byte_string, offset, 1698)
+        if (utils.le2i(joinsplit.vpub_old) != 0
+                and utils.le2i(joinsplit.vpub_new) != 0):
+            raise ValueError('vpub_old or vpub_new must be zero')
+        return joinsplit
+
+
+# Field name: (start, end) within each record
+SHIELDED_SPEND_LAYOUT = {
+    'cv': (0, 32),
+    'anchor': (32, 64),
+    'nullifier': (64, 96),
+    'rk': (96, 128),
+    'zkproof': (128, 320),
+    'spend_auth_sig': (320, 384)}
+
+SHIELDED_OUTPUT_LAYOUT = {
+    'cv': (0, 32),
+    'cmu': (32, 64),
+    'ephemeral_key': (64, 96),
+    'enc_ciphertext': (96, 676),
+    'out_ciphertext': (676, 756),
+    'zkproof': (756, 948)}
+
+
+class SaplingRecordArray():
+    '''
+    byte-like, int, dict -> SaplingRecordArray
+    Read-only columnar table over back-to-back fixed-width records.
+    layout maps each field name to its (start, end) within a record.
+    '''
+    __slots__ = ('_data', '_width', '_layout')
+
+    def __init__(self, data, width, layout):
+        if len(data) % width != 0:
+            raise ValueError(
+                'Expected a multiple of {} bytes. Got {} bytes.'
+                .format(width, len(data)))
+        self._data = bytes(data)
+        self._width = width
+        self._layout = layout
+
+    def __len__(self):
+        return len(self._data) // self._width
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError('record index out of range')
+        start = (index % len(self)) * self._width
+        return self._data[start:start + self._width]
+
+    @property
+    def fields(self):
+        return tuple(self._layout)
+
+    def to_bytes(self):
+        return self._data
+
+    def _field(self, field):
+        try:
+            return self._layout[field]
+        except KeyError:
+            raise ValueError('Unknown field. Got: {}'.format(field))
+
+    def packed(self, field):
+        '''
+        SaplingRecordArray, str -> bytes
+        One field from every record, back to back.
+        '''
+        start, end = self._field(field)
+        size = end - start
+        if len(self) <= size:
+            return b''.join(self.column(field))
+
+        # One strided copy per byte of the field, whatever the record count
+        packed = bytearray(len(self) * size)
+        for i in range(size):
+            packed[i::size] = self._data[start + i::self._width]
+        return bytes(packed)
+
+    def column(self, field):
+        '''
+        SaplingRecordArray, str -> list(bytes)
+        One field from every record, in order.
+        '''
+        start, end = self._field(field)
+        size = end - start
+        return [self._data[i:i + size]
+                for i in range(start, len(self._data), self._width)]
+
+    @classmethod
+    def concat(SaplingRecordArray, arrays):
+        '''
+        list(SaplingRecordArray) -> SaplingRecordArray
+        Joins arrays that share a layout, e.g. from a batch of txns.
+        '''
+        arrays = list(arrays)
+        if len(arrays) == 0:
+            raise ValueError('Expected at least one array.')
+        width = arrays[0]._width
+        layout = arrays[0]._layout
+        for array in arrays:
+            if array._width != width or array._layout != layout:
+                raise ValueError('Arrays must share a record layout.')
+        return SaplingRecordArray(
+            b''.join(array._data for array in arrays), width, layout)
 
 
 class SaplingTx(z.ZcashByteData):
@@ -258,27 +435,29 @@ class SaplingTx(z.ZcashByteData):
 
         self += b'\x04\x00\x00\x00'  # Sapling is always v4
         self += b'\x85\x20\x2f\x89'  # Sapling version group id
-        self += shared.VarInt(len(tx_ins))
+        self += shared.encode_varint(len(tx_ins))
         for tx_in in tx_ins:
             self += tx_in
-        self += shared.VarInt(len(tx_outs))
+        self += shared.encode_varint(len(tx_outs))
         for tx_out in tx_outs:
             self += tx_out
         self += lock_time
         self += expiry_height
         self += value_balance
 
-        self += shared.VarInt(len(tx_shielded_spends))
+        self += shared.encode_varint(len(tx_shielded_spends))
+        self._shielded_spends_start = len(self)
         if len(tx_shielded_spends) != 0:
             for shielded_spend in tx_shielded_spends:
                 self += shielded_spend
 
-        self += shared.VarInt(len(tx_shielded_outputs))
+        self += shared.encode_varint(len(tx_shielded_outputs))
+        self._shielded_outputs_start = len(self)
         if len(tx_shielded_outputs) != 0:
             for shielded_output in tx_shielded_outputs:
                 self += shielded_output
 
-        self += shared.VarInt(len(tx_joinsplits))
+        self += shared.encode_varint(len(tx_joinsplits))
         if len(tx_joinsplits) != 0:
             for tx_joinsplit in tx_joinsplits:
                 self += tx_joinsplit
@@ -331,6 +510,9 @@ class SaplingTx(z.ZcashByteData):
         self.tx_id_le = self.tx_id_le = utils.hash256(self.to_bytes())
         self.tx_id = self.tx_id_le[::-1]
 
+        # ZIP143/ZIP243 digests. Filled on first use by the _hash_* methods
+        self._hash_cache = {}
+
         self._make_immutable()
 
         if len(self) > 100000:
@@ -416,8 +598,9 @@ class SaplingTx(z.ZcashByteData):
         '''
         byte-like -> SaplingTx
         '''
-        header = byte_string[0:4]
-        group_id = byte_string[4:8]
+        buf = memoryview(byte_string)
+        header = bytes(buf[0:4])
+        group_id = bytes(buf[4:8])
 
         if header != b'\x04\x00\x00\x80' or group_id != b'\x85\x20\x2f\x89':
             raise ValueError(
@@ -428,68 +611,67 @@ class SaplingTx(z.ZcashByteData):
                         group_id.hex()))
 
         tx_ins = []
-        tx_ins_num = shared.VarInt.from_bytes(byte_string[8:])
+        tx_ins_num, n = shared.decode_varint(buf, 8)
 
-        current = 8 + len(tx_ins_num)
-        for _ in range(tx_ins_num.number):
-            tx_in = TxIn.from_bytes(byte_string[current:])
+        current = 8 + n
+        for _ in range(tx_ins_num):
+            tx_in = TxIn.from_bytes(buf, current)
             current += len(tx_in)
             tx_ins.append(tx_in)
 
         tx_outs = []
-        tx_outs_num = shared.VarInt.from_bytes(byte_string[current:])
+        tx_outs_num, n = shared.decode_varint(buf, current)
 
-        current += len(tx_outs_num)
-        for _ in range(tx_outs_num.number):
-            tx_out = TxOut.from_bytes(byte_string[current:])
+        current += n
+        for _ in range(tx_outs_num):
+            tx_out = TxOut.from_bytes(buf, current)
             current += len(tx_out)
             tx_outs.append(tx_out)
 
-        lock_time = byte_string[current:current + 4]
+        lock_time = bytes(buf[current:current + 4])
         current += 4
-        expiry_height = byte_string[current:current + 4]
+        expiry_height = bytes(buf[current:current + 4])
         current += 4
-        value_balance = byte_string[current:current + 8]
+        value_balance = bytes(buf[current:current + 8])
         current += 8
 
+        # Shielded records are fixed size. Each is copied out once
         tx_shielded_spends = []
-        shielded_spends_num = shared.VarInt.from_bytes(byte_string[current:])
+        shielded_spends_num, n = shared.decode_varint(buf, current)
 
-        current += len(shielded_spends_num)
-        for _ in range(shielded_spends_num.number):
-            ss = SaplingShieldedSpend.from_bytes(byte_string[current:])
-            current += len(ss)
-            tx_shielded_spends.append(ss)
+        current += n
+        for _ in range(shielded_spends_num):
+            tx_shielded_spends.append(
+                SaplingShieldedSpend.from_bytes(buf, current))
+            current += 384
 
         tx_shielded_outputs = []
-        shielded_outputs_num = shared.VarInt.from_bytes(byte_string[current:])
+        shielded_outputs_num, n = shared.decode_varint(buf, current)
 
-        current += len(shielded_outputs_num)
-        for _ in range(shielded_outputs_num.number):
-            so = SaplingShieldedOutput.from_bytes(byte_string[current:])
-            current += len(so)
-            tx_shielded_outputs.append(so)
+        current += n
+        for _ in range(shielded_outputs_num):
+            tx_shielded_outputs.append(
+                SaplingShieldedOutput.from_bytes(buf, current))
+            current += 948
 
         tx_joinsplits = []
-        tx_joinsplits_num = shared.VarInt.from_bytes(byte_string[current:])
-        current += len(tx_outs_num)
-        for _ in range(tx_joinsplits_num.number):
-            tx_joinsplit = SaplingJoinsplit.from_bytes(
-                byte_string[current:])
-            current += len(tx_joinsplit)
-            tx_joinsplits.append(tx_joinsplit)
+        tx_joinsplits_num, n = shared.decode_varint(buf, current)
+        current += n
+        for _ in range(tx_joinsplits_num):
+            tx_joinsplits.append(SaplingJoinsplit.from_bytes(buf, current))
+            current += 1698
 
         if len(tx_joinsplits) > 0:
-            joinsplit_pubkey = byte_string[current:current + 32]
+            joinsplit_pubkey = bytes(buf[current:current + 32])
             current += 32
-            joinsplit_sig = byte_string[current:current + 64]
+            joinsplit_sig = bytes(buf[current:current + 64])
             current += 64
         else:
             joinsplit_pubkey = None
             joinsplit_sig = None
 
         if len(tx_shielded_spends) + len(tx_shielded_outputs) > 0:
-            binding_sig = byte_string[current:current + 64]
+            binding_sig = bytes(buf[current:current + 64])
             current += 64
         else:
             binding_sig = None
@@ -507,6 +689,29 @@ class SaplingTx(z.ZcashByteData):
             joinsplit_sig=joinsplit_sig,
             binding_sig=binding_sig)
 
+    @property
+    def shielded_spends_array(self):
+        '''
+        SaplingTx -> SaplingRecordArray
+        Columns: cv, anchor, nullifier, rk, zkproof, spend_auth_sig
+        '''
+        start = self._shielded_spends_start
+        end = start + 384 * len(self.tx_shielded_spends)
+        return SaplingRecordArray(
+            self._bytes[start:end], 384, SHIELDED_SPEND_LAYOUT)
+
+    @property
+    def shielded_outputs_array(self):
+        '''
+        SaplingTx -> SaplingRecordArray
+        Columns: cv, cmu, ephemeral_key, enc_ciphertext, out_ciphertext,
+        zkproof
+        '''
+        start = self._shielded_outputs_start
+        end = start + 948 * len(self.tx_shielded_outputs)
+        return SaplingRecordArray(
+            self._bytes[start:end], 948, SHIELDED_OUTPUT_LAYOUT)
+
     def is_witness(self):
         return False
 
@@ -557,49 +762,86 @@ class SaplingTx(z.ZcashByteData):
             digest_size=32,
             person=b'ZcashSigHash' + bytes.fromhex('bb09b876'))  # Branch ID
 
+    def sighashes(self, scripts, prevout_values,
+                  sighash_type=shared.SIGHASH_ALL, anyone_can_pay=False):
+        '''
+        SaplingTx, list(bytes), list(bytes), int, bool -> list(bytes)
+        Generates the hash to be signed for every transparent input at once.
+        scripts and prevout_values are in the same order as tx_ins.
+        The ZIP243 digests are computed once and shared by all inputs.
+        '''
+        if sighash_type not in (shared.SIGHASH_ALL, shared.SIGHASH_SINGLE,
+                                shared.SIGHASH_NONE):
+            raise ValueError('Unknown sighash type. Got: {}'
+                             .format(sighash_type))
+
+        if len(scripts) != len(self.tx_ins):
+            raise ValueError(
+                'Script and TxIn lists must be same length. '
+                'Got {} inputs and {} scripts.'
+                .format(len(self.tx_ins), len(scripts)))
+
+        if len(prevout_values) != len(self.tx_ins):
+            raise ValueError(
+                'Prevout value and TxIn lists must be same length. '
+                'Got {} inputs and {} prevout values.'
+                .format(len(self.tx_ins), len(prevout_values)))
+
+        return [self.sighash(sighash_type=sighash_type,
+                             index=i,
+                             script_code=scripts[i],
+                             anyone_can_pay=anyone_can_pay,
+                             prevout_value=prevout_values[i])
+                for i in range(len(self.tx_ins))]
+
     def _hash_prevouts(self, anyone_can_pay):
         if anyone_can_pay:
             return b'\x00' * 32
 
-        data = z.ZcashByteData()
-        for tx_in in self.tx_ins:
-            data += tx_in.outpoint
-        return utils.blake2b(
-            data=data.to_bytes(),
-            digest_size=32,
-            person=b'ZcashPrevoutHash')
+        if 'prevouts' not in self._hash_cache:
+            data = z.ZcashByteData()
+            for tx_in in self.tx_ins:
+                data += tx_in.outpoint
+            self._hash_cache['prevouts'] = utils.blake2b(
+                data=data.to_bytes(),
+                digest_size=32,
+                person=b'ZcashPrevoutHash')
+        return self._hash_cache['prevouts']
 
     def _hash_sequence(self, sighash_type, anyone_can_pay):
         if anyone_can_pay or sighash_type == shared.SIGHASH_SINGLE:
             return b'\x00' * 32
 
-        data = z.ZcashByteData()
-        for tx_in in self.tx_ins:
-            data += tx_in.sequence
-
-        return utils.blake2b(
-            data=data.to_bytes(),
-            digest_size=32,
-            person=b'ZcashSequencHash')
+        if 'sequence' not in self._hash_cache:
+            data = z.ZcashByteData()
+            for tx_in in self.tx_ins:
+                data += tx_in.sequence
+            self._hash_cache['sequence'] = utils.blake2b(
+                data=data.to_bytes(),
+                digest_size=32,
+                person=b'ZcashSequencHash')
+        return self._hash_cache['sequence']
 
     def _hash_outputs(self, sighash_type, index):
         if sighash_type not in [shared.SIGHASH_ALL, shared.SIGHASH_SINGLE]:
             return b'\x00' * 32
 
-        data = z.ZcashByteData()
-
         if sighash_type == shared.SIGHASH_ALL:
-            for tx_out in self.tx_outs:
-                data += tx_out
-
-        if sighash_type == shared.SIGHASH_SINGLE:
-            if index > len(self.tx_outs):
-                raise NotImplementedError(
-                    'I refuse to implement the SIGHASH_SINGLE bug.')
-            data += self.tx_outs[index]
-
+            if 'outputs' not in self._hash_cache:
+                data = z.ZcashByteData()
+                for tx_out in self.tx_outs:
+                    data += tx_out
+                self._hash_cache['outputs'] = utils.blake2b(
+                    data=data.to_bytes(),
+                    digest_size=32,
+                    person=b'ZcashOutputsHash')
+            return self._hash_cache['outputs']
+
+        if index >= len(self.tx_outs):
+            raise NotImplementedError(
+                'I refuse to implement the SIGHASH_SINGLE bug.')
         return utils.blake2b(
-            data=data.to_bytes(),
+            data=self.tx_outs[index].to_bytes(),
             digest_size=32,
             person=b'ZcashOutputsHash')
 
@@ -607,42 +849,41 @@ class SaplingTx(z.ZcashByteData):
         if len(self.tx_joinsplits) == 0:
             return b'\x00' * 32
 
-        data = z.ZcashByteData()
-
-        for joinsplit in self.tx_joinsplits:
-            data += joinsplit
-
-        data += self.joinsplit_pubkey
-
-        return utils.blake2b(
-            data=data.to_bytes(),
-            digest_size=32,
-            person=b'ZcashJSplitsHash')
+        if 'joinsplits' not in self._hash_cache:
+            data = z.ZcashByteData()
+            for joinsplit in self.tx_joinsplits:
+                data += joinsplit
+            data += self.joinsplit_pubkey
+            self._hash_cache['joinsplits'] = utils.blake2b(
+                data=data.to_bytes(),
+                digest_size=32,
+                person=b'ZcashJSplitsHash')
+        return self._hash_cache['joinsplits']
 
     def _hash_shielded_spends(self):
         if len(self.tx_shielded_spends) == 0:
             return b'\x00' * 32
 
-        data = z.ZcashByteData()
-
-        for ss in self.tx_shielded_spends:
-            data += ss[:320]  # Strip off spend_auth_sig
-
-        return utils.blake2b(
-            data=data.to_bytes(),
-            digest_size=32,
-            person=b'ZcashSSpendsHash')
+        if 'shielded_spends' not in self._hash_cache:
+            data = z.ZcashByteData()
+            for ss in self.tx_shielded_spends:
+                data += ss[:320]  # Strip off spend_auth_sig
+            self._hash_cache['shielded_spends'] = utils.blake2b(
+                data=data.to_bytes(),
+                digest_size=32,
+                person=b'ZcashSSpendsHash')
+        return self._hash_cache['shielded_spends']
 
     def _hash_shielded_outputs(self):
         if len(self.tx_shielded_outputs) == 0:
             return b'\x00' * 32
 
-        data = z.ZcashByteData()
-
-        for so in self.tx_shielded_outputs:
-            data += so
-
-        return utils.blake2b(
-            data=data.to_bytes(),
-            digest_size=32,
-            person=b'ZcashSOutputHash')
+        if 'shielded_outputs' not in self._hash_cache:
+            data = z.ZcashByteData()
+            for so in self.tx_shielded_outputs:
+                data += so
+            self._hash_cache['shielded_outputs'] = utils.blake2b(
+                data=data.to_bytes(),
+                digest_size=32,
+                person=b'ZcashSOutputHash')
+        return self._hash_cache['shielded_outputs']
@@ -1,3 +1,4 @@
+import struct
 import riemann
 from riemann import utils
 
@@ -8,6 +9,89 @@ SIGHASH_SINGLE = 0x03
 SIGHASH_FORKID = 0x40
 SIGHASH_ANYONECANPAY = 0x80
 
+# VarInt prefix -> (total length, struct, smallest compact value)
+_VARINT_FORMATS = {
+    0xfd: (3, struct.Struct('<H'), 0xfd),
+    0xfe: (5, struct.Struct('<I'), 0x10000),
+    0xff: (9, struct.Struct('<Q'), 0x100000000)}
+_VARINT_PREFIXES = {3: b'\xfd', 5: b'\xfe', 9: b'\xff'}
+_SMALL_VARINTS = tuple(bytes([n]) for n in range(0xfd))
+
+
+def encode_varint(number):
+    '''
+    int -> bytes
+    Serializes number as a compact VarInt
+    '''
+    if 0 <= number <= 0xfc:
+        return _SMALL_VARINTS[number]
+    if number < 0:
+        raise ValueError('VarInt cannot be less than 0. '
+                         'Got: {}'.format(number))
+    if number <= 0xffff:
+        return b'\xfd' + _VARINT_FORMATS[0xfd][1].pack(number)
+    if number <= 0xffffffff:
+        return b'\xfe' + _VARINT_FORMATS[0xfe][1].pack(number)
+    if number <= 0xffffffffffffffff:
+        return b'\xff' + _VARINT_FORMATS[0xff][1].pack(number)
+    raise ValueError('VarInt cannot be greater than (2 ** 64) - 1. '
+                     'Got: {}'.format(number))
+
+
+def decode_varint(byte_string, offset=0):
+    '''
+    byte-like, int -> (int, int)
+    Reads the VarInt at offset.
+    Returns its number and its length in bytes.
+    Zcash networks reject non-compact VarInts.
+    '''
+    prefix = byte_string[offset]
+    if prefix <= 0xfc:
+        return prefix, 1
+
+    length, fmt, smallest = _VARINT_FORMATS[prefix]
+    if len(byte_string) < offset + length:
+        raise ValueError('Malformed VarInt. Got: {}'
+                         .format(bytes(byte_string[offset:]).hex()))
+
+    number = fmt.unpack_from(byte_string, offset + 1)[0]
+    if (number < smallest
+        and ('overwinter' in riemann.get_current_network_name()
+             or 'sapling' in riemann.get_current_network_name())):
+        raise ValueError('VarInt must be compact. Got: {}'
+                         .format(bytes(byte_string[offset:offset + length])
+                                 .hex()))
+
+    return number, length
+
+
+def write_all(stream, data):
+    '''
+    file-like, byte-like -> int
+    Writes all of data to stream's write method, or to its update method
+    if it has none (hashlib objects).
+    Raw streams may accept only part of each write. Those are retried
+    from where they stopped. A write that returns None is taken as
+    complete, so non-blocking raw streams are not supported.
+    '''
+    write = getattr(stream, 'write', None)
+    if write is None:
+        stream.update(data)
+        return len(data)
+
+    with memoryview(data) as view:
+        written = 0
+        while written < len(view):
+            n = write(view[written:])
+            if n is None:
+                break
+            if n <= 0:
+                raise ValueError(
+                    'Stream accepted no bytes. Wrote {} of {} bytes.'
+                    .format(written, len(view)))
+            written += n
+    return len(data)
+
 
 class ByteData():
     '''
@@ -18,10 +102,13 @@ class ByteData():
     self._bytes is a byte object when immutable
     Should be mostly transparent to the user
     Can be treated like bytes or a bytearray in most cases
+    Subclasses may declare __slots__ and read their fields out of
+    self._bytes rather than storing separate copies of them
     '''
-    __immutable = False
+    __slots__ = ('_bytes', '__immutable')
 
     def __init__(self):
+        object.__setattr__(self, '_ByteData__immutable', False)
         self._bytes = bytearray()
 
     def __iter__(self):
@@ -78,6 +165,30 @@ class ByteData():
             raise TypeError("%r cannot be written to." % self)
         object.__setattr__(self, key, value)
 
+    def __getstate__(self):
+        '''
+        ByteData -> dict
+        Collects every slot (and __dict__ entry) for copy and pickle.
+        '''
+        state = dict(getattr(self, '__dict__', {}))
+        for klass in type(self).__mro__:
+            for name in klass.__dict__.get('__slots__', ()):
+                if name.startswith('__') and not name.endswith('__'):
+                    name = '_{}{}'.format(klass.__name__.lstrip('_'), name)
+                try:
+                    state[name] = object.__getattribute__(self, name)
+                except AttributeError:
+                    pass
+        return state
+
+    def __setstate__(self, state):
+        '''
+        ByteData, dict -> None
+        Bypasses __setattr__, which refuses writes to immutable objects.
+        '''
+        for key, value in state.items():
+            object.__setattr__(self, key, value)
+
     def __repr__(self):
         '''
         ByteData -> str
@@ -90,6 +201,22 @@ class ByteData():
         '''
         return bytes(self._bytes)
 
+    def serialized_size(self):
+        '''
+        ByteData -> int
+        '''
+        return len(self._bytes)
+
+    def write_to(self, stream):
+        '''
+        ByteData, file-like -> int
+        Writes the serialization to stream without copying it first.
+        stream needs a write method (files, BytesIO, socket.makefile)
+        or an update method (hashlib objects).
+        Returns the number of bytes written.
+        '''
+        return write_all(stream, self._bytes)
+
     def hex(self):
         '''
         ByteData -> hex_string
@@ -100,7 +227,8 @@ class ByteData():
         '''
         Prevents any future changes to the object
         '''
-        self._bytes = bytes(self._bytes)
+        if isinstance(self._bytes, bytearray):
+            self._bytes = bytes(self._bytes)
         self.__immutable = True
 
     def find(self, substring):
@@ -134,6 +262,28 @@ class ByteData():
                              'Got {} with length {}.'
                              .format(length, type(data), len(data)))
 
+    @classmethod
+    def _from_slice(C, byte_string, start, end, **fields):
+        '''
+        byte-like, int, int -> ByteData
+        Wraps already-serialized data without running __init__ checks.
+        For parsing trusted data, e.g. transactions from valid blocks.
+        fields sets the subclass's slots (usually field offsets).
+        '''
+        if end > len(byte_string):
+            raise ValueError(
+                '{} runs past the end of the data. '
+                'Expected {} bytes. Got {} bytes.'
+                .format(C.__name__, end - start, len(byte_string) - start))
+
+        self = C.__new__(C)
+        ByteData.__init__(self)
+        self._bytes = bytes(byte_string[start:end])
+        for key, value in fields.items():
+            setattr(self, key, value)
+        self._make_immutable()
+        return self
+
     @classmethod
     def from_hex(C, hex_string):
         return C.from_bytes(bytes.fromhex(hex_string))
@@ -142,71 +292,39 @@ class ByteData():
 class VarInt(ByteData):
     '''
     NB: number must be integer
+    length forces a non-compact encoding of 3, 5 or 9 bytes
     '''
+    __slots__ = ()
+
     def __init__(self, number, length=None):
         super().__init__()
-        if number < 0x0:
-            raise ValueError('VarInt cannot be less than 0. '
-                             'Got: {}'.format(number))
-        if number > 0xffffffffffffffff:
-            raise ValueError('VarInt cannot be greater than (2 ** 64) - 1. '
-                             'Got: {}'
-                             .format(number))
-        if number <= 0xfc:
-            pass  # No prefix
-        elif number <= 0xffff or length == 3:
-            self += bytes([0xfd])
-            length = 3
-        elif number <= 0xffffffff or length == 5:
-            self += bytes([0xfe])
-            length = 5
-        elif number <= 0xffffffffffffffff or length == 9:
-            self += bytes([0xff])
-            length = 9
-        self += utils.i2le(number)
-
-        if length is not None:
-            while len(self) < length:
-                self += b'\x00'
-
-        self.number = number
+        encoded = encode_varint(number)
+        if length is not None and length > len(encoded):
+            if length not in _VARINT_PREFIXES:
+                raise ValueError('VarInt length must be 3, 5, or 9. '
+                                 'Got: {}'.format(length))
+            encoded = (_VARINT_PREFIXES[length]
+                       + utils.i2le_padded(number, length - 1))
+        self._bytes = encoded
 
         self._make_immutable()
 
+    @property
+    def number(self):
+        prefix = self._bytes[0]
+        if prefix <= 0xfc:
+            return prefix
+        return utils.le2i(self._bytes[1:])
+
     def copy(self):
         return VarInt(self.number)
 
     @classmethod
-    def from_bytes(VarInt, byte_string):
+    def from_bytes(VarInt, byte_string, offset=0):
         '''
-        byte-like -> VarInt
+        byte-like, int -> VarInt
         accepts arbitrary length input, gets a VarInt off the front
+        (or off of the position indicated by offset)
         '''
-        num = byte_string
-        if num[0] <= 0xfc:
-            num = num[0:1]
-            non_compact = False
-        elif num[0] == 0xfd:
-            num = num[1:3]
-            non_compact = (num[-1:] == b'\x00')
-        elif num[0] == 0xfe:
-            num = num[1:5]
-            non_compact = (num[-2:] == b'\x00\x00')
-        elif num[0] == 0xff:
-            num = num[1:9]
-            non_compact = (num[-4:] == b'\x00\x00\x00\x00')
-        if len(num) not in [1, 2, 4, 8]:
-            raise ValueError('Malformed VarInt. Got: {}'
-                             .format(byte_string.hex()))
-
-        if (non_compact
-            and ('overwinter' in riemann.get_current_network_name()
-                 or 'sapling' in riemann.get_current_network_name())):
-            raise ValueError('VarInt must be compact. Got: {}'
-                             .format(byte_string.hex()))
-
-        ret = VarInt(
-            utils.le2i(num),
-            length=len(num) + 1 if non_compact else 0)
-
-        return ret
+        number, length = decode_varint(byte_string, offset)
+        return VarInt(number, length=length)
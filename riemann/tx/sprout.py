@@ -58,16 +58,16 @@ class SproutTx(z.ZcashByteData):
                              'Got: {}'.format(utils.le2i(version)))
 
         self += version
-        self += shared.VarInt(len(tx_ins))
+        self += shared.encode_varint(len(tx_ins))
         for tx_in in tx_ins:
             self += tx_in
-        self += shared.VarInt(len(tx_outs))
+        self += shared.encode_varint(len(tx_outs))
         for tx_out in tx_outs:
             self += tx_out
         self += lock_time
 
         if version == utils.i2le_padded(2, 4):
-            self += shared.VarInt(len(tx_joinsplits))
+            self += shared.encode_varint(len(tx_joinsplits))
             for tx_joinsplit in tx_joinsplits:
                 self += tx_joinsplit
             self += joinsplit_pubkey
@@ -140,19 +140,19 @@ class SproutTx(z.ZcashByteData):
         '''
         version = byte_string[0:4]
         tx_ins = []
-        tx_ins_num = shared.VarInt.from_bytes(byte_string[4:])
+        tx_ins_num, n = shared.decode_varint(byte_string, 4)
 
-        current = 4 + len(tx_ins_num)
-        for _ in range(tx_ins_num.number):
+        current = 4 + n
+        for _ in range(tx_ins_num):
             tx_in = TxIn.from_bytes(byte_string[current:])
             current += len(tx_in)
             tx_ins.append(tx_in)
 
         tx_outs = []
-        tx_outs_num = shared.VarInt.from_bytes(byte_string[current:])
+        tx_outs_num, n = shared.decode_varint(byte_string, current)
 
-        current += len(tx_outs_num)
-        for _ in range(tx_outs_num.number):
+        current += n
+        for _ in range(tx_outs_num):
             tx_out = TxOut.from_bytes(byte_string[current:])
             current += len(tx_out)
             tx_outs.append(tx_out)
@@ -165,10 +165,10 @@ class SproutTx(z.ZcashByteData):
         joinsplit_sig = None
         if utils.le2i(version) == 2:  # If we expect joinsplits
             tx_joinsplits = []
-            tx_joinsplits_num = shared.VarInt.from_bytes(byte_string[current:])
-            current += len(tx_joinsplits_num)
+            tx_joinsplits_num, n = shared.decode_varint(byte_string, current)
+            current += n
 
-            for _ in range(tx_joinsplits_num.number):
+            for _ in range(tx_joinsplits_num):
                 joinsplit = z.SproutJoinsplit.from_bytes(byte_string[current:])
                 current += len(joinsplit)
                 tx_joinsplits.append(joinsplit)
@@ -1,14 +1,16 @@
+import hashlib
 import riemann
 from riemann import utils
 from riemann.tx import shared
 from riemann.script import serialization
-from riemann.tx.shared import ByteData, VarInt
+from riemann.tx.shared import ByteData, decode_varint, encode_varint
 
 
 class Outpoint(ByteData):
     '''
     NB: Args must be little-endian
     '''
+    __slots__ = ()
 
     def __init__(self, tx_id, index):
         super().__init__()
@@ -19,24 +21,29 @@ class Outpoint(ByteData):
         self += tx_id
         self += index
 
-        self.tx_id = tx_id
-        self.index = index
-
         self._make_immutable()
 
+    @property
+    def tx_id(self):
+        return self._bytes[:32]
+
+    @property
+    def index(self):
+        return self._bytes[32:36]
+
     def copy(self, tx_id=None, index=None):
         return Outpoint(
             tx_id=tx_id if tx_id is not None else self.tx_id,
             index=index if index is not None else self.index)
 
     @classmethod
-    def from_bytes(Outpoint, byte_string):
+    def from_bytes(Outpoint, byte_string, offset=0):
         '''
-        bytes -> Outpoint
+        byte-like, int -> Outpoint
         '''
         return Outpoint(
-            tx_id=byte_string[:32],
-            index=byte_string[32:36])
+            tx_id=bytes(byte_string[offset:offset + 32]),
+            index=bytes(byte_string[offset + 32:offset + 36]))
 
 
 class TxIn(ByteData):
@@ -45,6 +52,7 @@ class TxIn(ByteData):
     stack_script and redeem_script should already be serialized
     NB: sequence must be little-endian
     '''
+    __slots__ = ('_script_start', '_redeem_start', '_outpoint')
 
     def __init__(self, outpoint, stack_script, redeem_script, sequence):
         super().__init__()
@@ -60,20 +68,45 @@ class TxIn(ByteData):
                              .format(len(stack_script) + len(redeem_script)))
 
         self += outpoint
-        self += VarInt(len(stack_script) + len(redeem_script))
+        self += encode_varint(len(stack_script) + len(redeem_script))
+        self._script_start = len(self)
         self += stack_script
+        self._redeem_start = len(self)
         self += redeem_script
         self += sequence
 
-        self.outpoint = outpoint
-        self.script_len = len(stack_script + redeem_script)
-        self.stack_script = stack_script
-        self.redeem_script = redeem_script
-        self.script_sig = self.stack_script + self.redeem_script
-        self.sequence = sequence
+        self._outpoint = outpoint if isinstance(outpoint, Outpoint) else None
 
         self._make_immutable()
 
+    @property
+    def outpoint(self):
+        # Parsed on first use, then kept
+        if self._outpoint is None:
+            object.__setattr__(
+                self, '_outpoint', Outpoint.from_bytes(self._bytes))
+        return self._outpoint
+
+    @property
+    def script_len(self):
+        return len(self._bytes) - 4 - self._script_start
+
+    @property
+    def stack_script(self):
+        return self._bytes[self._script_start:self._redeem_start]
+
+    @property
+    def redeem_script(self):
+        return self._bytes[self._redeem_start:-4]
+
+    @property
+    def script_sig(self):
+        return self._bytes[self._script_start:-4]
+
+    @property
+    def sequence(self):
+        return self._bytes[-4:]
+
     def copy(self, outpoint=None, stack_script=None,
              redeem_script=None, sequence=None):
         '''
@@ -88,50 +121,64 @@ class TxIn(ByteData):
             sequence=sequence if sequence is not None else self.sequence)
 
     def is_p2sh(self):
-        return self.redeem_script is not b''
+        return self.redeem_script != b''
 
     @classmethod
     def _parse_script_sig(TxIn, script_sig):
         '''
         byte_string -> (byte_string, byte_string)
         '''
-        # Is there a better way to do this?
         stack_script = script_sig
         redeem_script = b''
         try:
-            # If the last entry deserializes, it's a p2sh input
+            # If the last push is itself a valid script, it's a p2sh input
             # There is a vanishingly small edge case where the pubkey
-            #   forms a deserializable script.
-            # Edge case: serialization errors on CODESEPARATOR
-            deserialized = serialization.deserialize(script_sig)
-            items = deserialized.split()
-            serialization.hex_deserialize(items[-1])
-            stack_script = serialization.serialize(' '.join(items[:-1]))
-            redeem_script = serialization.serialize(items[-1])
+            #   forms a valid script.
+            # Edge case: scripts with CODESEPARATOR are never p2sh
+            last_data = None
+            last_offset = 0
+            for opcode, data, offset in serialization.iter_ops(script_sig):
+                if data is None:
+                    serialization.op_name(opcode)
+                last_data = data
+                last_offset = offset
+
+            if last_data:
+                serialization.validate(last_data)
+                stack_script = script_sig[:last_offset]
+                redeem_script = script_sig[last_offset:]
         except (IndexError, ValueError, NotImplementedError):
             pass
 
         return stack_script, redeem_script
 
     @classmethod
-    def from_bytes(TxIn, byte_string):
+    def from_bytes(TxIn, byte_string, offset=0, validate=True):
         '''
-        byte_string -> TxIn
-        parses a TxIn from a byte-like object
+        byte_string, int, bool -> TxIn
+        parses a TxIn from a byte-like object, starting at offset
+        validate=False skips the size checks in __init__
         '''
-        outpoint = Outpoint.from_bytes(byte_string[:36])
+        script_sig_len, n = decode_varint(byte_string, offset + 36)
+        script_start = offset + 36 + n
+        script_end = script_start + script_sig_len
+        script_sig = bytes(byte_string[script_start:script_end])
 
-        script_sig_len = VarInt.from_bytes(byte_string[36:45])
-        script_start = 36 + len(script_sig_len)
-        script_end = script_start + script_sig_len.number
-        script_sig = byte_string[script_start:script_end]
-
-        sequence = byte_string[script_end:script_end + 4]
         if script_sig == b'':
             stack_script = b''
             redeem_script = b''
         else:
             stack_script, redeem_script = TxIn._parse_script_sig(script_sig)
+
+        if not validate:
+            return TxIn._from_slice(
+                byte_string, offset, script_end + 4,
+                _script_start=36 + n,
+                _redeem_start=36 + n + len(stack_script),
+                _outpoint=None)
+
+        outpoint = Outpoint.from_bytes(byte_string, offset)
+        sequence = bytes(byte_string[script_end:script_end + 4])
         return TxIn(
             outpoint=outpoint,
             stack_script=stack_script,
@@ -143,6 +190,7 @@ class TxOut(ByteData):
     '''
     NB: value must be little-endian
     '''
+    __slots__ = ('_script_start',)
 
     def __init__(self, value, output_script):
         super().__init__()
@@ -151,15 +199,24 @@ class TxOut(ByteData):
         self.validate_bytes(output_script, None)
 
         self += value
-        self += VarInt(len(output_script))
+        self += encode_varint(len(output_script))
+        self._script_start = len(self)
         self += output_script
 
-        self.value = value
-        self.output_script_len = len(output_script)
-        self.output_script = output_script
-
         self._make_immutable()
 
+    @property
+    def value(self):
+        return self._bytes[:8]
+
+    @property
+    def output_script_len(self):
+        return len(self._bytes) - self._script_start
+
+    @property
+    def output_script(self):
+        return self._bytes[self._script_start:]
+
     def copy(self, value=None, output_script=None):
         return TxOut(
             value=value if value is not None else self.value,
@@ -167,20 +224,32 @@ class TxOut(ByteData):
                            else self.output_script))
 
     @classmethod
-    def from_bytes(TxOut, byte_string):
-        n = VarInt.from_bytes(byte_string[8:])
-        script_start = 8 + len(n)
-        script_end = script_start + n.number
-        if n.number < 0xfc:
+    def from_bytes(TxOut, byte_string, offset=0, validate=True):
+        '''
+        byte-like, int, bool -> TxOut
+        validate=False also accepts long output scripts
+        '''
+        if not validate:
+            script_len, n = decode_varint(byte_string, offset + 8)
+            return TxOut._from_slice(
+                byte_string, offset, offset + 8 + n + script_len,
+                _script_start=8 + n)
+
+        # Scripts this short always have a single byte length
+        script_len = byte_string[offset + 8]
+        if script_len < 0xfc:
+            script_start = offset + 9
+            script_end = script_start + script_len
             return TxOut(
-                value=byte_string[:8],
-                output_script=byte_string[script_start:script_end])
+                value=bytes(byte_string[offset:offset + 8]),
+                output_script=bytes(byte_string[script_start:script_end]))
         else:
             raise NotImplementedError(
                 'No support for abnormally long pk_scripts.')
 
 
 class WitnessStackItem(ByteData):
+    __slots__ = ('_item_start',)
 
     def __init__(self, item):
         super().__init__()
@@ -190,23 +259,37 @@ class WitnessStackItem(ByteData):
             raise ValueError(
                 'Item is too large. Expected <=520 bytes. '
                 'Got: {} bytes'.format(len(item)))
-        self += VarInt(len(item))
+        self += encode_varint(len(item))
+        self._item_start = len(self)
         self += item
 
-        self.item_len = len(item)
-        self.item = item
-
         self._make_immutable()
 
+    @property
+    def item_len(self):
+        return len(self._bytes) - self._item_start
+
+    @property
+    def item(self):
+        return self._bytes[self._item_start:]
+
     @classmethod
-    def from_bytes(WitnessStackItem, byte_string):
-        n = VarInt.from_bytes(byte_string)
-        item_start = len(n)
-        item_end = item_start + n.number
-        return WitnessStackItem(byte_string[item_start:item_end])
+    def from_bytes(WitnessStackItem, byte_string, offset=0, validate=True):
+        '''
+        byte-like, int, bool -> WitnessStackItem
+        validate=False also accepts items over 520 bytes
+        '''
+        item_len, n = decode_varint(byte_string, offset)
+        item_start = offset + n
+        item_end = item_start + item_len
+        if not validate:
+            return WitnessStackItem._from_slice(
+                byte_string, offset, item_end, _item_start=n)
+        return WitnessStackItem(bytes(byte_string[item_start:item_end]))
 
 
 class InputWitness(ByteData):
+    __slots__ = ()
 
     def __init__(self, stack):
         '''
@@ -220,25 +303,49 @@ class InputWitness(ByteData):
                     'Expected WitnessStackItem. Got {}'
                     .format(item))
 
-        self += VarInt(len(stack))
+        self += encode_varint(len(stack))
         for item in stack:
             self += item
 
-        self.stack_len = len(stack)
-        self.stack = [item for item in stack]
-
         self._make_immutable()
 
-    @classmethod
-    def from_bytes(InputWitness, byte_string):
-        stack_items = VarInt.from_bytes(byte_string)
-        item_start = len(stack_items)
+    @property
+    def stack_len(self):
+        return decode_varint(self._bytes)[0]
+
+    @property
+    def stack(self):
+        return InputWitness._parse_stack(self._bytes, 0, validate=False)
+
+    @staticmethod
+    def _parse_stack(byte_string, offset, validate=True):
+        '''
+        byte-like, int, bool -> list(WitnessStackItem)
+        '''
+        stack_items, n = decode_varint(byte_string, offset)
+        item_start = offset + n
         items = []
-        while len(items) < stack_items.number:
-            item = WitnessStackItem.from_bytes(byte_string[item_start:])
+        while len(items) < stack_items:
+            item = WitnessStackItem.from_bytes(
+                byte_string, item_start, validate=validate)
             item_start += len(item)
             items.append(item)
-        return InputWitness(items)
+        return items
+
+    @classmethod
+    def from_bytes(InputWitness, byte_string, offset=0, validate=True):
+        '''
+        byte-like, int, bool -> InputWitness
+        '''
+        if not validate:
+            stack_items, n = decode_varint(byte_string, offset)
+            end = offset + n
+            for _ in range(stack_items):
+                item_len, n = decode_varint(byte_string, end)
+                end += n + item_len
+            return InputWitness._from_slice(byte_string, offset, end)
+
+        return InputWitness(InputWitness._parse_stack(byte_string, offset))
 
     def copy(self, stack=None):
         return InputWitness(
@@ -251,6 +358,7 @@ class Tx(ByteData):
     list(TxOut), list(InputWitness), byte-like -> Tx
     NB: version, lock_time must be little-endian
     '''
+    __slots__ = ('tx_ins', 'tx_outs', 'tx_witnesses', '_hash_cache')
 
     def __init__(self, version, flag, tx_ins,
                  tx_outs, tx_witnesses, lock_time):
@@ -302,10 +410,10 @@ class Tx(ByteData):
         self += version
         if flag is not None:
             self += flag
-        self += VarInt(len(tx_ins))
+        self += encode_varint(len(tx_ins))
         for tx_in in tx_ins:
             self += tx_in
-        self += VarInt(len(tx_outs))
+        self += encode_varint(len(tx_outs))
         for tx_out in tx_outs:
             self += tx_out
         if tx_witnesses is not None:
@@ -313,86 +421,153 @@ class Tx(ByteData):
                 self += witness
         self += lock_time
 
-        self.version = version
-        self.flag = flag
-        self.tx_ins_len = len(tx_ins)
         self.tx_ins = tuple(tx_in for tx_in in tx_ins)
-        self.tx_outs_len = len(tx_outs)
         self.tx_outs = tuple(tx_out for tx_out in tx_outs)
-        self.tx_witnesses_len = self.tx_ins_len
         self.tx_witnesses = \
             tuple(wit for wit in tx_witnesses) if tx_witnesses is not None \
             else None
-        self.lock_time = lock_time
 
         if len(self) > 100000:
             raise ValueError(
                 'Tx is too large. '
                 'Expect less than 100kB. Got: {} bytes'.format(len(self)))
 
-        if flag is not None:
-            self.tx_id_le = utils.hash256(self.no_witness())
-            self.wtx_id_le = utils.hash256(self.to_bytes())
-            self.tx_id = utils.change_endianness(self.tx_id_le)
-            self.wtx_id = utils.change_endianness(self.wtx_id_le)
-
-        else:
-            self.tx_id_le = utils.hash256(self.to_bytes())
-            self.tx_id = utils.change_endianness(self.tx_id_le)
-            self.wtx_id = None
-            self.wtx_le = None
+        # Tx ids and sighash digests. Filled in lazily
+        self._hash_cache = {}
 
         self._make_immutable()
 
-    @classmethod
-    def from_hex(Tx, hex_string):
-        return Tx.from_bytes(bytes.fromhex(hex_string))
+    @property
+    def version(self):
+        return self._bytes[:4]
+
+    @property
+    def flag(self):
+        # A legacy tx can't have 0 inputs, so a 0 here is the segwit marker
+        return self._bytes[4:6] if self._bytes[4] == 0 else None
+
+    @property
+    def tx_ins_len(self):
+        return len(self.tx_ins)
+
+    @property
+    def tx_outs_len(self):
+        return len(self.tx_outs)
+
+    @property
+    def tx_witnesses_len(self):
+        return len(self.tx_ins)
+
+    @property
+    def lock_time(self):
+        return self._bytes[-4:]
+
+    @property
+    def tx_id_le(self):
+        if 'tx_id_le' not in self._hash_cache:
+            if self.flag is not None:
+                self._hash_cache['tx_id_le'] = \
+                    utils.hash256(self.no_witness())
+            else:
+                self._hash_cache['tx_id_le'] = utils.hash256(self.to_bytes())
+        return self._hash_cache['tx_id_le']
+
+    @property
+    def tx_id(self):
+        return utils.change_endianness(self.tx_id_le)
+
+    @property
+    def wtx_id_le(self):
+        if self.flag is None:
+            return None
+        if 'wtx_id_le' not in self._hash_cache:
+            self._hash_cache['wtx_id_le'] = utils.hash256(self.to_bytes())
+        return self._hash_cache['wtx_id_le']
+
+    @property
+    def wtx_id(self):
+        if self.flag is None:
+            return None
+        return utils.change_endianness(self.wtx_id_le)
 
     @classmethod
-    def from_bytes(Tx, byte_string):
-        version = byte_string[0:4]
-        if byte_string[4:6] == riemann.network.SEGWIT_TX_FLAG:
-            tx_ins_num_loc = 6
-            flag = riemann.network.SEGWIT_TX_FLAG
-        else:
-            tx_ins_num_loc = 4
-            flag = None
-        tx_ins = []
-        tx_ins_num = VarInt.from_bytes(byte_string[tx_ins_num_loc:])
-
-        current = tx_ins_num_loc + len(tx_ins_num)
-
-        for _ in range(tx_ins_num.number):
-            tx_in = TxIn.from_bytes(byte_string[current:])
-            current += len(tx_in)
-            tx_ins.append(tx_in)
-
-        tx_outs = []
-        tx_outs_num = VarInt.from_bytes(byte_string[current:])
-        current += len(tx_outs_num)
-        for _ in range(tx_outs_num.number):
-            tx_out = TxOut.from_bytes(byte_string[current:])
-            current += len(tx_out)
-            tx_outs.append(tx_out)
-
-        if flag and len(byte_string[current:]) > 4:
-            tx_witnesses = []
-            tx_witnesses_num = tx_ins_num
-            for _ in range(tx_witnesses_num.number):
-                tx_witness = InputWitness.from_bytes(byte_string[current:])
-                current += len(tx_witness)
-                tx_witnesses.append(tx_witness)
-        else:
-            tx_witnesses = None
+    def from_hex(Tx, hex_string, network=None):
+        return Tx.from_bytes(bytes.fromhex(hex_string), network=network)
 
-        lock_time = byte_string[current:current + 4]
-        return Tx(
-            version=version,
-            flag=flag,
-            tx_ins=tx_ins,
-            tx_outs=tx_outs,
-            tx_witnesses=tx_witnesses,
-            lock_time=lock_time)
+    @classmethod
+    def from_bytes(Tx, byte_string, offset=0, network=None, validate=True):
+        '''
+        byte-like, int, str, bool -> Tx
+        Parses a Tx starting at offset.
+        The input is walked with a single memoryview and a cursor,
+        so only the final fields are copied out of it.
+        network optionally names the network to parse under.
+        validate=False skips the checks __init__ applies to new txs
+        (the 100kB tx limit, 520 byte witness items, 1650 byte script
+        sigs and long output scripts). Use it for data that is already
+        valid, like transactions from blocks.
+        '''
+        with riemann.network_context(network):
+            buf = memoryview(byte_string)
+            version = bytes(buf[offset:offset + 4])
+            if buf[offset + 4:offset + 6] == riemann.network.SEGWIT_TX_FLAG:
+                tx_ins_num_loc = offset + 6
+                flag = riemann.network.SEGWIT_TX_FLAG
+            elif not validate and buf[offset + 4] == 0:
+                # A 0 input count is the marker of an extended
+                # serialization. e.g. Litecoin MWEB's flag 0x08
+                raise ValueError(
+                    'Unsupported tx serialization flag. Got: {}'
+                    .format(bytes(buf[offset + 4:offset + 6]).hex()))
+            else:
+                tx_ins_num_loc = offset + 4
+                flag = None
+            tx_ins = []
+            tx_ins_num, n = decode_varint(buf, tx_ins_num_loc)
+
+            current = tx_ins_num_loc + n
+
+            for _ in range(tx_ins_num):
+                tx_in = TxIn.from_bytes(buf, current, validate=validate)
+                current += len(tx_in)
+                tx_ins.append(tx_in)
+
+            tx_outs = []
+            tx_outs_num, n = decode_varint(buf, current)
+            current += n
+            for _ in range(tx_outs_num):
+                tx_out = TxOut.from_bytes(buf, current, validate=validate)
+                current += len(tx_out)
+                tx_outs.append(tx_out)
+
+            if flag and len(buf) - current > 4:
+                tx_witnesses = []
+                tx_witnesses_num = tx_ins_num
+                for _ in range(tx_witnesses_num):
+                    tx_witness = InputWitness.from_bytes(
+                        buf, current, validate=validate)
+                    current += len(tx_witness)
+                    tx_witnesses.append(tx_witness)
+            else:
+                tx_witnesses = None
+
+            if not validate:
+                return Tx._from_slice(
+                    buf, offset, current + 4,
+                    tx_ins=tuple(tx_ins),
+                    tx_outs=tuple(tx_outs),
+                    tx_witnesses=(tuple(tx_witnesses)
+                                  if tx_witnesses is not None else None),
+                    _hash_cache={})
+
+            lock_time = bytes(buf[current:current + 4])
+            return Tx(
+                version=version,
+                flag=flag,
+                tx_ins=tx_ins,
+                tx_outs=tx_outs,
+                tx_witnesses=tx_witnesses,
+                lock_time=lock_time)
 
     def no_witness(self):
         '''
@@ -400,10 +575,10 @@ class Tx(ByteData):
         '''
         tx = bytes()
         tx += self.version
-        tx += VarInt(len(self.tx_ins)).to_bytes()
+        tx += encode_varint(len(self.tx_ins))
         for tx_in in self.tx_ins:
             tx += tx_in.to_bytes()
-        tx += VarInt(len(self.tx_outs)).to_bytes()
+        tx += encode_varint(len(self.tx_outs))
         for tx_out in self.tx_outs:
             tx += tx_out.to_bytes()
         tx += self.lock_time
@@ -441,25 +616,61 @@ class Tx(ByteData):
                   lock_time=(lock_time if lock_time is not None
                              else self.lock_time))
 
-    def _sighash_prep(self, index, script):
+    def _legacy_sighash(self, index, script, sighash_type, anyone_can_pay):
         '''
-        Tx, int, byte-like -> Tx
+        Tx, int, byte-like, int, bool -> bytes
         Sighashes suck
         Performs the sighash setup described here:
         https://en.bitcoin.it/wiki/OP_CHECKSIG#How_it_works
         https://bitcoin.stackexchange.com/questions/3374/how-to-redeem-a-basic-tx
+        The modified tx is streamed into the hasher piece by piece.
+        No copy of the tx is built.
         We save on complexity by refusing to support OP_CODESEPARATOR
         '''
-        # 0 out scripts in tx_ins
-        copy_tx_ins = [tx_in.copy(stack_script=b'', redeem_script=b'')
-                       for tx_in in self.tx_ins]
+        self.validate_bytes(script, None)
+        single = sighash_type == shared.SIGHASH_SINGLE
+        if anyone_can_pay:
+            sighash_type |= shared.SIGHASH_ANYONECANPAY
 
-        # NB: The script for the current transaction input in txCopy is set to
-        #     subScript (lead in by its length as a var-integer encoded!)
-        copy_tx_ins[index] = \
-            copy_tx_ins[index].copy(stack_script=b'', redeem_script=script)
+        h = hashlib.sha256()
+        h.update(self.version)
 
-        return self.copy(tx_ins=copy_tx_ins)
+        # ANYONECANPAY: The txCopy input vector is resized to a length of one.
+        if anyone_can_pay:
+            tx_ins = [(index, self.tx_ins[index])]
+        else:
+            tx_ins = enumerate(self.tx_ins)
+            h.update(encode_varint(len(self.tx_ins)))
+
+        for i, tx_in in tx_ins:
+            if anyone_can_pay:
+                h.update(b'\x01')
+            h.update(tx_in[:36])  # outpoint
+            if i == index:
+                # NB: The script for the current transaction input in txCopy
+                #     is set to subScript (lead in by its length as a var-int)
+                h.update(encode_varint(len(script)))
+                h.update(script)
+                h.update(tx_in.sequence)
+            else:
+                h.update(b'\x00')  # 0 out scripts in other tx_ins
+                # SINGLE: Other tx_ins sequence numbers are set to 0
+                h.update(b'\x00' * 4 if single else tx_in.sequence)
+
+        if single:
+            # Remove outputs after the one we're signing
+            # Other tx_outs are set to -1 value and null scripts
+            h.update(encode_varint(index + 1))
+            h.update((b'\xff' * 8 + b'\x00') * index)
+            h.update(self.tx_outs[index].to_bytes())
+        else:
+            h.update(encode_varint(len(self.tx_outs)))
+            for tx_out in self.tx_outs:
+                h.update(tx_out.to_bytes())
+
+        h.update(self.lock_time)
+        h.update(utils.i2le_padded(sighash_type, 4))
+        return utils.sha256(h.digest())
 
     def sighash_all(self, index, script=None,
                     prevout_value=None, anyone_can_pay=False):
@@ -485,12 +696,10 @@ class Tx(ByteData):
                 sighash_type=shared.SIGHASH_ALL,
                 anyone_can_pay=anyone_can_pay)
 
-        copy_tx = self._sighash_prep(index=index, script=script)
-        if anyone_can_pay:
-            return self._sighash_anyone_can_pay(
-                index=index, copy_tx=copy_tx, sighash_type=shared.SIGHASH_ALL)
-
-        return self._sighash_final_hashing(copy_tx, shared.SIGHASH_ALL)
+        return self._legacy_sighash(index=index,
+                                    script=script,
+                                    sighash_type=shared.SIGHASH_ALL,
+                                    anyone_can_pay=anyone_can_pay)
 
     def sighash_single(self, index, script=None,
                        prevout_value=None, anyone_can_pay=False):
@@ -522,29 +731,50 @@ class Tx(ByteData):
                 sighash_type=shared.SIGHASH_SINGLE,
                 anyone_can_pay=anyone_can_pay)
 
-        copy_tx = self._sighash_prep(index=index, script=script)
-
-        # Remove outputs after the one we're signing
-        # Other tx_outs are set to -1 value and null scripts
-        copy_tx_outs = copy_tx.tx_outs[:index + 1]
-        copy_tx_outs = [TxOut(value=b'\xff' * 8, output_script=b'')
-                        for _ in copy_tx.tx_ins]  # Null them all
-        copy_tx_outs[index] = copy_tx.tx_outs[index]  # Fix the current one
+        return self._legacy_sighash(index=index,
+                                    script=script,
+                                    sighash_type=shared.SIGHASH_SINGLE,
+                                    anyone_can_pay=anyone_can_pay)
 
-        # Other tx_ins sequence numbers are set to 0
-        copy_tx_ins = [tx_in.copy(sequence=b'\x00\x00\x00\x00')
-                       for tx_in in copy_tx.tx_ins]  # Set all to 0
-        copy_tx_ins[index] = copy_tx.tx_ins[index]  # Fix the current one
+    def sighashes(self, scripts, prevout_values=None,
+                  sighash_type=shared.SIGHASH_ALL, anyone_can_pay=False):
+        '''
+        Tx, list(byte-like), list(byte-like), int, bool -> list(bytes)
+        Generates the hash to be signed for every input in one call.
+        scripts and prevout_values are in the same order as tx_ins.
+        prevout_values may be None for legacy (non-witness, non-forkid) txns.
+        Per-tx work (hashPrevouts, hashSequence, hashOutputs)
+        is done once and shared by all inputs.
+        '''
+        if sighash_type == shared.SIGHASH_ALL:
+            sighash = self.sighash_all
+        elif sighash_type == shared.SIGHASH_SINGLE:
+            sighash = self.sighash_single
+        elif sighash_type == shared.SIGHASH_NONE:
+            return self.sighash_none()
+        else:
+            raise ValueError('Unknown sighash type. Got: {}'
+                             .format(sighash_type))
 
-        copy_tx = copy_tx.copy(
-            tx_ins=copy_tx_ins,
-            tx_outs=copy_tx_outs)
+        if len(scripts) != len(self.tx_ins):
+            raise ValueError(
+                'Script and TxIn lists must be same length. '
+                'Got {} inputs and {} scripts.'
+                .format(len(self.tx_ins), len(scripts)))
 
-        if anyone_can_pay:  # Forward onwards
-            return self._sighash_anyone_can_pay(
-                index, copy_tx, shared.SIGHASH_SINGLE)
+        if prevout_values is None:
+            prevout_values = [None] * len(self.tx_ins)
+        elif len(prevout_values) != len(self.tx_ins):
+            raise ValueError(
+                'Prevout value and TxIn lists must be same length. '
+                'Got {} inputs and {} prevout values.'
+                .format(len(self.tx_ins), len(prevout_values)))
 
-        return self._sighash_final_hashing(copy_tx, shared.SIGHASH_SINGLE)
+        return [sighash(index=i,
+                        script=scripts[i],
+                        prevout_value=prevout_values[i],
+                        anyone_can_pay=anyone_can_pay)
+                for i in range(len(self.tx_ins))]
 
     def segwit_sighash(self, index, script, prevout_value=None,
                        sighash_type=None, anyone_can_pay=False):
@@ -589,45 +819,20 @@ class Tx(ByteData):
 
         return utils.hash256(data.to_bytes())
 
-    def _sighash_anyone_can_pay(self, index, copy_tx, sighash_type):
-        '''
-        int, byte-like, Tx, int -> bytes
-        Applies SIGHASH_ANYONECANPAY procedure.
-        Should be called by another SIGHASH procedure.
-        Not on its own.
-        https://en.bitcoin.it/wiki/OP_CHECKSIG#Procedure_for_Hashtype_SIGHASH_ANYONECANPAY
-        '''
-
-        # The txCopy input vector is resized to a length of one.
-        copy_tx_ins = [copy_tx.tx_ins[index]]
-        copy_tx = copy_tx.copy(tx_ins=copy_tx_ins)
-
-        return self._sighash_final_hashing(
-            copy_tx, sighash_type | shared.SIGHASH_ANYONECANPAY)
-
-    def _sighash_final_hashing(self, copy_tx, sighash_type):
-        '''
-        Tx, int -> bytes
-        Returns the hash that should be signed
-        https://en.bitcoin.it/wiki/OP_CHECKSIG#Procedure_for_Hashtype_SIGHASH_ANYONECANPAY
-        '''
-        sighash = ByteData()
-        sighash += copy_tx.to_bytes()
-        sighash += utils.i2le_padded(sighash_type, 4)
-
-        return utils.hash256(sighash.to_bytes())
-
     def _hash_prevouts(self, anyone_can_pay):
         if anyone_can_pay:
             # If the ANYONECANPAY flag is set,
             # hashPrevouts is a uint256 of 0x0000......0000.
             hash_prevouts = b'\x00' * 32
+        elif 'prevouts' in self._hash_cache:
+            hash_prevouts = self._hash_cache['prevouts']
         else:
             # hashPrevouts is the double SHA256 of all outpoints;
             outpoints = ByteData()
             for tx_in in self.tx_ins:
                 outpoints += tx_in.outpoint
             hash_prevouts = utils.hash256(outpoints.to_bytes())
+            self._hash_cache['prevouts'] = hash_prevouts
         return hash_prevouts
 
     def _hash_sequence(self, sighash_type, anyone_can_pay):
@@ -643,12 +848,15 @@ class Tx(ByteData):
             # If any of ANYONECANPAY, SINGLE sighash type is set,
             # hashSequence is a uint256 of 0x0000......0000.
             return b'\x00' * 32
+        elif 'sequence' in self._hash_cache:
+            return self._hash_cache['sequence']
         else:
             # hashSequence is the double SHA256 of nSequence of all inputs;
             sequences = ByteData()
             for tx_in in self.tx_ins:
                 sequences += tx_in.sequence
-            return utils.hash256(sequences.to_bytes())
+            self._hash_cache['sequence'] = utils.hash256(sequences.to_bytes())
+            return self._hash_cache['sequence']
 
     def _adjusted_script_code(self, script):
         '''
@@ -665,7 +873,7 @@ class Tx(ByteData):
         script_code = ByteData()
         if script[0] == len(script) - 1:
             return script
-        script_code += VarInt(len(script))
+        script_code += encode_varint(len(script))
         script_code += script
         return script_code
 
@@ -682,10 +890,13 @@ class Tx(ByteData):
             # If the sighash type is ALL,
             # hashOutputs is the double SHA256 of all output amounts
             # paired up with their scriptPubKey;
-            outputs = ByteData()
-            for tx_out in self.tx_outs:
-                outputs += tx_out.to_bytes()
-            return utils.hash256(outputs.to_bytes())
+            if 'outputs' not in self._hash_cache:
+                outputs = ByteData()
+                for tx_out in self.tx_outs:
+                    outputs += tx_out.to_bytes()
+                self._hash_cache['outputs'] = \
+                    utils.hash256(outputs.to_bytes())
+            return self._hash_cache['outputs']
         elif (sighash_type == shared.SIGHASH_SINGLE
               and index < len(self.tx_outs)):
             # if sighash type is SINGLE
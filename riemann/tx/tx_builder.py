@@ -2,21 +2,18 @@ import riemann
 from riemann import tx
 from riemann import utils
 from riemann.script import serialization
+from riemann.script import templates
 
 
 def make_sh_script_pubkey(script_bytes, witness=False):
-    output_script = bytearray()
-    if witness:
-        script_hash = utils.sha256(script_bytes)
-        output_script.extend(riemann.network.P2WSH_PREFIX)
-        output_script.extend(script_hash)
-    else:
-        script_hash = utils.hash160(script_bytes)
-        output_script.extend(b'\xa9\x14')  # OP_HASH160 PUSH0x14
-        output_script.extend(script_hash)
-        output_script.extend(b'\x87')  # OP_EQUAL
+    if witness and not riemann.network.SEGWIT:
+        raise ValueError(
+            'Network {} does not support witness scripts.'
+            .format(riemann.get_current_network_name()))
 
-    return output_script
+    if witness:
+        return templates.p2wsh(utils.sha256(script_bytes))
+    return templates.p2sh(utils.hash160(script_bytes))
 
 
 def make_sh_output_script(script_string, witness=False):
@@ -41,8 +38,6 @@ def make_pkh_output_script(pubkey, witness=False):
             'Network {} does not support witness scripts.'
             .format(riemann.get_current_network_name()))
 
-    output_script = bytearray()
-
     if type(pubkey) is not bytearray and type(pubkey) is not bytes:
         raise ValueError('Unknown pubkey format. '
                          'Expected bytes. Got: {}'.format(type(pubkey)))
@@ -50,13 +45,8 @@ def make_pkh_output_script(pubkey, witness=False):
     pubkey_hash = utils.hash160(pubkey)
 
     if witness:
-        output_script.extend(riemann.network.P2WPKH_PREFIX)
-        output_script.extend(pubkey_hash)
-    else:
-        output_script.extend(b'\x76\xa9\x14')  # OP_DUP OP_HASH160 PUSH14
-        output_script.extend(pubkey_hash)
-        output_script.extend(b'\x88\xac')  # OP_EQUALVERIFY OP_CHECKSIG
-    return output_script
+        return templates.p2wpkh(pubkey_hash)
+    return templates.p2pkh(pubkey_hash)
 
 
 def make_p2sh_output_script(script_string):
@@ -323,5 +313,4 @@ def length_prepend(byte_string):
     '''
     bytes -> bytes
     '''
-    length = tx.VarInt(len(byte_string))
-    return length.to_bytes() + byte_string
+    return tx.encode_varint(len(byte_string)) + byte_string
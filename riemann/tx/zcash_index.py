@@ -0,0 +1,198 @@
+import riemann
+from riemann import utils
+from riemann.tx.sprout import SproutTx
+from riemann.tx.sapling import SaplingTx
+from riemann.tx.overwinter import OverwinterTx
+
+SNAPSHOT_MAGIC = b'RZNI'
+SNAPSHOT_VERSION = 1
+
+
+class ShieldedIndex():
+    '''
+    None -> ShieldedIndex
+    Nullifiers and note commitments seen across many Zcash transactions.
+    Sprout and Sapling are separate pools, so they're kept apart.
+    Every value is a 32-byte bytes object in a set, so lookups are O(1).
+    '''
+    __slots__ = ('sprout_nullifiers', 'sprout_commitments',
+                 'sapling_nullifiers', 'sapling_commitments')
+
+    def __init__(self):
+        self.sprout_nullifiers = set()
+        self.sprout_commitments = set()
+        self.sapling_nullifiers = set()
+        self.sapling_commitments = set()
+
+    def __len__(self):
+        return sum(len(values) for values in self._sets())
+
+    def __eq__(self, other):
+        if not isinstance(other, ShieldedIndex):
+            return NotImplemented
+        return self._sets() == other._sets()
+
+    def _sets(self):
+        return (self.sprout_nullifiers, self.sprout_commitments,
+                self.sapling_nullifiers, self.sapling_commitments)
+
+    def _pool(self, pool, sprout_values, sapling_values):
+        if pool is None:
+            return (sprout_values, sapling_values)
+        if pool == 'sprout':
+            return (sprout_values,)
+        if pool == 'sapling':
+            return (sapling_values,)
+        raise ValueError(
+            'Unknown pool. Expected sprout, sapling or None. Got: {}'
+            .format(pool))
+
+    def is_spent(self, nullifier, pool=None):
+        '''
+        byte-like, str -> bool
+        pool is 'sprout' or 'sapling'. None checks both.
+        '''
+        nullifier = bytes(nullifier)
+        return any(nullifier in values for values in self._pool(
+            pool, self.sprout_nullifiers, self.sapling_nullifiers))
+
+    def has_commitment(self, commitment, pool=None):
+        '''
+        byte-like, str -> bool
+        pool is 'sprout' or 'sapling'. None checks both.
+        '''
+        commitment = bytes(commitment)
+        return any(commitment in values for values in self._pool(
+            pool, self.sprout_commitments, self.sapling_commitments))
+
+    def add_tx(self, tx):
+        '''
+        SproutTx/OverwinterTx/SaplingTx -> list(bytes)
+        Indexes a transaction's nullifiers and note commitments.
+        Returns the nullifiers that were already spent. Double spends
+        are reported, not rejected.
+        '''
+        if not isinstance(tx, (SproutTx, OverwinterTx, SaplingTx)):
+            raise ValueError(
+                'Expected SproutTx, OverwinterTx or SaplingTx. Got {}'
+                .format(type(tx).__name__))
+
+        nullifiers = []
+        commitments = []
+        for joinsplit in tx.tx_joinsplits:
+            # Each joinsplit has two of each, 32 bytes apiece
+            nullifiers.append(bytes(joinsplit.nullifiers[:32]))
+            nullifiers.append(bytes(joinsplit.nullifiers[32:]))
+            commitments.append(bytes(joinsplit.commitments[:32]))
+            commitments.append(bytes(joinsplit.commitments[32:]))
+
+        spent = _insert(self.sprout_nullifiers, nullifiers)
+        self.sprout_commitments.update(commitments)
+
+        if isinstance(tx, SaplingTx):
+            spent.extend(_insert(
+                self.sapling_nullifiers,
+                tx.shielded_spends_array.column('nullifier')))
+            self.sapling_commitments.update(
+                tx.shielded_outputs_array.column('cmu'))
+
+        return spent
+
+    def add_txs(self, txs):
+        '''
+        list(SproutTx/OverwinterTx/SaplingTx) -> list(bytes)
+        '''
+        spent = []
+        for tx in txs:
+            spent.extend(self.add_tx(tx))
+        return spent
+
+    def add_bytes(self, byte_string, network=None):
+        '''
+        byte-like -> list(bytes)
+        Parses a serialized Zcash transaction and indexes it.
+        The tx version picks the parser. The subnet (main, test, reg)
+        comes from the network.
+        '''
+        with riemann.network_context(network):
+            if 'zcash' not in riemann.get_current_network_name():
+                raise ValueError(
+                    'ShieldedIndex not supported by network {}.'
+                    .format(riemann.get_current_network_name()))
+
+            version = utils.le2i(byte_string[0:4]) & 0x7fffffff
+            if version == 4:
+                era, Tx = 'sapling', SaplingTx
+            elif version == 3:
+                era, Tx = 'overwinter', OverwinterTx
+            elif version in (1, 2):
+                era, Tx = 'sprout', SproutTx
+            else:
+                raise ValueError(
+                    'Unsupported Zcash tx version. Expected 1-4. Got: {}'
+                    .format(version))
+
+            tx_network = 'zcash_{}_{}'.format(
+                era, riemann.network.SUBNET_NAME)
+            with riemann.network_context(tx_network):
+                return self.add_tx(Tx.from_bytes(byte_string))
+
+    def to_bytes(self):
+        '''
+        ShieldedIndex -> bytes
+        Magic, a version byte, then for each set
+        a 4-byte little-endian count and its sorted values.
+        '''
+        snapshot = bytearray(SNAPSHOT_MAGIC)
+        snapshot.append(SNAPSHOT_VERSION)
+        for values in self._sets():
+            snapshot.extend(utils.i2le_padded(len(values), 4))
+            snapshot.extend(b''.join(sorted(values)))
+        return bytes(snapshot)
+
+    @classmethod
+    def from_bytes(ShieldedIndex, byte_string):
+        '''
+        byte-like -> ShieldedIndex
+        '''
+        buf = memoryview(byte_string)
+        if bytes(buf[0:4]) != SNAPSHOT_MAGIC:
+            raise ValueError('Not a ShieldedIndex snapshot. Bad magic bytes.')
+        if len(buf) < 5 or buf[4] != SNAPSHOT_VERSION:
+            raise ValueError(
+                'Unsupported snapshot version. Expected {}. Got {}.'
+                .format(SNAPSHOT_VERSION,
+                        buf[4] if len(buf) > 4 else None))
+
+        index = ShieldedIndex()
+        current = 5
+        for values in index._sets():
+            if current + 4 > len(buf):
+                raise ValueError('Snapshot is truncated.')
+            count = utils.le2i(buf[current:current + 4])
+            current += 4
+            end = current + 32 * count
+            if end > len(buf):
+                raise ValueError('Snapshot is truncated.')
+            data = bytes(buf[current:end])
+            values.update(data[i:i + 32] for i in range(0, len(data), 32))
+            current = end
+
+        if current != len(buf):
+            raise ValueError(
+                'Snapshot has {} trailing bytes.'.format(len(buf) - current))
+        return index
+
+
+def _insert(values, new_values):
+    '''
+    set(bytes), list(bytes) -> list(bytes)
+    Adds new_values to values. Returns the ones that were already there.
+    '''
+    seen = []
+    for value in new_values:
+        if value in values:
+            seen.append(value)
+        else:
+            values.add(value)
+    return seen
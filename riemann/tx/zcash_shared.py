@@ -4,6 +4,8 @@ from riemann.tx import shared
 
 
 class ZcashByteData(shared.ByteData):
+    __slots__ = ()
+
     def __init__(self):
         if 'zcash' not in riemann.get_current_network_name():
             raise ValueError('Zcash classes not supported by network {}. '
@@ -11,6 +13,25 @@ class ZcashByteData(shared.ByteData):
                              .format(riemann.get_current_network_name()))
         super().__init__()
 
+    @classmethod
+    def _from_record(cls, byte_string, offset, length):
+        '''
+        byte-like, int, int -> ZcashByteData
+        Wraps a fixed-size record with a single copy.
+        For classes that read their fields out of self._bytes.
+        '''
+        record = bytes(byte_string[offset:offset + length])
+        if len(record) != length:
+            raise ValueError(
+                'Expected {} bytes for {}. Got {} bytes.'
+                .format(length, cls.__name__, len(record)))
+
+        self = cls.__new__(cls)
+        ZcashByteData.__init__(self)
+        self._bytes = record
+        self._make_immutable()
+        return self
+
 
 class SproutZkproof(ZcashByteData):
 
@@ -14,7 +14,7 @@ setup(
     packages=find_packages(),
     package_dir={'riemann': 'riemann'},
     keywords = 'bitcoin litecoin cryptocurrency decred blockchain development',
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     classifiers = [
         'Programming Language :: Python',
         'Programming Language :: Python :: 3 :: Only',